@@ -1,6 +1,7 @@
 import os
 import gc
 import sys
+import json
 import time
 import random
 import asyncio
@@ -35,6 +36,7 @@ import synapse.telepath as s_telepath
 
 import synapse.lib.base as s_base
 import synapse.lib.time as s_time
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.lmdbslab as s_lmdbslab
 
 import synapse.tests.utils as s_t_utils
@@ -48,6 +50,7 @@ DedicatedConf = {**SimpleConf, 'layers:lockmemory': True}
 DefaultConf = {**MapAsyncConf, 'layers:lockmemory': True}
 DefaultNoBuidConf = {**MapAsyncConf, 'layers:lockmemory': True, 'buid:prefetch': False}
 DedicatedAsyncLogConf = {**DefaultConf, 'nexslog:en': True, 'layers:logedits': True}
+ReadThreadsConf = {**DefaultConf, 'layers:readthreads': True}
 
 Configs: Dict[str, Dict] = {
     'simple': SimpleConf,
@@ -56,6 +59,7 @@ Configs: Dict[str, Dict] = {
     'default': DefaultConf,
     'defaultnobuid': DefaultNoBuidConf,
     'dedicatedasynclogging': DedicatedAsyncLogConf,
+    'readthreads': ReadThreadsConf,
 }
 
 '''
@@ -218,7 +222,7 @@ def benchmark(tags=None):
 class Benchmarker:
 
     def __init__(self, config: Dict[Any, Any], testdata: TestData, workfactor: int, num_iters=4, tmpdir=None,
-                 bench=None, tags=None):
+                 bench=None, tags=None, profqueries=None):
         '''
         Args:
             config: the cortex config
@@ -227,6 +231,7 @@ class Benchmarker:
             num_iters:  the number of times each test is run
             tags:  filters which individual measurements should be run (all tags must be present)
             remote: the remote telepath URL of a remote cortex
+            profqueries:  storm queries to run once with the storm profiler after the benchmarks
 
         All the benchmark methods are independent and should not have an effect (other than btree caching and size)
         on the other tests.  The only precondition is that the testdata has been loaded.
@@ -239,6 +244,8 @@ class Benchmarker:
         self.tmpdir = tmpdir
         self.bench = bench
         self.tags = tags
+        self.profqueries = profqueries or ()
+        self.profiles: List[Tuple[str, Dict]] = []
 
     def printreport(self, configname: str):
         print(f'Config {configname}: {self.coreconfig}, Num Iters: {self.num_iters} Debug: {__debug__}')
@@ -249,6 +256,9 @@ class Benchmarker:
             stddev = info.get('stddev') * 1000000
             print(f'{name:30}: {totmean:8.3f}s / {count:5} = {mean:6.0f}μs stddev: {stddev:6.0f}μs')
 
+        for text, prof in self.profiles:
+            printprofile(text, prof)
+
     def reportdata(self):
         retn = []
         if self.num_iters < 3:
@@ -281,6 +291,7 @@ class Benchmarker:
         ldef = {
             'lockmemory': self.coreconfig.get('layers:lockmemory', False),
             'logedits': self.coreconfig.get('layers:logedits', True),
+            'readthreads': self.coreconfig.get('layers:readthreads', False),
             'name': 'tmp for benchmark',
         }
         core = None
@@ -304,6 +315,10 @@ class Benchmarker:
 
             await prox.dyncall(layeriden, s_common.todo('waitForHot'))
 
+            self.httpsess = None
+            if core is not None:
+                self.httpsess, self.httpurl = await stack.enter_async_context(self.getHttpSess(core))
+
             try:
                 yield core, prox
 
@@ -313,6 +328,51 @@ class Benchmarker:
                     $lib.layer.del($layer)
                 ''', opts={'vars': {'view': self.viewiden, 'layer': layeriden}})
 
+    @contextlib.asynccontextmanager
+    async def getHttpSess(self, core: s_cortex.Cortex) -> AsyncIterator[Tuple[Any, str]]:
+        '''
+        Get an HTTP session logged in to a local cortex and the base URL of its HTTPS API.
+        '''
+        host, port = await core.addHttpsPort(0, host='127.0.0.1')
+        await core.auth.rootuser.setPasswd('root')
+
+        async with syntest.getHttpSess(auth=('root', 'root'), port=port) as sess:
+            yield sess, f'https://localhost:{port}'
+
+    async def httpStormCount(self, path: str, query: str, accept: str = None) -> int:
+        '''
+        Run a storm query via an HTTP storm API and return the number of items received.
+        '''
+        headers = {}
+        if accept is not None:
+            headers['Accept'] = accept
+
+        body = {'query': query, 'opts': self.opts}
+
+        count = 0
+        async with self.httpsess.post(f'{self.httpurl}{path}', json=body, headers=headers) as resp:
+
+            if accept == 'application/msgpack':
+                unpk = s_msgpack.Unpk()
+                async for byts in resp.content.iter_any():
+                    count += len(unpk.feed(byts))
+
+            elif accept == 'application/x-ndjson':
+                async for line in resp.content:
+                    json.loads(line)
+                    count += 1
+
+            else:
+                # the default stream is concatenated JSON objects
+                text = await resp.text()
+                offs = 0
+                decoder = json.JSONDecoder()
+                while offs < len(text):
+                    _, offs = decoder.raw_decode(text, offs)
+                    count += 1
+
+        return count
+
     @benchmark({'remote'})
     async def do00EmptyQuery(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
         for _ in range(self.workfactor // 10):
@@ -470,6 +530,22 @@ class Benchmarker:
         assert count == 0
         return self.workfactor
 
+    @benchmark({'remote'})
+    async def do09LiftDuringAddNodes(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        Lift by tag while another task is adding nodes to the same layer
+        '''
+        async def addnodes():
+            await prox.addFeedData('syn.nodes', self.testdata.asns2, viewiden=self.viewiden)
+
+        task = asyncio.create_task(addnodes())
+
+        count = await acount(prox.eval('inet:ipv4#even', opts=self.opts))
+        assert count == self.workfactor // 2
+
+        await task
+        return count
+
     @benchmark({'remote'})
     async def do10AutoAdds(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
         q = "inet:ipv4 $val=$lib.str.format('{num}.rev', num=$(1000000-$node.value())) [:dns:rev=$val]"
@@ -494,6 +570,51 @@ class Benchmarker:
         assert count == self.workfactor
         return self.workfactor
 
+    @benchmark({'http'})
+    async def do11TeleStormNodes(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        The telepath equivalent of the HTTP storm benchmarks.
+        '''
+        count = await acount(m async for m in prox.storm('inet:ipv4', opts=self.opts) if m[0] == 'node')
+        assert count == self.workfactor
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormJson(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm', 'inet:ipv4')
+        assert count == self.workfactor + 2
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormNdJson(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm', 'inet:ipv4', accept='application/x-ndjson')
+        assert count == self.workfactor + 2
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormMsgpack(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm', 'inet:ipv4', accept='application/msgpack')
+        assert count == self.workfactor + 2
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormNodesJson(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm/nodes', 'inet:ipv4')
+        assert count == self.workfactor
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormNodesNdJson(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm/nodes', 'inet:ipv4', accept='application/x-ndjson')
+        assert count == self.workfactor
+        return count
+
+    @benchmark({'http'})
+    async def do11HttpStormNodesMsgpack(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await self.httpStormCount('/api/v1/storm/nodes', 'inet:ipv4', accept='application/msgpack')
+        assert count == self.workfactor
+        return count
+
     async def run(self, name: str, testdirn: str, coro, do_profiling=False) -> None:
         for _ in range(self.num_iters):
             # We set up the cortex each time to avoid intra-cortex caching
@@ -529,6 +650,19 @@ class Benchmarker:
             funcs.append((funcname, func))
         return funcs
 
+    async def runProfiles(self) -> None:
+        '''
+        Run each of the profile queries once with the storm profiler enabled.
+        '''
+        for text in self.profqueries:
+            async with self.getCortexAndProxy() as (core, prox):
+                opts = {**self.opts, 'profile': True, 'editformat': 'none'}
+                async for mesg in prox.storm(text, opts=opts):
+                    if mesg[0] == 'profile':
+                        self.profiles.append((text, mesg[1]))
+                    elif mesg[0] == 'err':
+                        print(f'Error profiling {text!r}: {mesg[1]}')
+
     async def runSuite(self, numprocs: int, tmpdir: str = None, do_profiling=False):
         assert numprocs == 1
         if tmpdir is not None:
@@ -538,6 +672,19 @@ class Benchmarker:
             for funcname, func in self._getTrialFuncs():
                 await self.run(funcname, dirn, func, do_profiling=do_profiling)
 
+            await self.runProfiles()
+
+def printprofile(text: str, prof: Dict) -> None:
+    '''
+    Print the per-operator stats from a storm profile message.
+    '''
+    print(f'Profile {text!r}: {prof.get("took"):.3f}ms')
+    print(f'    {"took(ms)":>10} {"in":>8} {"out":>8} {"rows":>8} {"joins":>8}  oper')
+    for info in prof.get('opers', ()):
+        indent = '  ' * info.get('depth')
+        print(f'    {info.get("took"):10.3f} {info.get("nodes:in"):8d} {info.get("nodes:out"):8d} '
+              f'{info.get("rows"):8d} {info.get("joins"):8d}  {indent}{info.get("repr")}')
+
 ProgressBar = None
 
 def initProgress(total):
@@ -571,6 +718,7 @@ async def benchmarkAll(confignames: List = None,
                        tags: Sequence = None,
                        remote: str = None,
                        keep: bool = False,
+                       profqueries: Sequence = None,
                        ) -> None:
 
     if jsondir:
@@ -590,7 +738,7 @@ async def benchmarkAll(confignames: List = None,
                 tick = s_common.now()
                 config = Configs[configname]
                 bencher = Benchmarker(config, testdata, workfactor, num_iters=niters, tmpdir=tmpdir, bench=bench,
-                                      tags=tags)
+                                      tags=tags, profqueries=profqueries)
                 print(f'{num_procs}-process benchmarking: {configname}')
                 initProgress(niters * len(bencher._getTrialFuncs()))
                 try:
@@ -614,7 +762,8 @@ async def benchmarkAll(confignames: List = None,
                                 'configname': configname,
                                 'workfactor': workfactor,
                                 'niters': niters,
-                                'results': bencher.reportdata()
+                                'results': bencher.reportdata(),
+                                'profiles': bencher.profiles,
                                 }
                         fn = f'{s_time.repr(tick, pack=True)}_{configname}.json'
                         if jsonprefix:
@@ -642,6 +791,8 @@ def getParser():
     parser.add_argument('--do-profiling', action='store_true')
     parser.add_argument('--keep', action='store_true',
                         help='Whether to keep and use existing initial benchmark data')
+    parser.add_argument('--storm-profile', nargs='*', default=None, dest='profqueries',
+                        help='Storm queries to run once with the per-operator storm profiler after the benchmarks')
     return parser
 
 if __name__ == '__main__':
@@ -665,4 +816,4 @@ if __name__ == '__main__':
     asyncio.run(benchmarkAll(opts.config, 1, opts.workfactor, opts.tmpdir,
                              jsondir=opts.jsondir, jsonprefix=opts.jsonprefix,
                              niters=opts.niters, bench=opts.bench, do_profiling=opts.do_profiling, tags=opts.tags,
-                             remote=opts.remote, keep=opts.keep))
+                             remote=opts.remote, keep=opts.keep, profqueries=opts.profqueries))
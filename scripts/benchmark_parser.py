@@ -0,0 +1,80 @@
+import sys
+import time
+import argparse
+import statistics
+
+import synapse.lib.parser as s_parser
+
+from synapse.tests.test_lib_grammar import _Queries
+
+'''
+Benchmark storm grammar construction and parse throughput over the grammar test corpus
+'''
+
+def benchGrammar():
+    '''
+    Returns the number of seconds spent building the storm grammar.
+    '''
+    s_parser.getStormLark.cache_clear()
+
+    start = time.perf_counter()
+    s_parser.getStormLark()
+    return time.perf_counter() - start
+
+def benchParse(queries, niters):
+    '''
+    Returns a list of the number of seconds spent parsing each query ( the fastest of niters ).
+    '''
+    durs = []
+    for text in queries:
+
+        best = None
+        for _ in range(niters):
+
+            start = time.perf_counter()
+            s_parser.Parser(text).query()
+            dura = time.perf_counter() - start
+
+            if best is None or dura < best:
+                best = dura
+
+        durs.append((best, text))
+
+    return durs
+
+def getParser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--niters', type=int, default=3, help='Number of times to parse each query')
+    parser.add_argument('--top', type=int, default=5, help='Number of slowest queries to print')
+    parser.add_argument('--edits', type=int, default=100, help='Number of nodes in the generated edit block query')
+    return parser
+
+def main(argv):
+
+    opts = getParser().parse_args(argv)
+
+    print(f'grammar: {benchGrammar():.3f}s')
+
+    durs = benchParse(_Queries, opts.niters)
+
+    secs = [d[0] for d in durs]
+    size = sum(len(d[1]) for d in durs)
+    totl = sum(secs)
+
+    print(f'corpus: {len(durs)} queries, {size} chars in {totl:.3f}s '
+          f'({len(durs) / totl:.1f} queries/s, {size / totl:.0f} chars/s)')
+    print(f'corpus: mean {statistics.mean(secs) * 1000:.2f}ms median {statistics.median(secs) * 1000:.2f}ms')
+
+    for dura, text in sorted(durs, reverse=True)[:opts.top]:
+        print(f'    {dura * 1000:.2f}ms {text[:80]!r}')
+
+    edits = ' '.join(f'inet:ipv4={i} :asn={i} .seen=(2020, 2021) +#foo.bar' for i in range(opts.edits))
+    text = f'[ {edits} ]'
+
+    dura = benchParse((text,), opts.niters)[0][0]
+    print(f'edit block: {len(text)} chars in {dura:.3f}s')
+
+    return 0
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv[1:]))
@@ -1,3 +1,4 @@
+import zlib
 import asyncio
 import hashlib
 import logging
@@ -8,7 +9,9 @@ import synapse.common as s_common
 
 import synapse.lib.cell as s_cell
 import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
 import synapse.lib.const as s_const
+import synapse.lib.dyndeps as s_dyndeps
 import synapse.lib.share as s_share
 import synapse.lib.hashset as s_hashset
 import synapse.lib.httpapi as s_httpapi
@@ -20,6 +23,31 @@ logger = logging.getLogger(__name__)
 CHUNK_SIZE = 16 * s_const.mebibyte
 MAX_SPOOL_SIZE = CHUNK_SIZE * 32  # 512 mebibytes
 MAX_HTTP_UPLOAD_SIZE = 4 * s_const.tebibyte
+UPLOAD_BATCH_SIZE = 4 * s_const.mebibyte
+PUTMANY_MAX_SIZE = 16 * s_const.mebibyte
+
+# optional (faster) compression libraries for blob chunks
+zstd = s_dyndeps.getDynMod('zstandard')
+lz4frame = s_dyndeps.getDynMod('lz4.frame')
+
+def _initBlobCodecs():
+    '''
+    Return a dict of codec name to (compress, decompress) functions for the available codecs.
+    '''
+    codecs = {
+        'zlib': (zlib.compress, zlib.decompress),
+    }
+
+    if zstd is not None: # pragma: no cover
+        codecs['zstd'] = (lambda byts: zstd.ZstdCompressor().compress(byts),
+                          lambda byts: zstd.ZstdDecompressor().decompress(byts))
+
+    if lz4frame is not None: # pragma: no cover
+        codecs['lz4'] = (lz4frame.compress, lz4frame.decompress)
+
+    return codecs
+
+blobcodecs = _initBlobCodecs()
 
 class AxonHttpUploadV1(s_httpapi.StreamHandler):
 
@@ -32,13 +60,11 @@ class AxonHttpUploadV1(s_httpapi.StreamHandler):
         # max_body_size defaults to 100MB and requires a value
         self.request.connection.set_max_body_size(MAX_HTTP_UPLOAD_SIZE)
 
-        self.upfd = await self.cell.upload()
-        self.hashset = s_hashset.HashSet()
+        self.upfd = await self.cell.upload(hashnames=s_hashset.hashnames)
 
     async def data_received(self, chunk):
         if chunk is not None:
             await self.upfd.write(chunk)
-            self.hashset.update(chunk)
             await asyncio.sleep(0)
 
     def on_finish(self):
@@ -49,12 +75,15 @@ class AxonHttpUploadV1(s_httpapi.StreamHandler):
         self.on_finish()
 
     async def _save(self):
+        # save() resets the upload with a new hashset
+        hashset = self.upfd.hashset
+
         size, sha256b = await self.upfd.save()
 
-        fhashes = {htyp: hasher.hexdigest() for htyp, hasher in self.hashset.hashes}
+        fhashes = {htyp: hasher.hexdigest() for htyp, hasher in hashset.hashes}
 
         assert sha256b == s_common.uhex(fhashes.get('sha256'))
-        assert size == self.hashset.size
+        assert size == hashset.size
 
         fhashes['size'] = size
 
@@ -107,14 +136,24 @@ class AxonHttpDownloadV1(s_httpapi.Handler):
 
 class UpLoad(s_base.Base):
 
-    async def __anit__(self, axon):  # type: ignore
+    async def __anit__(self, axon, hashnames=('sha256',)):  # type: ignore
 
         await s_base.Base.__anit__(self)
 
         self.axon = axon
         self.fd = tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL_SIZE)
         self.size = 0
-        self.sha256 = hashlib.sha256()
+
+        # buffer small writes so hashing may be done off the ioloop in larger batches
+        self.pending = []
+        self.pendsize = 0
+
+        # the sha256 is always required to save the blob
+        if 'sha256' not in hashnames:
+            hashnames = ('sha256',) + tuple(hashnames)
+
+        self.hashnames = hashnames
+        self.hashset = s_hashset.HashSet(names=hashnames)
         self.onfini(self._uploadFini)
 
     def _uploadFini(self):
@@ -129,16 +168,41 @@ class UpLoad(s_base.Base):
             self.fd.truncate(0)
             self.fd.seek(0)
         self.size = 0
-        self.sha256 = hashlib.sha256()
+        self.pending.clear()
+        self.pendsize = 0
+        self.hashset = s_hashset.HashSet(names=self.hashnames)
 
     async def write(self, byts):
         self.size += len(byts)
-        self.sha256.update(byts)
-        self.fd.write(byts)
+        self.pending.append(byts)
+        self.pendsize += len(byts)
+
+        if self.pendsize >= UPLOAD_BATCH_SIZE:
+            await self._flushPending()
+
+    async def _flushPending(self):
+
+        if not self.pending:
+            return
+
+        byts = b''.join(self.pending)
+
+        self.pending.clear()
+        self.pendsize = 0
+
+        if len(byts) < s_hashset.THREAD_MIN_SIZE:
+            self.hashset.update(byts)
+            self.fd.write(byts)
+            return
+
+        # the spool file write may proceed in parallel with the hashes
+        await asyncio.gather(self.hashset.aupdate(byts), s_coro.executor(self.fd.write, byts))
 
     async def save(self):
 
-        sha256 = self.sha256.digest()
+        await self._flushPending()
+
+        sha256 = dict(self.hashset.digests()).get('sha256')
         rsize = self.size
 
         if await self.axon.has(sha256):
@@ -209,6 +273,18 @@ class AxonApi(s_cell.CellApi, s_share.Share):  # type: ignore
         await self._reqUserAllowed(('axon', 'upload'))
         return await self.cell.puts(files)
 
+    async def putmany(self, files):
+        await self._reqUserAllowed(('axon', 'upload'))
+
+        # each call is a single message, so larger files should be sent using upload()
+        size = sum(len(byts) for byts in files)
+        if size > PUTMANY_MAX_SIZE:
+            mesg = f'The files given to putmany() total more than {PUTMANY_MAX_SIZE} bytes.'
+            raise s_exc.BadArg(mesg=mesg, size=size, limit=PUTMANY_MAX_SIZE)
+
+        async for item in self.cell.putmany(files):
+            yield item
+
     async def upload(self):
         await self._reqUserAllowed(('axon', 'upload'))
         return await UpLoadShare.anit(self.cell, self.link)
@@ -217,14 +293,39 @@ class AxonApi(s_cell.CellApi, s_share.Share):  # type: ignore
         await self._reqUserAllowed(('axon', 'has'))
         return await self.cell.metrics()
 
+    @s_cell.adminapi(log=True)
+    async def recompress(self, codec=None, wait=True):
+        '''
+        Re-encode existing blob chunks using the given (or configured) compression codec.
+
+        Args:
+            codec (str): The codec name or None to use the axon:compress configuration.
+            wait (bool): On True, wait for the job to complete before returning.
+
+        Returns:
+            dict: The recompress job stats (or None if not waiting).
+        '''
+        return await self.cell.recompress(codec=codec, wait=wait)
+
 class Axon(s_cell.Cell):
 
     cellapi = AxonApi
 
+    confdefs = {
+        'axon:compress': {
+            'description': 'Compress new blob chunks with the given codec (zstd, lz4 or zlib). '
+                           'Unavailable codecs fall back to zlib.',
+            'type': ['string', 'null'],
+        },
+    }
+
     async def __anit__(self, dirn, conf=None):  # type: ignore
 
         await s_cell.Cell.__anit__(self, dirn, conf=conf)
 
+        self.recompressing = False
+        self.blobcodec = self._getBlobCodec(self.conf.get('axon:compress'))
+
         # share ourself via the cell dmon as "axon"
         # for potential default remote use
         self.dmon.share('axon', self)
@@ -241,6 +342,8 @@ class Axon(s_cell.Cell):
         self.axonmetrics = await node.dict()
         self.axonmetrics.setdefault('size:bytes', 0)
         self.axonmetrics.setdefault('file:count', 0)
+        # blobs stored prior to compression support were all stored raw
+        self.axonmetrics.setdefault('size:stored', self.axonmetrics.get('size:bytes'))
 
         self.addHealthFunc(self._axonHealth)
 
@@ -256,8 +359,57 @@ class Axon(s_cell.Cell):
         path = s_common.gendir(self.dirn, 'blob.lmdb')
         self.blobslab = await s_lmdbslab.Slab.anit(path)
         self.blobs = self.blobslab.initdb('blobs')
+        # blob chunk key -> codec name ( no entry means raw bytes )
+        self.blobcodecs = self.blobslab.initdb('codecs')
         self.onfini(self.blobslab.fini)
 
+    def _getBlobCodec(self, name):
+
+        if name is None:
+            return None
+
+        if name not in blobcodecs:
+            logger.warning(f'Axon blob codec {name} is not available, using zlib.')
+            return 'zlib'
+
+        return name
+
+    def _encBlobChunk(self, codec, byts):
+        '''
+        Returns (codec, byts) tuple for the chunk, using None if compression did not help.
+        '''
+        if codec is None:
+            return None, byts
+
+        comp = blobcodecs[codec][0](byts)
+        if len(comp) >= len(byts):
+            return None, byts
+
+        return codec, comp
+
+    async def _decBlobChunk(self, lkey, byts):
+
+        codec = self.blobslab.get(lkey, db=self.blobcodecs)
+        if codec is None:
+            return byts
+
+        decompress = blobcodecs.get(codec.decode())
+        if decompress is None:
+            mesg = f'Axon blob chunk requires unavailable codec: {codec.decode()}'
+            raise s_exc.NoSuchDecoder(mesg=mesg, codec=codec.decode())
+
+        return await s_coro.executor(decompress[1], byts)
+
+    def _putBlobChunk(self, lkey, codec, byts):
+
+        self.blobslab.put(lkey, byts, db=self.blobs)
+
+        if codec is None:
+            self.blobslab.delete(lkey, db=self.blobcodecs)
+            return
+
+        self.blobslab.put(lkey, codec.encode(), db=self.blobcodecs)
+
     def _initAxonHttpApi(self):
         self.addHttpApi('/api/v1/axon/files/put', AxonHttpUploadV1, {'cell': self})
         self.addHttpApi('/api/v1/axon/files/has/sha256/([0-9a-fA-F]{64}$)', AxonHttpHasV1, {'cell': self})
@@ -285,8 +437,8 @@ class Axon(s_cell.Cell):
 
     async def _get(self, sha256):
 
-        for _, byts in self.blobslab.scanByPref(sha256, db=self.blobs):
-            yield byts
+        for lkey, byts in self.blobslab.scanByPref(sha256, db=self.blobs):
+            yield await self._decBlobChunk(lkey, byts)
 
     async def put(self, byts):
         # Use a UpLoad context manager so that we can
@@ -297,10 +449,44 @@ class Axon(s_cell.Cell):
             return await fd.save()
 
     async def puts(self, files):
-        return [await self.put(b) for b in files]
+        return [item async for item in self.putmany(files)]
 
-    async def upload(self):
-        return await UpLoad.anit(self)
+    async def putmany(self, files):
+        '''
+        Save many files, yielding a (size, sha256) tuple as each one is saved.
+
+        Notes:
+            Small files are hashed inline and saved directly, while larger files
+            share a single UpLoad rather than constructing one per file.
+        '''
+        fd = None
+
+        try:
+
+            for byts in files:
+
+                if len(byts) < s_hashset.THREAD_MIN_SIZE:
+                    sha256 = hashlib.sha256(byts).digest()
+                    # empty files are saved without any chunks
+                    await self.save(sha256, [byts] if byts else [])
+                    yield len(byts), sha256
+                    continue
+
+                if fd is None:
+                    fd = await self.upload()
+
+                await fd.write(byts)
+                yield await fd.save()
+
+        finally:
+            if fd is not None:
+                await fd.fini()
+
+    async def upload(self, hashnames=('sha256',)):
+        '''
+        Construct an UpLoad which computes the given hashes as bytes are written.
+        '''
+        return await UpLoad.anit(self, hashnames=hashnames)
 
     async def has(self, sha256):
         return self.axonslab.get(sha256, db=self.sizes) is not None
@@ -314,28 +500,120 @@ class Axon(s_cell.Cell):
         if byts is not None:
             return int.from_bytes(byts, 'big')
 
-        size = await self._saveFileGenr(sha256, genr)
+        size, stored = await self._saveFileGenr(sha256, genr)
 
         self._addSyncItem((sha256, size))
 
         await self.axonmetrics.set('file:count', self.axonmetrics.get('file:count') + 1)
         await self.axonmetrics.set('size:bytes', self.axonmetrics.get('size:bytes') + size)
+        await self.axonmetrics.set('size:stored', self.axonmetrics.get('size:stored') + stored)
 
         self.axonslab.put(sha256, size.to_bytes(8, 'big'), db=self.sizes)
 
         return size
 
     async def _saveFileGenr(self, sha256, genr):
+        '''
+        Returns a (size, stored) tuple of the raw and on-disk blob sizes.
+        '''
         size = 0
+        stored = 0
+        codec = self.blobcodec
         for i, byts in enumerate(genr):
             size += len(byts)
             lkey = sha256 + i.to_bytes(8, 'big')
-            self.blobslab.put(lkey, byts, db=self.blobs)
+
+            if codec is not None:
+                chunkcodec, byts = await s_coro.executor(self._encBlobChunk, codec, byts)
+            else:
+                chunkcodec = None
+
+            stored += len(byts)
+            self._putBlobChunk(lkey, chunkcodec, byts)
             await asyncio.sleep(0)
-        return size
+        return size, stored
+
+    async def recompress(self, codec=None, wait=True):
+        '''
+        Re-encode existing blob chunks using the given (or configured) codec.
+
+        Args:
+            codec (str): The codec name or None to use the axon:compress configuration.
+            wait (bool): On True, wait for the job to complete before returning.
+
+        Returns:
+            dict: A dictionary of job stats ( or None if not waiting ).
+        '''
+        if self.recompressing:
+            raise s_exc.BadArg(mesg='A recompress job is already running.')
+
+        if codec is None:
+            codec = self.blobcodec
+
+        elif codec not in blobcodecs:
+            mesg = f'Axon blob codec {codec} is not available.'
+            raise s_exc.BadArg(mesg=mesg, codec=codec)
+
+        self.recompressing = True
+
+        task = self.schedCoro(self._recompressTask(codec))
+
+        def done(task):
+            self.recompressing = False
+
+        task.add_done_callback(done)
+
+        if wait:
+            return await task
+
+    async def _recompressTask(self, codec):
+
+        await self.boss.promote('axon:recompress', self.auth.rootuser, info={'codec': codec})
+
+        stats = {'codec': codec, 'files': 0, 'chunks': 0, 'before': 0, 'after': 0}
+
+        for _, (sha256, _) in self.axonseqn.iter(0):
+
+            indx = 0
+            while not self.isfini:
+
+                lkey = sha256 + indx.to_bytes(8, 'big')
+                indx += 1
+
+                byts = self.blobslab.get(lkey, db=self.blobs)
+                if byts is None:
+                    break
+
+                oldcodec = self.blobslab.get(lkey, db=self.blobcodecs)
+                if oldcodec is not None:
+                    oldcodec = oldcodec.decode()
+
+                if oldcodec == codec:
+                    continue
+
+                raw = await self._decBlobChunk(lkey, byts)
+                newcodec, newbyts = await s_coro.executor(self._encBlobChunk, codec, raw)
+
+                if newcodec == oldcodec:
+                    continue
+
+                self._putBlobChunk(lkey, newcodec, newbyts)
+
+                stats['chunks'] += 1
+                stats['before'] += len(byts)
+                stats['after'] += len(newbyts)
+
+                await self.axonmetrics.set('size:stored', self.axonmetrics.get('size:stored') - len(byts) + len(newbyts))
+
+            stats['files'] += 1
+            await asyncio.sleep(0)
+
+        logger.info(f'Axon recompress complete: {stats}')
+        return stats
 
     async def wants(self, sha256s):
         '''
         Given a list of sha256 bytes, returns a list of the hashes we want bytes for.
         '''
-        return [s for s in sha256s if not await self.has(s)]
+        have = set(lkey for (lkey, byts) in self.axonslab.getmulti(sha256s, db=self.sizes) if byts is not None)
+        return [s for s in sha256s if s not in have]
@@ -232,6 +232,7 @@ class StormCmd(s_cli.Cmd):
         --file <path>: Run the storm query specified in the given file path.
         --optsfile <path>: Run the query with the given options from a JSON/YAML file.
         --spawn: (EXPERIMENTAL!) Run the query within a spawned sub-process runtime (read-only).
+        --profile: Print the time, nodes, scanned rows, and joined nodes of each storm operator.
 
     Examples:
         storm inet:ipv4=1.2.3.4
@@ -255,6 +256,7 @@ class StormCmd(s_cli.Cmd):
         ('--debug', {}),
         ('--path', {}),
         ('--spawn', {'type': 'flag'}),
+        ('--profile', {}),
         ('--save-nodes', {'type': 'valu'}),
         ('query', {'type': 'glob'}),
     )
@@ -271,6 +273,7 @@ class StormCmd(s_cli.Cmd):
             'node:edits': self._onNodeEdits,
             'node:edits:count': self._onNodeEditsCount,
             'prov:new': self._onProvNew,
+            'profile': self._onProfile,
         }
         self._indented = False
 
@@ -352,6 +355,21 @@ class StormCmd(s_cli.Cmd):
         pers = float(count) / float(took / 1000)
         self.printf('complete. %d nodes in %d ms (%d/sec).' % (count, took, pers))
 
+    def _onProfile(self, mesg, opts):
+        took = mesg[1].get('took')
+        self.printf(f'profile: {took:.3f} ms')
+        self.printf(f'    {"took(ms)":>10} {"in":>8} {"out":>8} {"rows":>8} {"joins":>8}  oper')
+        for info in mesg[1].get('opers', ()):
+            indent = '  ' * info.get('depth')
+            self.printf(f'    {info.get("took"):10.3f} {info.get("nodes:in"):8d} {info.get("nodes:out"):8d} '
+                        f'{info.get("rows"):8d} {info.get("joins"):8d}  {indent}{info.get("repr")}')
+
+        graph = mesg[1].get('graph', ())
+        if graph:
+            self.printf(f'    {"took(ms)":>10} {"nodes":>8}  graph degree')
+            for info in graph:
+                self.printf(f'    {info.get("took"):10.3f} {info.get("nodes"):8d}  {info.get("degree")}')
+
     def _onPrint(self, mesg, opts):
         self.printf(mesg[1].get('mesg'))
 
@@ -432,6 +450,9 @@ class StormCmd(s_cli.Cmd):
         if opts.get('spawn'):
             stormopts['spawn'] = True
 
+        if opts.get('profile'):
+            stormopts['profile'] = True
+
         nodesfd = None
         if opts.get('save-nodes'):
             nodesfd = s_common.genfile(opts.get('save-nodes'))
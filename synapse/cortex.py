@@ -19,6 +19,7 @@ import synapse.lib.coro as s_coro
 import synapse.lib.hive as s_hive
 import synapse.lib.view as s_view
 import synapse.lib.cache as s_cache
+import synapse.lib.const as s_const
 import synapse.lib.layer as s_layer
 import synapse.lib.nexus as s_nexus
 import synapse.lib.queue as s_queue
@@ -54,6 +55,12 @@ A Cortex implements the synapse hypergraph object.
 
 reqver = '>=0.2.0,<3.0.0'
 
+# The approximate size in bytes of each AST node of a cached storm query
+QUERY_CACHE_ASTSIZE = 512
+
+def _getAstCount(astn):
+    return 1 + sum(_getAstCount(k) for k in astn.kids)
+
 class CoreApi(s_cell.CellApi):
     '''
     The CoreApi is exposed when connecting to a Cortex over Telepath.
@@ -432,6 +439,37 @@ class CoreApi(s_cell.CellApi):
         async for mesg in self.cell.storm(text, opts=opts):
             yield mesg
 
+    async def addStormCursor(self, text, opts=None):
+        '''
+        Run a storm query and spool the packed nodes it produces into a cursor which may be paged through.
+
+        Returns:
+            (dict): The cursor definition including the iden used to page through it.
+        '''
+        opts = self._reqValidStormOpts(opts)
+        return await self.cell.addStormCursor(text, opts=opts)
+
+    async def getStormCursor(self, iden, offs=0, size=100):
+        '''
+        Get a page of packed nodes from a storm cursor.
+
+        Returns:
+            (dict): The page of packed nodes with the offset of the next page (or None).
+        '''
+        return await self.cell.getStormCursor(iden, offs=offs, size=size, user=self.user)
+
+    async def getStormCursors(self):
+        '''
+        Get the definitions of the storm cursors owned by the user.
+        '''
+        return self.cell.getStormCursors(user=self.user)
+
+    async def delStormCursor(self, iden):
+        '''
+        Delete a storm cursor.
+        '''
+        return await self.cell.delStormCursor(iden, user=self.user)
+
     async def _execSpawnStorm(self, text, opts):
 
         view = self.cell._viewFromOpts(opts)
@@ -557,6 +595,20 @@ class CoreApi(s_cell.CellApi):
                 await asyncio.sleep(0)
             yield mesg
 
+    @s_cell.adminapi(log=True)
+    async def setUserStormBudget(self, iden, budget):
+        '''
+        Set (or clear with None) the default storm budget limits for a user.
+        '''
+        return await self.cell.setUserStormBudget(iden, budget)
+
+    @s_cell.adminapi(log=True)
+    async def setRoleStormBudget(self, iden, budget):
+        '''
+        Set (or clear with None) the default storm budget limits for a role.
+        '''
+        return await self.cell.setRoleStormBudget(iden, budget)
+
     async def spliceHistory(self):
         '''
         Yield splices backwards from the end of the splice log.
@@ -722,6 +774,10 @@ class CoreApi(s_cell.CellApi):
 
         return await self.cell.cloneLayer(iden, ldef)
 
+    @s_cell.adminapi(log=True)
+    async def compactLayer(self, iden):
+        return await self.cell.compactLayer(iden, user=self.user)
+
     async def getStormVar(self, name, default=None):
         self.user.confirm(('globals', 'get', name))
         return await self.cell.getStormVar(name, default=default)
@@ -778,6 +834,27 @@ class Cortex(s_cell.Cell):  # type: ignore
             'description': 'Whether nodeedits are logged in each layer.',
             'type': 'boolean'
         },
+        'layers:cache:size': {
+            'default': 256 * s_const.mebibyte,
+            'description': 'The approximate max size in bytes of the storage node cache shared by all layers.',
+            'type': 'integer',
+            'minimum': 0,
+        },
+        'layers:readthreads': {
+            'default': False,
+            'description': 'Whether new layers read index rows for lifts in worker threads by default.',
+            'type': 'boolean'
+        },
+        'layers:syncthread': {
+            'default': False,
+            'description': 'Whether new layers flush committed writes to disk from a writer thread by default.',
+            'type': 'boolean'
+        },
+        'layers:columns': {
+            'default': False,
+            'description': 'Whether new layers store int, time, guid, and ival property values in columns by default.',
+            'type': 'boolean'
+        },
         'provenance:en': {
             'default': False,
             'description': 'Enable provenance tracking for all writes.',
@@ -803,6 +880,35 @@ class Cortex(s_cell.Cell):  # type: ignore
             'description': 'Logging log level to emit storm logs at.',
             'type': 'integer'
         },
+        'storm:query:cache:size': {
+            'default': 64 * s_const.mebibyte,
+            'description': 'The approximate max size in bytes of the cache of parsed storm queries.',
+            'type': 'integer',
+            'minimum': 0,
+        },
+        'storm:query:autoparam': {
+            'default': False,
+            'description': 'Cache one parsed query for storm queries which only differ by their literal values.',
+            'type': 'boolean'
+        },
+        'storm:cursor:ttl': {
+            'default': 600,
+            'description': 'The number of seconds a storm cursor is kept after it was last used.',
+            'type': 'integer',
+            'minimum': 1,
+        },
+        'storm:cursor:nodes': {
+            'default': 100000,
+            'description': 'The max number of nodes a user may hold across their storm cursors.',
+            'type': 'integer',
+            'minimum': 1,
+        },
+        'storm:cursor:spool': {
+            'default': 1000,
+            'description': 'The max number of nodes a storm cursor holds in memory before spooling them to disk.',
+            'type': 'integer',
+            'minimum': 1,
+        },
     }
 
     cellapi = CoreApi
@@ -827,6 +933,10 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         self.views = {}
         self.layers = {}
+
+        # a storage node cache shared by all the layers in the cortex
+        self.sodecache = s_cache.SlruCache(self.conf.get('layers:cache:size'))
+        self.querycache = s_cache.SlruCache(self.conf.get('storm:query:cache:size'))
         self.modules = {}
         self.splicers = {}
         self.feedfuncs = {}
@@ -896,6 +1006,8 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         self.stormdmons = await s_storm.DmonManager.anit(self)
         self.onfini(self.stormdmons)
+        self.stormcursors = await s_storm.CursorManager.anit(self)
+        self.onfini(self.stormcursors)
         self.agenda = await s_agenda.Agenda.anit(self)
         self.onfini(self.agenda)
         await self._initStormDmons()
@@ -1039,6 +1151,8 @@ class Cortex(s_cell.Cell):  # type: ignore
             'conf': {
                 'storm:log': self.conf.get('storm:log', False),
                 'storm:log:level': self.conf.get('storm:log:level', logging.INFO),
+                'storm:query:cache:size': self.conf.get('storm:query:cache:size'),
+                'storm:query:autoparam': self.conf.get('storm:query:autoparam'),
                 'trigger:enable': self.conf.get('trigger:enable', True),
             },
             'loglevel': logger.getEffectiveLevel(),
@@ -1949,6 +2063,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.addStormCmd(s_storm.MaxCmd)
         self.addStormCmd(s_storm.MinCmd)
         self.addStormCmd(s_storm.TeeCmd)
+        self.addStormCmd(s_storm.ParallelCmd)
         self.addStormCmd(s_storm.TreeCmd)
         self.addStormCmd(s_storm.HelpCmd)
         self.addStormCmd(s_storm.IdenCmd)
@@ -2043,6 +2158,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.addHttpApi('/api/v1/storm', s_httpapi.StormV1, {'cell': self})
         self.addHttpApi('/api/v1/watch', s_httpapi.WatchSockV1, {'cell': self})
         self.addHttpApi('/api/v1/storm/nodes', s_httpapi.StormNodesV1, {'cell': self})
+        self.addHttpApi('/api/v1/storm/cursor', s_httpapi.StormCursorV1, {'cell': self})
         self.addHttpApi('/api/v1/reqvalidstorm', s_httpapi.ReqValidStormV1, {'cell': self})
 
         self.addHttpApi('/api/v1/storm/vars/set', s_httpapi.StormVarsSetV1, {'cell': self})
@@ -2486,6 +2602,9 @@ class Cortex(s_cell.Cell):  # type: ignore
         ldef.setdefault('creator', self.auth.rootuser.iden)
         ldef.setdefault('lockmemory', self.conf.get('layers:lockmemory'))
         ldef.setdefault('logedits', self.conf.get('layers:logedits'))
+        ldef.setdefault('readthreads', self.conf.get('layers:readthreads'))
+        ldef.setdefault('syncthread', self.conf.get('layers:syncthread'))
+        ldef.setdefault('columns', self.conf.get('layers:columns'))
         ldef.setdefault('readonly', False)
 
         s_layer.reqValidLdef(ldef)
@@ -2534,6 +2653,9 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.layers[layr.iden] = layr
         self.dynitems[layr.iden] = layr
 
+        # spawn processes must reopen the layer once a compaction is swapped in
+        layr.on('layer:compact:swap', self._onEvtBumpSpawnPool)
+
         await self.auth.addAuthGate(layr.iden, 'layer')
 
         await self.bumpSpawnPool()
@@ -2550,7 +2672,8 @@ class Cortex(s_cell.Cell):  # type: ignore
         # In case that we're a mirror follower and we have a downstream layer, disable upstream sync
         # TODO allow_upstream needs to be separated out
         mirror = self.conf.get('mirror')
-        return await s_layer.Layer.anit(layrinfo, path, nexsroot=self.nexsroot, allow_upstream=not mirror)
+        return await s_layer.Layer.anit(layrinfo, path, nexsroot=self.nexsroot, allow_upstream=not mirror,
+                                        sodecache=self.sodecache)
 
     async def _initCoreLayers(self):
         node = await self.hive.open(('cortex', 'layers'))
@@ -2613,6 +2736,29 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         return copylayr.pack()
 
+    async def compactLayer(self, iden, user=None):
+        '''
+        Compact the storage of a Layer in the cortex while it remains online.
+
+        Args:
+            iden (str): Layer iden to compact
+            user (Optional[User]): The user to run the compaction task as
+
+        Returns:
+            (dict): The size of the layer storage before and after compaction.
+        '''
+        layr = self.layers.get(iden, None)
+        if layr is None:
+            raise s_exc.NoSuchLayer(iden=iden)
+
+        if user is None:
+            user = self.auth.rootuser
+
+        # the compaction continues in the background if the caller goes away
+        info = {'layer': iden}
+        task = await self.boss.execute(layr.compact(info=info), 'layer:compact', user, info=info)
+        return await asyncio.shield(task.task)
+
     def addStormCmd(self, ctor):
         '''
         Add a synapse.lib.storm.Cmd class to the cortex.
@@ -2886,6 +3032,43 @@ class Cortex(s_cell.Cell):  # type: ignore
         opts.setdefault('user', self.auth.rootuser.iden)
         return opts
 
+    async def setUserStormBudget(self, iden, budget):
+        '''
+        Set the default storm budget limits for a user.
+
+        Args:
+            iden (str): The user iden.
+            budget (dict): A dictionary of budget limits or None to remove them.
+        '''
+        if budget is not None:
+            s_storm.reqValidBudget(budget)
+        await self.auth.setUserInfo(iden, 'storm:budget', budget)
+
+    async def setRoleStormBudget(self, iden, budget):
+        '''
+        Set the default storm budget limits for a role.
+
+        Args:
+            iden (str): The role iden.
+            budget (dict): A dictionary of budget limits or None to remove them.
+        '''
+        if budget is not None:
+            s_storm.reqValidBudget(budget)
+        await self.auth.setRoleInfo(iden, 'storm:budget', budget)
+
+    def _initStormBudget(self, opts, user):
+        '''
+        Limit the storm budget requested in opts by the budget set for the user and their roles.
+        '''
+        budget = s_storm.getStormBudget(user, opts.get('budget'))
+        if not budget:
+            return opts
+
+        # copy the opts so a caller which re-uses them does not have its budget lowered
+        opts = dict(opts)
+        opts['budget'] = budget
+        return opts
+
     def _viewFromOpts(self, opts):
 
         user = self._userFromOpts(opts)
@@ -2979,13 +3162,105 @@ class Cortex(s_cell.Cell):  # type: ignore
     async def stormlist(self, text, opts=None):
         return [m async for m in self.storm(text, opts=opts)]
 
-    @s_cache.memoize(size=10000)
+    async def addStormCursor(self, text, opts=None):
+        '''
+        Run a storm query and spool the packed nodes it produces into a cursor.
+
+        Args:
+            text (str): Storm query text.
+            opts (dict): Storm query options.
+
+        Returns:
+            (dict): The cursor definition including the iden used to page through it.
+        '''
+        opts = self._initStormOpts(opts)
+
+        user = self._userFromOpts(opts)
+        view = self._viewFromOpts(opts)
+
+        curs = await self.stormcursors.addCursor(view, text, opts, user)
+        return curs.pack()
+
+    async def getStormCursor(self, iden, offs=0, size=100, user=None):
+        '''
+        Get a page of packed nodes from a storm cursor.
+
+        Args:
+            iden (str): The cursor iden.
+            offs (int): The offset of the first node in the page.
+            size (int): The max number of nodes in the page.
+            user (HiveUser): The user which must own the cursor (or be an admin).
+
+        Returns:
+            (dict): The page of packed nodes with the offset of the next page (or None).
+        '''
+        curs = self.stormcursors.reqCursor(iden, user=user)
+        return await curs.getPage(offs, size)
+
+    def getStormCursors(self, user=None):
+        '''
+        Get the definitions of the storm cursors (optionally only those owned by a user).
+        '''
+        return self.stormcursors.getCursorDefs(user=user)
+
+    async def delStormCursor(self, iden, user=None):
+        '''
+        Delete a storm cursor.
+        '''
+        self.stormcursors.reqCursor(iden, user=user)
+        await self.stormcursors.popCursor(iden)
+
     def getStormQuery(self, text, mode='storm'):
         '''
         Parse storm query text and return a Query object.
         '''
+        query = self.querycache.get((mode, text))
+        if query is not None:
+            return query
+
+        if mode == 'storm' and self.conf.get('storm:query:autoparam'):
+            query = self._getParamStormQuery(text)
+            if query is not None:
+                return query
+
         query = copy.deepcopy(s_parser.parseQuery(text, mode=mode))
         query.init(self)
+
+        size = len(text) + _getAstCount(query) * QUERY_CACHE_ASTSIZE
+        self.querycache.put((mode, text), query, size)
+
+        return query
+
+    def _getParamStormQuery(self, text):
+        '''
+        Get a Query object from the cached parse of a query which only differs by its literal values.
+        '''
+        params = s_parser.getQueryParams(text)
+        if not params:
+            return None
+
+        key = ('param', s_parser.getParamText(text, params))
+
+        pque = self.querycache.get(key)
+        if pque is None:
+
+            pque = s_parser.parseParamQuery(text, params)
+            if pque is None:
+                # remember that the literal values of this query may not be replaced
+                self.querycache.put(key, False, len(key[1]))
+                return None
+
+            size = len(key[1]) + _getAstCount(pque.query) * QUERY_CACHE_ASTSIZE
+            self.querycache.put(key, pque, size)
+
+        if not pque:
+            return None
+
+        query = pque.fill(text, params)
+        if query is None:
+            return None
+
+        query.init(self)
         return query
 
     async def reqValidStorm(self, text, opts=None):
@@ -3220,6 +3495,8 @@ class Cortex(s_cell.Cell):  # type: ignore
             'iden': self.iden,
             'layer': await self.getLayer().stat(),
             'formcounts': await self.getFormCounts(),
+            'sodecache': self.sodecache.stat(),
+            'querycache': self.querycache.stat(),
         }
         return stats
 
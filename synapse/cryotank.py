@@ -2,24 +2,64 @@ import os
 import shutil
 import asyncio
 import logging
+import itertools
 
 import synapse.exc as s_exc
 import synapse.common as s_common
 
 import synapse.lib.base as s_base
 import synapse.lib.cell as s_cell
+import synapse.lib.const as s_const
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.slabseqn as s_slabseqn
 import synapse.lib.slaboffs as s_slaboffs
 
 logger = logging.getLogger(__name__)
 
+# tank conf options which are not passed through to the slab
+tankopts = (
+    'indx:fields',
+    'seg:maxsize',
+    'trim:maxage',
+    'trim:maxsize',
+    'trim:offsets',
+)
+
+SEG_MAXSIZE = s_const.mebibyte * 256
+TRIM_PERIOD = 60
+
+def _getFieldValu(item, path):
+    '''
+    Resolve a "/" separated field path within an item ( or return None ).
+    '''
+    valu = item
+    for name in path.split('/'):
+
+        if isinstance(valu, dict):
+            valu = valu.get(name)
+
+        elif isinstance(valu, (list, tuple)) and name.isdigit() and int(name) < len(valu):
+            valu = valu[int(name)]
+
+        else:
+            return None
+
+        if valu is None:
+            return None
+
+    return valu
+
 class TankApi(s_cell.CellApi):
 
     async def slice(self, offs, size=None, iden=None):
         async for item in self.cell.slice(offs, size=size, iden=iden):
             yield item
 
+    async def query(self, offs=0, size=None, tick=None, tock=None, fields=None):
+        async for item in self.cell.query(offs=offs, size=size, tick=tick, tock=tock, fields=fields):
+            yield item
+
     async def puts(self, items, seqn=None):
         return await self.cell.puts(items, seqn=seqn)
 
@@ -30,9 +70,37 @@ class TankApi(s_cell.CellApi):
     async def offset(self, iden):
         return self.cell.getOffset(iden)
 
+    @s_cell.adminapi(log=True)
+    async def trim(self):
+        return await self.cell.trim()
+
     async def iden(self):
         return await self.cell.iden()
 
+class CryoSeg:
+    '''
+    A contiguous range of CryoTank items stored in a single slab.
+    '''
+    def __init__(self, base, slab, path=None):
+
+        self.base = base
+        self.slab = slab
+        self.path = path
+
+        self.size = 0
+        self.time = 0
+        self.readers = 0
+
+        self.items = s_slabseqn.SlabSeqn(slab, 'items')
+        if self.items.indx < base:
+            self.items.indx = base
+
+        # field abrv + buid(valu) -> offset(s)
+        self.byfield = slab.initdb('indx:byfield', dupsort=True)
+
+    def pack(self):
+        return {'size': self.size, 'time': self.time, 'legacy': self.path is None}
+
 class CryoTank(s_base.Base):
     '''
     A CryoTank implements a stream of structured data.
@@ -51,14 +119,269 @@ class CryoTank(s_base.Base):
 
         path = s_common.gendir(self.dirn, 'tank.lmdb')
 
-        self.slab = await s_lmdbslab.Slab.anit(path, map_async=True, **conf)
+        self.slabconf = {k: v for (k, v) in conf.items() if k not in tankopts}
+        self.slab = await s_lmdbslab.Slab.anit(path, map_async=True, **self.slabconf)
 
         self.offs = s_slaboffs.SlabOffs(self.slab, 'offsets')
-        self._items = s_slabseqn.SlabSeqn(self.slab, 'items')
         self._metrics = s_slabseqn.SlabSeqn(self.slab, 'metrics')
 
         self.onfini(self.slab.fini)
 
+        await self._initTankSegs()
+
+        self._initTankIndexes()
+
+        if any(conf.get(name) for name in ('trim:maxage', 'trim:maxsize', 'trim:offsets')):
+            self.schedCoro(self._trimLoop())
+
+    async def _initTankSegs(self):
+
+        self.segs = []
+        self.segmaxsize = self.conf.get('seg:maxsize', SEG_MAXSIZE)
+
+        # segment base offset -> segment info
+        self.seginfo = self.slab.initdb('segs')
+
+        async def fini():
+            for seg in self.segs:
+                if seg.path is not None:
+                    await seg.slab.fini()
+
+        self.onfini(fini)
+
+        for lkey, lval in self.slab.scanByFull(db=self.seginfo):
+
+            base = s_common.int64un(lkey)
+            info = s_msgpack.un(lval)
+
+            if info.get('legacy'):
+                seg = CryoSeg(base, self.slab)
+            else:
+                seg = await self._openTankSeg(base)
+
+            seg.size = info.get('size', 0)
+            seg.time = info.get('time', 0)
+            self.segs.append(seg)
+
+        if self.segs:
+            return
+
+        # items from before segments were introduced remain in the main slab
+        if self.slab.dbexists('items'):
+
+            seg = CryoSeg(0, self.slab)
+            if seg.items.index() > 0:
+
+                for _, metrics in self._metrics.iter(0):
+                    seg.size += metrics['size']
+                    seg.time = metrics['time']
+
+                self._putTankSeg(seg)
+                self.segs.append(seg)
+
+        await self._addTankSeg(self._nextOffs())
+
+    async def _openTankSeg(self, base):
+        path = s_common.gendir(self.dirn, 'segs', f'{base:020d}.lmdb')
+        slab = await s_lmdbslab.Slab.anit(path, map_async=True, **self.slabconf)
+        return CryoSeg(base, slab, path=path)
+
+    async def _addTankSeg(self, base):
+
+        seg = await self._openTankSeg(base)
+
+        self._putTankSeg(seg)
+        self.segs.append(seg)
+
+        return seg
+
+    def _putTankSeg(self, seg):
+        self.slab.put(s_common.int64en(seg.base), s_msgpack.en(seg.pack()), db=self.seginfo)
+
+    async def _delTankSeg(self, seg):
+
+        logger.info(f'Removing tank segment starting at offset {seg.base}')
+
+        self.segs.remove(seg)
+        self.slab.delete(s_common.int64en(seg.base), db=self.seginfo)
+
+        if seg.path is None:
+            self.slab.dropdb('items')
+            self.slab.dropdb('indx:byfield')
+        else:
+            await seg.slab.trash()
+
+        # remove the ingest time rows which refer to the removed segment
+        first = self.segs[0].base
+        for lkey, _ in self.slab.scanByFull(db=self.bytime):
+
+            if s_common.int64un(lkey[8:]) >= first:
+                break
+
+            self.slab.delete(lkey, db=self.bytime)
+
+    def _nextOffs(self):
+        if not self.segs:
+            return 0
+        return self.segs[-1].items.index()
+
+    def _getTankSegs(self, offs):
+        '''
+        Return the list of segments which contain items at or after offs.
+        '''
+        for i in range(len(self.segs) - 1, 0, -1):
+            if self.segs[i].base <= offs:
+                return self.segs[i:]
+
+        return list(self.segs)
+
+    def _getTankItem(self, offs):
+        return self._getTankSegs(offs)[0].items.get(offs)
+
+    def _iterTankRows(self, offs, raw=False):
+        '''
+        Yield (indx, item) tuples across segments starting at offs.
+        '''
+        for seg in self._getTankSegs(offs):
+
+            seg.readers += 1
+
+            try:
+
+                genr = seg.items.rows(offs) if raw else seg.items.iter(offs)
+                for item in genr:
+                    yield item
+
+            finally:
+                seg.readers -= 1
+
+    async def trim(self):
+        '''
+        Apply the retention policies for the CryoTank.
+
+        Notes:
+            Items are removed by deleting entire segments, and the
+            segment currently being written to is never removed.
+
+        Returns:
+            int: The number of segments which were removed.
+        '''
+        maxage = self.conf.get('trim:maxage')
+        maxsize = self.conf.get('trim:maxsize')
+
+        minoffs = None
+        if self.conf.get('trim:offsets'):
+            offsets = [s_common.int64un(byts) for (_, byts) in self.slab.scanByFull(db=self.offs.db)]
+            if offsets:
+                minoffs = min(offsets)
+
+        tick = s_common.now()
+        size = sum(seg.size for seg in self.segs)
+
+        count = 0
+        while len(self.segs) > 1:
+
+            seg = self.segs[0]
+            if seg.readers:
+                break
+
+            if not any((
+                maxage is not None and seg.time < tick - maxage,
+                maxsize is not None and size > maxsize,
+                minoffs is not None and minoffs >= self.segs[1].base,
+            )):
+                break
+
+            await self._delTankSeg(seg)
+
+            size -= seg.size
+            count += 1
+
+        return count
+
+    async def _trimLoop(self):
+
+        while not self.isfini:
+
+            try:
+                await self.trim()
+
+            except asyncio.CancelledError:  # pragma: no cover
+                raise
+
+            except Exception:  # pragma: no cover
+                logger.exception('CryoTank trim failed')
+
+            await self.waitfini(timeout=TRIM_PERIOD)
+
+    def _initTankIndexes(self):
+
+        # ingest time + first offset of each puts() chunk
+        self.bytime = self.slab.initdb('indx:bytime')
+
+        self.fieldabrv = self.slab.getNameAbrv('indx:fields')
+
+        # the offset each field has been indexed up to
+        self.fieldoffs = s_lmdbslab.SlabDict(self.slab, db=self.slab.initdb('indx:fieldoffs'))
+
+        if self.slab.last(db=self.bytime) is None:
+            rows = [(s_common.int64en(m['time']) + s_common.int64en(m['orig']), b'') for (_, m) in self._metrics.iter(0)]
+            if rows:
+                self.slab.putmulti(rows, db=self.bytime)
+
+        self.indxfields = tuple(self.conf.get('indx:fields', ()))
+
+        for field in self.indxfields:
+            self.fieldabrv.setBytsToAbrv(field.encode())
+            if not self._isFieldIndexed(field):
+                self.schedCoro(self._indxFieldTask(field))
+
+    def _indxFieldRows(self, field, offs, items):
+        abrv = self.fieldabrv.nameToAbrv(field)
+
+        rows = []
+        for indx, item in enumerate(items, start=offs):
+
+            valu = _getFieldValu(item, field)
+            if valu is None:
+                continue
+
+            rows.append((abrv + s_common.buid(valu), s_common.int64en(indx)))
+
+        return rows
+
+    async def _indxFieldTask(self, field):
+        '''
+        Index any existing items for a newly configured field.
+        '''
+        logger.info(f'Indexing field {field} from offset {self.fieldoffs.get(field, 0)}')
+
+        while not self.isfini:
+
+            offs = self.fieldoffs.get(field, 0)
+            if offs >= self._nextOffs():
+                break
+
+            segs = self._getTankSegs(offs)
+
+            chunk = list(itertools.islice(segs[0].items.iter(offs), 1000))
+            if not chunk:
+                # skip to the next segment
+                self.fieldoffs.set(field, segs[1].base if len(segs) > 1 else self._nextOffs())
+                continue
+
+            rows = self._indxFieldRows(field, chunk[0][0], [item for (_, item) in chunk])
+            segs[0].slab.putmulti(rows, dupdata=True, db=segs[0].byfield)
+
+            self.fieldoffs.set(field, chunk[-1][0] + 1)
+
+            await asyncio.sleep(0)
+
+        logger.info(f'Indexing field {field} complete')
+
+    def _isFieldIndexed(self, field):
+        return field in self.indxfields and self.fieldoffs.get(field, 0) >= self._nextOffs()
+
     async def iden(self):
         return self._iden
 
@@ -98,7 +421,10 @@ class CryoTank(s_base.Base):
         '''
         Return an (offset, item) tuple for the last element in the tank ( or None ).
         '''
-        return self._items.last()
+        for seg in reversed(self.segs):
+            last = seg.items.last()
+            if last is not None:
+                return last
 
     async def puts(self, items, seqn=None):
         '''
@@ -114,8 +440,22 @@ class CryoTank(s_base.Base):
         size = 0
 
         for chunk in s_common.chunks(items, 1000):
-            metrics = self._items.save(chunk)
+
+            seg = self.segs[-1]
+            if seg.size >= self.segmaxsize:
+                seg = await self._addTankSeg(self._nextOffs())
+
+            fields = [f for f in self.indxfields if self._isFieldIndexed(f)]
+
+            metrics = seg.items.save(chunk)
             self._metrics.add(metrics)
+
+            seg.size += metrics['size']
+            seg.time = metrics['time']
+            self._putTankSeg(seg)
+
+            self._indxChunk(seg, metrics, fields, chunk)
+
             await self.fire('cryotank:puts', numrecords=len(chunk))
             size += len(chunk)
             await asyncio.sleep(0)
@@ -124,8 +464,120 @@ class CryoTank(s_base.Base):
             iden, offs = seqn
             self.setOffset(iden, offs + size)
 
+        if len(self.segs) > 1 and any(self.conf.get(n) for n in ('trim:maxsize', 'trim:offsets')):
+            await self.trim()
+
         return size
 
+    def _indxChunk(self, seg, metrics, fields, chunk):
+
+        offs = metrics['orig']
+
+        lkey = s_common.int64en(metrics['time']) + s_common.int64en(offs)
+        self.slab.put(lkey, b'', db=self.bytime)
+
+        for field in fields:
+            rows = self._indxFieldRows(field, offs, chunk)
+            if rows:
+                seg.slab.putmulti(rows, dupdata=True, db=seg.byfield)
+            self.fieldoffs.set(field, metrics['indx'])
+
+    def _getTimeOffs(self, tick):
+        '''
+        Return the first offset ingested at or after tick ( or None ).
+        '''
+        for lkey, _ in self.slab.scanByRange(s_common.int64en(tick), db=self.bytime):
+            return s_common.int64un(lkey[8:])
+
+    async def query(self, offs=0, size=None, tick=None, tock=None, fields=None):
+        '''
+        Yield (indx, item) tuples from the CryoTank which match the query.
+
+        Args:
+            offs (int): The minimum offset.
+            size (int): The max number of items to yield.
+            tick (int): The minimum ingest time (epoch millis).
+            tock (int): The maximum ingest time (epoch millis).
+            fields (dict): A dict of "/" separated field paths and values which must match.
+
+        Notes:
+            Ingest times are recorded per puts() chunk, and configured indx:fields
+            are used to seek directly to matching items.
+
+        Yields:
+            ((int, object)): Index and item values.
+        '''
+        if fields is None:
+            fields = {}
+
+        fields = {name: s_common.buid(valu) for (name, valu) in fields.items()}
+
+        maxoffs = None
+
+        if tick is not None:
+            tickoffs = self._getTimeOffs(tick)
+            if tickoffs is None:
+                return
+            offs = max(offs, tickoffs)
+
+        if tock is not None:
+            maxoffs = self._getTimeOffs(tock + 1)
+
+        def matches(item):
+            for name, buid in fields.items():
+                valu = _getFieldValu(item, name)
+                if valu is None or s_common.buid(valu) != buid:
+                    return False
+            return True
+
+        def genr():
+
+            indxd = [name for name in fields.keys() if self._isFieldIndexed(name)]
+            if not indxd:
+                for indx, item in self._iterTankRows(offs):
+                    if maxoffs is not None and indx >= maxoffs:
+                        return
+                    yield indx, item
+                return
+
+            name = indxd[0]
+            lkey = self.fieldabrv.nameToAbrv(name) + fields[name]
+
+            for seg in self._getTankSegs(offs):
+
+                seg.readers += 1
+
+                try:
+
+                    for _, byts in seg.slab.scanByDups(lkey, db=seg.byfield):
+
+                        indx = s_common.int64un(byts)
+                        if indx < offs:
+                            continue
+
+                        if maxoffs is not None and indx >= maxoffs:
+                            return
+
+                        yield indx, seg.items.get(indx)
+
+                finally:
+                    seg.readers -= 1
+
+        count = 0
+        for scanned, (indx, item) in enumerate(genr(), start=1):
+
+            if scanned % 1000 == 0:
+                await asyncio.sleep(0)
+
+            if not matches(item):
+                continue
+
+            yield indx, item
+
+            count += 1
+            if size is not None and count >= size:
+                return
+
     async def metrics(self, offs, size=None):
         '''
         Yield metrics rows starting at offset.
@@ -158,7 +610,7 @@ class CryoTank(s_base.Base):
         if iden is not None:
             self.setOffset(iden, offs)
 
-        for i, (indx, item) in enumerate(self._items.iter(offs)):
+        for i, (indx, item) in enumerate(self._iterTankRows(offs)):
 
             if size is not None and i >= size:
                 return
@@ -179,7 +631,7 @@ class CryoTank(s_base.Base):
         if iden is not None:
             self.setOffset(iden, offs)
 
-        for i, (indx, byts) in enumerate(self._items.rows(offs)):
+        for i, (indx, byts) in enumerate(self._iterTankRows(offs, raw=True)):
 
             if size is not None and i >= size:
                 return
@@ -193,8 +645,16 @@ class CryoTank(s_base.Base):
         Returns:
             dict: A dict containing items and metrics indexes.
         '''
-        stat = self._items.stat()
-        return {'indx': self._items.index(), 'metrics': self._metrics.index(), 'stat': stat}
+        stat = {}
+        for seg in self.segs:
+            for name, valu in seg.items.stat().items():
+                if name in ('psize', 'depth'):
+                    stat[name] = max(stat.get(name, 0), valu)
+                else:
+                    stat[name] = stat.get(name, 0) + valu
+
+        segs = [{'offs': seg.base, 'size': seg.size, 'time': seg.time} for seg in self.segs]
+        return {'indx': self._nextOffs(), 'metrics': self._metrics.index(), 'stat': stat, 'segs': segs}
 
 class CryoApi(s_cell.CellApi):
     '''
@@ -236,6 +696,16 @@ class CryoApi(s_cell.CellApi):
         async for item in tank.metrics(offs, size=size):
             yield item
 
+    async def query(self, name, offs=0, size=None, tick=None, tock=None, fields=None):
+        tank = await self.cell.init(name)
+        async for item in tank.query(offs=offs, size=size, tick=tick, tock=tock, fields=fields):
+            yield item
+
+    @s_cell.adminapi(log=True)
+    async def trim(self, name):
+        tank = await self.cell.init(name)
+        return await tank.trim()
+
     @s_cell.adminapi(log=True)
     async def delete(self, name):
         return await self.cell.delete(name)
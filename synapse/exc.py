@@ -234,6 +234,7 @@ class StepTimeout(SynErr):
 
 class StormRuntimeError(SynErr): pass
 class StormVarListError(StormRuntimeError): pass
+class StormBudgetExceeded(StormRuntimeError): pass
 
 class TeleRedir(SynErr): pass
 
@@ -1,3 +1,4 @@
+import time
 import types
 import asyncio
 import fnmatch
@@ -16,7 +17,6 @@ import synapse.lib.node as s_node
 import synapse.lib.cache as s_cache
 import synapse.lib.types as s_types
 import synapse.lib.scrape as s_scrape
-import synapse.lib.spooled as s_spooled
 import synapse.lib.provenance as s_provenance
 import synapse.lib.stormtypes as s_stormtypes
 
@@ -132,9 +132,17 @@ class Query(AstNode):
         # for options parsed from the query itself
         self.opts = {}
 
+        # ( uses $path, command names ) used to check if paths must keep their node history
+        self.pathinfo = None
+
     async def run(self, runt, genr):
 
         for oper in self.kids:
+
+            if runt.profiler is not None:
+                genr = runt.profiler.iterOper(oper, runt, genr)
+                continue
+
             genr = oper.run(runt, genr)
 
         async for node, path in genr:
@@ -143,6 +151,50 @@ class Query(AstNode):
 
             yield node, path
 
+    def usesPath(self, core):
+        '''
+        Returns True if the query may use the node history of its paths.
+        '''
+        if self.pathinfo is None:
+            self.pathinfo = self._getPathInfo()
+
+        usesvar, cmdnames = self.pathinfo
+        if usesvar:
+            return True
+
+        # pure storm commands ( and commands such as macro.exec ) run on the paths of the calling query
+        for name in cmdnames:
+            ctor = core.getStormCmd(name)
+            if not isinstance(ctor, type) or ctor.usespath:
+                return True
+
+        return False
+
+    def _getPathInfo(self):
+
+        usesvar = False
+        cmdnames = set()
+
+        todo = [self]
+        while todo:
+
+            astn = todo.pop()
+            todo.extend(astn.kids)
+
+            if isinstance(astn, VarValue):
+                name = astn.kids[0]
+                if not isinstance(name, Const) or name.valu == 'path':
+                    usesvar = True
+
+            # subqueries passed to commands are strings
+            elif isinstance(astn, Const) and isinstance(astn.valu, str) and '$path' in astn.valu:
+                usesvar = True
+
+            elif isinstance(astn, CmdOper):
+                cmdnames.add(astn.kids[0].value())
+
+        return usesvar, cmdnames
+
     async def iterNodePaths(self, runt, genr=None):
 
         count = 0
@@ -280,6 +332,43 @@ class SubGraph:
         self.rules.setdefault('filterinput', True)
         self.rules.setdefault('yieldfiltered', False)
 
+        # compiled rule queries and their runtimes ( see initRules() )
+        self.rulequeries = {}
+
+    def initRules(self, runt, stack):
+        '''
+        Parse each rule query once and construct a runtime to run it for every node.
+        '''
+        texts = list(self.rules.get('pivots'))
+        texts.extend(self.rules.get('filters'))
+
+        for rules in self.rules['forms'].values():
+            texts.extend(rules.get('pivots', ()))
+            texts.extend(rules.get('filters', ()))
+
+        for text in texts:
+
+            if text in self.rulequeries:
+                continue
+
+            query = runt.snap.core.getStormQuery(text)
+            rulerunt = stack.enter_context(runt.snap.getStormRuntime(user=runt.user))
+
+            self.rulequeries[text] = (query, rulerunt)
+
+    async def _iterRule(self, text, node):
+
+        query, rulerunt = self.rulequeries[text]
+
+        genr = s_common.agen((node, rulerunt.initPath(node)))
+        async for item in rulerunt.iterStormQuery(query, genr=genr):
+            yield item
+
+    async def _filtRule(self, text, node):
+        async for item in self._iterRule(text, node):
+            return False
+        return True
+
     async def omit(self, node):
 
         answ = self.omits.get(node.buid)
@@ -287,7 +376,7 @@ class SubGraph:
             return answ
 
         for filt in self.rules.get('filters'):
-            if await node.filter(filt, user=self.user):
+            if await self._filtRule(filt, node):
                 self.omits[node.buid] = True
                 return True
 
@@ -300,7 +389,7 @@ class SubGraph:
             return False
 
         for filt in rules.get('filters', ()):
-            if await node.filter(filt, user=self.user):
+            if await self._filtRule(filt, node):
                 self.omits[node.buid] = True
                 return True
 
@@ -321,7 +410,7 @@ class SubGraph:
 
         for pivq in self.rules.get('pivots'):
 
-            async for pivo in node.storm(pivq, user=self.user):
+            async for pivo in self._iterRule(pivq, node):
                 yield pivo
 
         rules = self.rules['forms'].get(node.form.name)
@@ -332,7 +421,7 @@ class SubGraph:
             return
 
         for pivq in rules.get('pivots', ()):
-            async for pivo in node.storm(pivq, user=self.user):
+            async for pivo in self._iterRule(pivq, node):
                 yield pivo
 
     async def run(self, runt, genr):
@@ -344,26 +433,20 @@ class SubGraph:
 
         self.user = runt.user
 
-        todo = collections.deque()
+        # the nodes of the next degree out
+        todo = []
 
         async with contextlib.AsyncExitStack() as stack:
 
-            done = await stack.enter_async_context(await s_spooled.Set.anit(dirn=runt.snap.core.dirn))
-            intodo = await stack.enter_async_context(await s_spooled.Set.anit(dirn=runt.snap.core.dirn))
+            self.initRules(runt, stack)
 
-            async def todogenr():
+            done = await stack.enter_async_context(await runt.getSpooledSet())
+            intodo = await stack.enter_async_context(await runt.getSpooledSet())
 
-                async for node, path in genr:
-                    path.meta('graph:seed', True)
-                    yield node, path, 0
-
-                while todo:
-                    yield todo.popleft()
-
-            async for node, path, dist in todogenr():
+            async def walk(node, path, dist):
 
                 if node.buid in done:
-                    continue
+                    return
 
                 await done.add(node.buid)
                 intodo.discard(node.buid)
@@ -373,7 +456,7 @@ class SubGraph:
                     omitted = await self.omit(node)
 
                 if omitted and not yieldfiltered:
-                    continue
+                    return
 
                 # we must traverse the pivots for the node *regardless* of degrees
                 # due to needing to tie any leaf nodes to nodes that were already yielded
@@ -397,7 +480,7 @@ class SubGraph:
 
                     # do we have room to go another degree out?
                     if degrees is None or dist < degrees:
-                        todo.append((pivn, pivp, dist + 1))
+                        todo.append((pivn, pivp))
                         await intodo.add(pivn.buid)
 
                 edges = [(iden, {}) for iden in pivoedges]
@@ -409,6 +492,35 @@ class SubGraph:
                 path.meta('edges', edges)
                 yield node, path
 
+            dist = 0
+            tick = time.perf_counter()
+
+            count = 0
+            async for node, path in genr:
+                path.meta('graph:seed', True)
+                async for item in walk(node, path, 0):
+                    count += 1
+                    yield item
+
+            # walk the graph out one degree at a time
+            while True:
+
+                if runt.profiler is not None:
+                    runt.profiler.addGraphDegree(dist, count, time.perf_counter() - tick)
+
+                if not todo:
+                    break
+
+                dist += 1
+                tick = time.perf_counter()
+
+                count = 0
+                nodes, todo = todo, []
+                for node, path in nodes:
+                    async for item in walk(node, path, dist):
+                        count += 1
+                        yield item
+
 class Oper(AstNode):
     pass
 
@@ -543,6 +655,8 @@ class ForLoop(Oper):
 
             async for item in s_coro.agen(valu):
 
+                runt.tick()
+
                 if isinstance(name, (list, tuple)):
 
                     if len(name) != len(item):
@@ -589,6 +703,8 @@ class ForLoop(Oper):
 
             async for item in s_coro.agen(valu):
 
+                runt.tick()
+
                 if isinstance(name, (list, tuple)):
 
                     if len(name) != len(item):
@@ -623,6 +739,9 @@ class WhileLoop(Oper):
         async for node, path in genr:
 
             while await tobool(await self.kids[0].compute(path)):
+
+                runt.tick()
+
                 try:
 
                     newg = s_common.agen((node, path))
@@ -645,6 +764,8 @@ class WhileLoop(Oper):
 
             while await tobool(await self.kids[0].runtval(runt)):
 
+                runt.tick()
+
                 try:
                     async for jtem in subq.inline(runt, s_common.agen()):
                         yield jtem
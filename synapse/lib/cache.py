@@ -132,6 +132,153 @@ class LruDict(collections.abc.MutableMapping):
         '''
         return item in self.data
 
+class SlruCache:
+    '''
+    A byte budgeted, scan resistant segmented LRU cache.
+
+    New keys enter a probationary segment and are only promoted to the protected
+    segment when they are hit again, so a single pass over many keys can only
+    evict other probationary keys.
+
+    Args:
+        maxsize (int): The max total size of the cached values.
+        protect (float): The fraction of maxsize which may be used by protected values.
+    '''
+    def __init__(self, maxsize, protect=0.8):
+
+        self.maxsize = maxsize
+        self.protmax = int(maxsize * protect)
+
+        self.probation = collections.OrderedDict()
+        self.protected = collections.OrderedDict()
+
+        self.size = 0
+        self.protsize = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.probation) + len(self.protected)
+
+    def __contains__(self, key):
+        return key in self.protected or key in self.probation
+
+    def keys(self):
+        return list(self.protected.keys()) + list(self.probation.keys())
+
+    def get(self, key, default=None):
+        '''
+        Get a value from the cache and mark it as recently used.
+        '''
+        item = self.protected.get(key)
+        if item is not None:
+            self.protected.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+        item = self.probation.pop(key, None)
+        if item is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+
+        self.protected[key] = item
+        self.protsize += item[1]
+
+        # demote the least recently used protected values back to probation
+        while self.protsize > self.protmax and len(self.protected) > 1:
+            lkey, litem = self.protected.popitem(last=False)
+            self.protsize -= litem[1]
+            self.probation[lkey] = litem
+
+        return item[0]
+
+    def peek(self, key, default=None):
+        '''
+        Get a value from the cache without changing its recency ( for scans ).
+        '''
+        item = self.protected.get(key)
+        if item is None:
+            item = self.probation.get(key)
+
+        if item is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, valu, size):
+        '''
+        Add or update a value in the cache.
+
+        Args:
+            key: The cache key.
+            valu: The value to cache.
+            size (int): The size of the value in bytes.
+        '''
+        item = self.protected.get(key)
+        if item is not None:
+            self.protected[key] = (valu, size)
+            self.protsize += size - item[1]
+            self.size += size - item[1]
+
+        else:
+            item = self.probation.pop(key, None)
+            if item is not None:
+                self.size -= item[1]
+
+            self.probation[key] = (valu, size)
+            self.size += size
+
+        while self.size > self.maxsize and len(self) > 1:
+            self._evict()
+
+    def _evict(self):
+
+        if self.probation:
+            key, item = self.probation.popitem(last=False)
+        else:
+            key, item = self.protected.popitem(last=False)
+            self.protsize -= item[1]
+
+        self.size -= item[1]
+        self.evictions += 1
+
+    def pop(self, key, default=None):
+
+        item = self.protected.pop(key, None)
+        if item is not None:
+            self.protsize -= item[1]
+        else:
+            item = self.probation.pop(key, None)
+
+        if item is None:
+            return default
+
+        self.size -= item[1]
+        return item[0]
+
+    def clear(self):
+        self.probation.clear()
+        self.protected.clear()
+        self.size = 0
+        self.protsize = 0
+
+    def stat(self):
+        return {
+            'count': len(self),
+            'size': self.size,
+            'maxsize': self.maxsize,
+            'protected': len(self.protected),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
 # Search for instances of escaped double or single asterisks
 # https://regex101.com/r/fOdmF2/1
 ReRegex = regex.compile(r'(\\\*\\\*)|(\\\*)')
@@ -28,6 +28,7 @@ import synapse.lib.nexus as s_nexus
 import synapse.lib.config as s_config
 import synapse.lib.health as s_health
 import synapse.lib.output as s_output
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.certdir as s_certdir
 import synapse.lib.httpapi as s_httpapi
 import synapse.lib.version as s_version
@@ -450,18 +451,32 @@ class CellApi(s_base.Base):
             yield item
 
     @adminapi()
-    async def runBackup(self, name=None, wait=True):
+    async def runBackup(self, name=None, wait=True, base=None):
         '''
         Run a new backup.
 
         Args:
             name (str): The optional name of the backup.
             wait (bool): On True, wait for backup to complete before returning.
+            base (str): The name of a previous backup to create an incremental backup from.
 
         Returns:
             str: The name of the newly created backup.
         '''
-        return await self.cell.runBackup(name=name, wait=wait)
+        return await self.cell.runBackup(name=name, wait=wait, base=base)
+
+    @adminapi()
+    async def getBackupInfo(self, name):
+        '''
+        Retrieve the manifest for a backup.
+
+        Args:
+            name (str): The name of the backup.
+
+        Returns:
+            dict: The backup manifest.
+        '''
+        return await self.cell.getBackupInfo(name)
 
     @adminapi()
     async def getBackups(self):
@@ -748,7 +763,7 @@ class Cell(s_nexus.Pusher, s_telepath.Aware):
 
         return path
 
-    async def runBackup(self, name=None, wait=True):
+    async def runBackup(self, name=None, wait=True, base=None):
 
         if self.backuprunning:
             raise s_exc.BackupAlreadyRunning(mesg='Another backup is already running')
@@ -765,7 +780,12 @@ class Cell(s_nexus.Pusher, s_telepath.Aware):
                 mesg = 'Backup with name already exists'
                 raise s_exc.BadArg(mesg=mesg)
 
-            task = self.schedCoro(self._execBackupTask(path))
+            if base is None:
+                task = self.schedCoro(self._execBackupTask(path))
+
+            else:
+                baseinfo = await self._reqBackupBase(base)
+                task = self.schedCoro(self._execIncrBackupTask(path, base, baseinfo))
 
             def done(self, task):
                 self.backuprunning = False
@@ -813,6 +833,10 @@ class Cell(s_nexus.Pusher, s_telepath.Aware):
             if not any(slab.dirty for slab in slabs):
                 break
 
+        # the ioloop is blocked from here until the transactions are captured
+        nexsindx = await self.nexsroot.index()
+        tick = s_common.now()
+
         try:
             mypipe.send('proceed')
 
@@ -826,16 +850,132 @@ class Cell(s_nexus.Pusher, s_telepath.Aware):
             assert data == 'captured'
 
             def waitforproc():
+
+                # receive the stats before joining so a large send() can not block the child
+                slabstats = None
+                while True:
+
+                    if mypipe.poll(timeout=1):
+                        slabstats = mypipe.recv()
+                        break
+
+                    if not proc.is_alive():
+                        if mypipe.poll():
+                            slabstats = mypipe.recv()
+                        break
+
                 proc.join()
                 if proc.exitcode:
                     raise s_exc.SpawnExit(code=proc.exitcode)
 
-            return await s_coro.executor(waitforproc)
+                return slabstats
+
+            slabstats = await s_coro.executor(waitforproc)
 
         except (asyncio.CancelledError, Exception):
             proc.terminate()
             raise
 
+        await self._saveBackupInfo(dirn, {
+            'type': 'full',
+            'time': tick,
+            'took': s_common.now() - tick,
+            'nexsindx': nexsindx,
+            'slabs': slabstats or {},
+        })
+
+    async def _execIncrBackupTask(self, dirn, base, baseinfo):
+        '''
+        A task that saves the nexus log entries since a previous backup to the target directory
+        '''
+        await self.boss.promote('backup', self.auth.rootuser, info={'base': base})
+
+        tick = s_common.now()
+
+        offs = baseinfo.get('nexsindx')
+        nexsindx = await self.nexsroot.index()
+
+        dirn = s_common.gendir(dirn)
+        shutil.copy(s_common.genpath(self.dirn, 'cell.guid'), dirn)
+
+        size = 0
+        with s_common.genfile(dirn, 'nexus.mpk') as fd:
+
+            for items in s_common.chunks(self.nexsroot.nexslog.iter(offs), 1000):
+
+                byts = b''.join(s_msgpack.en(item) for item in items if item[0] < nexsindx)
+                if byts:
+                    await s_coro.executor(fd.write, byts)
+                    size += len(byts)
+
+                if items[-1][0] >= nexsindx - 1:
+                    break
+
+        took = s_common.now() - tick
+        rate = int(size * 1000 / took) if took else 0
+
+        logger.info(f'Incremental backup of nexus entries {offs}-{nexsindx} took: {took}ms ({size} bytes)')
+
+        await self._saveBackupInfo(dirn, {
+            'type': 'incr',
+            'base': base,
+            'time': tick,
+            'took': took,
+            'offs': offs,
+            'nexsindx': nexsindx,
+            'slabs': {'nexus.mpk': {'bytes': size, 'took': took, 'rate': rate}},
+        })
+
+    async def _reqBackupBase(self, base):
+
+        if not self.donexslog:
+            mesg = 'Incremental backups require nexslog:en=True'
+            raise s_exc.BadConfValu(mesg=mesg)
+
+        baseinfo = await self.getBackupInfo(base)
+
+        if baseinfo.get('iden') != self.iden:
+            mesg = f'Base backup {base} is from a different cell.'
+            raise s_exc.BadArg(mesg=mesg, base=base)
+
+        offs = baseinfo.get('nexsindx')
+
+        # ensure our nexus log still contains every entry since the base backup
+        if offs < await self.nexsroot.index():
+            first = next(self.nexsroot.nexslog.iter(offs), None)
+            if first is None or first[0] != offs:
+                mesg = f'The nexus log does not contain the entries since base backup {base}.'
+                raise s_exc.BadArg(mesg=mesg, base=base)
+
+        return baseinfo
+
+    async def _saveBackupInfo(self, dirn, info):
+
+        info['iden'] = self.iden
+
+        for path, stat in info.get('slabs', {}).items():
+            logger.info(f'Backup of {path}: {stat.get("bytes")} bytes in {stat.get("took")}ms')
+
+        s_common.yamlsave(info, dirn, 'backup.yaml')
+
+    async def getBackupInfo(self, name):
+        '''
+        Return the manifest for a backup.
+
+        Args:
+            name (str): The name of the backup.
+
+        Returns:
+            dict: The backup manifest, which includes the nexus log index and per-slab copy stats.
+        '''
+        path = self._reqBackDirn(name)
+
+        if not os.path.isfile(os.path.join(path, 'backup.yaml')):
+            mesg = f'Backup {name} has no backup.yaml manifest.'
+            raise s_exc.BadArg(mesg=mesg, name=name)
+
+        return s_common.yamlload(path, 'backup.yaml')
+
     @staticmethod
     def _backupProc(pipe, srcdir, dstdir, lmdbpaths):
         '''
@@ -848,7 +988,9 @@ class Cell(s_nexus.Pusher, s_telepath.Aware):
             # Let parent know we have the transactions so he can resume the ioloop
             pipe.send('captured')
 
-            s_t_backup.txnbackup(lmdbinfo, srcdir, dstdir)
+            stats = s_t_backup.txnbackup(lmdbinfo, srcdir, dstdir)
+
+        pipe.send(stats)
 
     def _reqBackConf(self):
         if self.backdirn is None:
@@ -1,18 +1,28 @@
+import asyncio
 import hashlib
 
+import synapse.lib.coro as s_coro
+
+# BEWARE ORDER MATTERS FOR guid()
+hashfuncs = (
+    ('md5', hashlib.md5),
+    ('sha1', hashlib.sha1),
+    ('sha256', hashlib.sha256),
+    ('sha512', hashlib.sha512),
+)
+
+hashnames = tuple(name for (name, func) in hashfuncs)
+
+# buffers smaller than this are hashed inline rather than in executor threads
+THREAD_MIN_SIZE = 256 * 1024
+
 class HashSet:
 
-    def __init__(self):
+    def __init__(self, names=hashnames):
 
         self.size = 0
 
-        # BEWARE ORDER MATTERS FOR guid()
-        self.hashes = (
-            ('md5', hashlib.md5()),
-            ('sha1', hashlib.sha1()),
-            ('sha256', hashlib.sha256()),
-            ('sha512', hashlib.sha512())
-        )
+        self.hashes = tuple((name, func()) for (name, func) in hashfuncs if name in names)
 
     def guid(self):
         '''
@@ -53,6 +63,21 @@ class HashSet:
         self.size += len(byts)
         [h[1].update(byts) for h in self.hashes]
 
+    async def aupdate(self, byts):
+        '''
+        Update all the hashes in the set with the given bytes using executor threads.
+
+        Notes:
+            hashlib releases the GIL while hashing large buffers, so each hash
+            is updated in parallel without blocking the ioloop.  Small buffers
+            are hashed inline since the thread dispatch would cost more.
+        '''
+        if len(byts) < THREAD_MIN_SIZE:
+            return self.update(byts)
+
+        self.size += len(byts)
+        await asyncio.gather(*[s_coro.executor(item.update, byts) for (name, item) in self.hashes])
+
     def digests(self):
         '''
         Get a list of (name, bytes) tuples for the hashes in the hashset.
@@ -12,9 +12,24 @@ import synapse.exc as s_exc
 import synapse.common as s_common
 
 import synapse.lib.base as s_base
+import synapse.lib.const as s_const
+import synapse.lib.msgpack as s_msgpack
 
 logger = logging.getLogger(__name__)
 
+# the number of bytes written (or seconds elapsed) before a buffered stream is flushed
+STREAM_FLUSH_SIZE = s_const.kibibyte * 64
+STREAM_FLUSH_TIME = 0.1
+
+streammimes = {
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack',
+    'application/x-ndjson': 'ndjson',
+}
+
+def _enNdJson(item):
+    return json.dumps(item).encode() + b'\n'
+
 class Sess(s_base.Base):
 
     async def __anit__(self, cell, iden):
@@ -288,6 +303,83 @@ class Handler(HandlerBase, t_web.RequestHandler):
 
         return opts
 
+    def getStreamFormat(self):
+        '''
+        Get the stream format requested by the Accept header of the request.
+
+        Returns:
+            (str): Either "msgpack", "ndjson", or None for the default JSON stream.
+        '''
+        accept = self.request.headers.get('Accept', '')
+        for mime in accept.split(','):
+            fmt = streammimes.get(mime.split(';')[0].strip().lower())
+            if fmt is not None:
+                return fmt
+
+    async def streamItems(self, genr):
+        '''
+        Write the items yielded by an async generator to the response.
+
+        Notes:
+            Clients which accept application/msgpack or application/x-ndjson receive
+            msgpack or newline delimited JSON items in buffered writes, which are flushed
+            by size as items are produced and periodically while the generator blocks.
+            Otherwise, each item is written as JSON and flushed individually.
+        '''
+        fmt = self.getStreamFormat()
+        if fmt is None:
+            async for item in genr:
+                self.write(json.dumps(item))
+                await self.flush()
+            return
+
+        if fmt == 'msgpack':
+            self.set_header('Content-Type', 'application/msgpack')
+            enfunc = s_msgpack.en
+        else:
+            self.set_header('Content-Type', 'application/x-ndjson')
+            enfunc = _enNdJson
+
+        size = 0
+        lock = asyncio.Lock()
+
+        async def flush():
+            nonlocal size
+            async with lock:
+                size = 0
+                await self.flush()
+
+        async def flushloop():
+            while True:
+                await asyncio.sleep(STREAM_FLUSH_TIME)
+                if size:
+                    # a flush in progress completes even if the stream ends
+                    await asyncio.shield(flush())
+
+        flusher = asyncio.get_event_loop().create_task(flushloop())
+
+        try:
+
+            async for item in genr:
+
+                byts = enfunc(item)
+
+                self.write(byts)
+                size += len(byts)
+
+                if size >= STREAM_FLUSH_SIZE:
+                    await flush()
+
+        finally:
+            flusher.cancel()
+
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+
+        await flush()
+
 @t_web.stream_request_body
 class StreamHandler(Handler):
     '''
@@ -324,9 +416,69 @@ class StormNodesV1(Handler):
         opts = await self._reqValidOpts(opts)
 
         view = self.cell._viewFromOpts(opts)
-        async for pode in view.iterStormPodes(query, opts=opts):
-            self.write(json.dumps(pode))
-            await self.flush()
+        await self.streamItems(view.iterStormPodes(query, opts=opts))
+
+class StormCursorV1(Handler):
+    '''
+    Create a storm cursor from a query and page through its packed nodes.
+
+    A body with a "query" (and optional "opts") runs the query and returns the first
+    page of the new cursor. A body with an "iden" returns a page of an existing cursor.
+    Both may specify the "offs" and "size" of the page.
+    '''
+    async def post(self):
+        return await self.get()
+
+    async def get(self):
+
+        user, body = await self.getUserBody()
+        if body is s_common.novalu:
+            return
+
+        iden = body.get('iden')
+        query = body.get('query')
+
+        try:
+            offs = int(body.get('offs', 0))
+            size = int(body.get('size', 100))
+        except (TypeError, ValueError):
+            return self.sendRestErr('BadArg', 'The "offs" and "size" fields must be integers.')
+
+        if iden is None and query is None:
+            return self.sendRestErr('BadArg', 'The "query" or "iden" field is required.')
+
+        try:
+
+            if iden is None:
+                opts = await self._reqValidOpts(body.get('opts'))
+                info = await self.cell.addStormCursor(query, opts=opts)
+                iden = info['iden']
+
+            page = await self.cell.getStormCursor(iden, offs=offs, size=size, user=user)
+
+        except s_exc.SynErr as e:
+            mesg = e.get('mesg', str(e))
+            return self.sendRestErr(e.__class__.__name__, mesg)
+
+        return self.sendRestRetn(page)
+
+    async def delete(self):
+
+        user, body = await self.getUserBody()
+        if body is s_common.novalu:
+            return
+
+        iden = body.get('iden')
+        if iden is None:
+            return self.sendRestErr('BadArg', 'The "iden" field is required.')
+
+        try:
+            await self.cell.delStormCursor(iden, user=user)
+        except s_exc.SynErr as e:
+            mesg = e.get('mesg', str(e))
+            return self.sendRestErr(e.__class__.__name__, mesg)
+
+        return self.sendRestRetn(True)
 
 class StormV1(Handler):
 
@@ -349,9 +501,7 @@ class StormV1(Handler):
 
         await self.cell.boss.promote('storm', user=user, info={'query': query})
 
-        async for mesg in self.cell.storm(query, opts=opts):
-            self.write(json.dumps(mesg))
-            await self.flush()
+        await self.streamItems(self.cell.storm(query, opts=opts))
 
 class ReqValidStormV1(Handler):
 
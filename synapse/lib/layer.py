@@ -75,7 +75,9 @@ import synapse.telepath as s_telepath
 
 import synapse.lib.gis as s_gis
 import synapse.lib.cell as s_cell
+import synapse.lib.coro as s_coro
 import synapse.lib.cache as s_cache
+import synapse.lib.const as s_const
 import synapse.lib.nexus as s_nexus
 import synapse.lib.queue as s_queue
 import synapse.lib.urlhelp as s_urlhelp
@@ -84,6 +86,8 @@ import synapse.lib.config as s_config
 import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.slabseqn as s_slabseqn
 
+import synapse.tools.backup as s_t_backup
+
 logger = logging.getLogger(__name__)
 
 import synapse.lib.msgpack as s_msgpack
@@ -94,7 +98,13 @@ reqValidLdef = s_config.getJsValidator({
         'iden': {'type': 'string', 'pattern': s_config.re_iden},
         'creator': {'type': 'string', 'pattern': s_config.re_iden},
         'lockmemory': {'type': 'boolean'},
+        'lockdbs': {'type': 'array', 'items': {'type': 'string'}},
+        'lockbranches': {'type': 'array', 'items': {'type': 'string'}},
+        'lockbudget': {'type': 'integer', 'minimum': 0},
         'logedits': {'type': 'boolean'}, 'default': True,
+        'readthreads': {'type': 'boolean'},
+        'syncthread': {'type': 'boolean'},
+        'columns': {'type': 'boolean'},
         'name': {'type': 'string'},
     },
     'additionalProperties': True,
@@ -170,7 +180,19 @@ class LayerApi(s_cell.CellApi):
         await self._reqUserAllowed(self.liftperm)
         return self.layr.iden
 
-BUID_CACHE_SIZE = 10000
+# The default byte budget of the storage node cache for a layer which is not given a shared cache
+SODE_CACHE_SIZE = 16 * s_const.mebibyte
+# The approximate in-memory size of a decoded storage node beyond its msgpack size
+SODE_CACHE_OVERHEAD = 256
+
+# The slabs which are rebuilt by an online layer compaction
+COMPACT_SLABS = ('layer_v2.lmdb', 'nodedata.lmdb')
+# Background compaction catch up stops once it is within this many node edits of the log
+COMPACT_SWAP_LAG = 1000
+COMPACT_CATCHUP_PASSES = 10
+
+# max number of abbreviation to name mappings cached for each storage node field
+SODE_NAMES_MAX = 100000
 
 STOR_TYPE_UTF8 = 1
 
@@ -235,19 +257,21 @@ class IndxBy:
     def getNodeValu(self, buid):
         raise s_exc.NoSuchImpl(name='getNodeValu')
 
-    def buidsByDups(self, indx):
-        for _, buid in self.layr.layrslab.scanByDups(self.abrv + indx, db=self.db):
+    async def buidsByDups(self, indx):
+        async for _, buid in self.layr.scanByDups(self.abrv + indx, db=self.db):
             yield buid
 
-    def buidsByPref(self, indx=b''):
-        for _, buid in self.layr.layrslab.scanByPref(self.abrv + indx, db=self.db):
+    async def buidsByPref(self, indx=b''):
+        async for _, buid in self.layr.scanByPref(self.abrv + indx, db=self.db):
             yield buid
 
-    def keyBuidsByRange(self, minindx, maxindx):
-        yield from self.layr.layrslab.scanByRange(self.abrv + minindx, self.abrv + maxindx, db=self.db)
+    async def keyBuidsByRange(self, minindx, maxindx):
+        async for item in self.layr.scanByRange(self.abrv + minindx, self.abrv + maxindx, db=self.db):
+            yield item
 
-    def buidsByRange(self, minindx, maxindx):
-        yield from (x[1] for x in self.keyBuidsByRange(minindx, maxindx))
+    async def buidsByRange(self, minindx, maxindx):
+        async for _, buid in self.keyBuidsByRange(minindx, maxindx):
+            yield buid
 
     def keyBuidsByRangeBack(self, minindx, maxindx):
         '''
@@ -345,6 +369,9 @@ class IndxByTagProp(IndxBy):
 
 class StorType:
 
+    # the fixed width of the column encoding for stortypes which may be stored in columns
+    colsize = 0
+
     def __init__(self, layr, stortype):
         self.layr = layr
         self.stortype = stortype
@@ -402,6 +429,12 @@ class StorType:
     def indx(self, valu):
         raise NotImplementedError
 
+    def encColumn(self, valu):
+        raise NotImplementedError
+
+    def decColumn(self, byts):
+        raise NotImplementedError
+
 class StorTypeUtf8(StorType):
 
     def __init__(self, layr):
@@ -415,13 +448,13 @@ class StorTypeUtf8(StorType):
 
     async def _liftUtf8Eq(self, liftby, valu):
         indx = self._getIndxByts(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftUtf8Range(self, liftby, valu):
         minindx = self._getIndxByts(valu[0])
         maxindx = self._getIndxByts(valu[1])
-        for item in liftby.buidsByRange(minindx, maxindx):
+        async for item in liftby.buidsByRange(minindx, maxindx):
             yield item
 
     async def _liftUtf8Regx(self, liftby, valu):
@@ -429,7 +462,7 @@ class StorTypeUtf8(StorType):
         regx = regex.compile(valu)
         lastbuid = None
 
-        for buid in liftby.buidsByPref():
+        async for buid in liftby.buidsByPref():
             if buid == lastbuid:
                 continue
 
@@ -450,7 +483,7 @@ class StorTypeUtf8(StorType):
 
     async def _liftUtf8Prefix(self, liftby, valu):
         indx = self._getIndxByts(valu)
-        for item in liftby.buidsByPref(indx):
+        async for item in liftby.buidsByPref(indx):
             yield item
 
     def _getIndxByts(self, valu):
@@ -492,12 +525,12 @@ class StorTypeHier(StorType):
 
     async def _liftHierEq(self, liftby, valu):
         indx = self.getHierIndx(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftHierPref(self, liftby, valu):
         indx = self.getHierIndx(valu)
-        for item in liftby.buidsByPref(indx):
+        async for item in liftby.buidsByPref(indx):
             yield item
 
 class StorTypeLoc(StorTypeHier):
@@ -555,7 +588,7 @@ class StorTypeFqdn(StorTypeUtf8):
 
         if valu[0] == '*':
             indx = self._getIndxByts(valu[1:][::-1])
-            for item in liftby.buidsByPref(indx):
+            async for item in liftby.buidsByPref(indx):
                 yield item
             return
 
@@ -581,13 +614,13 @@ class StorTypeIpv6(StorType):
 
     async def _liftIPv6Eq(self, liftby, valu):
         indx = self.getIPv6Indx(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftIPv6Range(self, liftby, valu):
         minindx = self.getIPv6Indx(valu[0])
         maxindx = self.getIPv6Indx(valu[1])
-        for item in liftby.buidsByRange(minindx, maxindx):
+        async for item in liftby.buidsByRange(minindx, maxindx):
             yield item
 
 class StorTypeInt(StorType):
@@ -598,6 +631,7 @@ class StorTypeInt(StorType):
 
         self.size = size
         self.signed = signed
+        self.colsize = size
 
         self.offset = 0
         if signed:
@@ -621,9 +655,15 @@ class StorTypeInt(StorType):
     def indx(self, valu):
         return (self.getIntIndx(valu),)
 
+    def encColumn(self, valu):
+        return self.getIntIndx(valu)
+
+    def decColumn(self, byts):
+        return int.from_bytes(byts, 'big') - self.offset
+
     async def _liftIntEq(self, liftby, valu):
         indx = (valu + self.offset).to_bytes(self.size, 'big')
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftIntGt(self, liftby, valu):
@@ -633,7 +673,7 @@ class StorTypeInt(StorType):
     async def _liftIntGe(self, liftby, valu):
         pkeymin = (valu + self.offset).to_bytes(self.size, 'big')
         pkeymax = self.fullbyts
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftIntLt(self, liftby, valu):
@@ -643,13 +683,13 @@ class StorTypeInt(StorType):
     async def _liftIntLe(self, liftby, valu):
         pkeymin = self.zerobyts
         pkeymax = (valu + self.offset).to_bytes(self.size, 'big')
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftIntRange(self, liftby, valu):
         pkeymin = (valu[0] + self.offset).to_bytes(self.size, 'big')
         pkeymax = (valu[1] + self.offset).to_bytes(self.size, 'big')
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
 class StorTypeHugeNum(StorType):
@@ -681,7 +721,7 @@ class StorTypeHugeNum(StorType):
 
     async def _liftHugeEq(self, liftby, valu):
         byts = self.getHugeIndx(valu)
-        for item in liftby.buidsByDups(byts):
+        async for item in liftby.buidsByDups(byts):
             yield item
 
     async def _liftHugeGt(self, liftby, valu):
@@ -697,19 +737,19 @@ class StorTypeHugeNum(StorType):
     async def _liftHugeGe(self, liftby, valu):
         pkeymin = self.getHugeIndx(valu)
         pkeymax = self.fullbyts
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftHugeLe(self, liftby, valu):
         pkeymin = self.zerobyts
         pkeymax = self.getHugeIndx(valu)
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftHugeRange(self, liftby, valu):
         pkeymin = self.getHugeIndx(valu[0])
         pkeymax = self.getHugeIndx(valu[1])
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        async for item in liftby.buidsByRange(pkeymin, pkeymax):
             yield item
 
 class StorTypeFloat(StorType):
@@ -741,7 +781,7 @@ class StorTypeFloat(StorType):
         return (self.fpack(valu),)
 
     async def _liftFloatEq(self, liftby, valu):
-        for item in liftby.buidsByDups(self.fpack(valu)):
+        async for item in liftby.buidsByDups(self.fpack(valu)):
             yield item
 
     async def _liftFloatGeCommon(self, liftby, valu):
@@ -755,7 +795,7 @@ class StorTypeFloat(StorType):
                 yield item
             valupack = self.FloatPackPosMin
 
-        for item in liftby.keyBuidsByRange(valupack, self.FloatPackPosMax):
+        async for item in liftby.keyBuidsByRange(valupack, self.FloatPackPosMax):
             yield item
 
     async def _liftFloatGe(self, liftby, valu):
@@ -778,7 +818,7 @@ class StorTypeFloat(StorType):
         if math.copysign(1.0, valu) > 0.0:
             for item in liftby.keyBuidsByRangeBack(self.FloatPackNegMax, self.FloatPackNegMin):
                 yield item
-            for item in liftby.keyBuidsByRange(self.FloatPackPosMin, valupack):
+            async for item in liftby.keyBuidsByRange(self.FloatPackPosMin, valupack):
                 yield item
         else:
             for item in liftby.keyBuidsByRangeBack(valupack, self.FloatPackNegMin):
@@ -807,7 +847,7 @@ class StorTypeFloat(StorType):
 
         if math.copysign(1.0, valumin) > 0.0:
             # Entire range is nonnegative
-            for item in liftby.buidsByRange(pkeymin, pkeymax):
+            async for item in liftby.buidsByRange(pkeymin, pkeymax):
                 yield item
             return
 
@@ -822,11 +862,13 @@ class StorTypeFloat(StorType):
             yield item
 
         # Yield all values between 0 and max
-        for item in liftby.buidsByRange(self.FloatPackPosMin, pkeymax):
+        async for item in liftby.buidsByRange(self.FloatPackPosMin, pkeymax):
             yield item
 
 class StorTypeGuid(StorType):
 
+    colsize = 16
+
     def __init__(self, layr):
         StorType.__init__(self, layr, STOR_TYPE_GUID)
         self.lifters.update({
@@ -835,12 +877,18 @@ class StorTypeGuid(StorType):
 
     async def _liftGuidEq(self, liftby, valu):
         indx = s_common.uhex(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     def indx(self, valu):
         return (s_common.uhex(valu),)
 
+    def encColumn(self, valu):
+        return s_common.uhex(valu)
+
+    def decColumn(self, byts):
+        return s_common.ehex(byts)
+
 class StorTypeTime(StorTypeInt):
 
     def __init__(self, layr):
@@ -857,6 +905,8 @@ class StorTypeTime(StorTypeInt):
 
 class StorTypeIval(StorType):
 
+    colsize = 16
+
     def __init__(self, layr):
         StorType.__init__(self, layr, STOR_TYPE_IVAL)
         self.timetype = StorTypeTime(layr)
@@ -867,7 +917,7 @@ class StorTypeIval(StorType):
 
     async def _liftIvalEq(self, liftby, valu):
         indx = self.timetype.getIntIndx(valu[0]) + self.timetype.getIntIndx(valu[1])
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftIvalAt(self, liftby, valu):
@@ -892,6 +942,12 @@ class StorTypeIval(StorType):
     def indx(self, valu):
         return (self.timetype.getIntIndx(valu[0]) + self.timetype.getIntIndx(valu[1]),)
 
+    def encColumn(self, valu):
+        return self.timetype.getIntIndx(valu[0]) + self.timetype.getIntIndx(valu[1])
+
+    def decColumn(self, byts):
+        return (self.timetype.decColumn(byts[:8]), self.timetype.decColumn(byts[8:]))
+
 class StorTypeMsgp(StorType):
 
     def __init__(self, layr):
@@ -902,7 +958,7 @@ class StorTypeMsgp(StorType):
 
     async def _liftMsgpEq(self, liftby, valu):
         indx = s_common.buid(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     def indx(self, valu):
@@ -924,7 +980,7 @@ class StorTypeLatLon(StorType):
 
     async def _liftLatLonEq(self, liftby, valu):
         indx = self._getLatLonIndx(valu)
-        for item in liftby.buidsByDups(indx):
+        async for item in liftby.buidsByDups(indx):
             yield item
 
     async def _liftLatLonNear(self, liftby, valu):
@@ -974,6 +1030,113 @@ class StorTypeLatLon(StorType):
         # yield index bytes in lon/lat order to allow cheap optimal indexing
         return (self._getLatLonIndx(valu),)
 
+class StorNode(dict):
+    '''
+    A storage node dict which decodes the props, tags, and tagprops fields of
+    a v4 encoded storage node when they are first accessed.
+    '''
+    __slots__ = ('layr', 'lazy')
+
+    def __init__(self, layr, lazy=None):
+        dict.__init__(self)
+        self.layr = layr
+        self.lazy = lazy
+
+    def _load(self, name):
+        valu = self.layr._decSodeField(name, self.lazy.pop(name))
+        dict.__setitem__(self, name, valu)
+        return valu
+
+    def _loadAll(self):
+        if self.lazy:
+            for name in list(self.lazy.keys()):
+                self._load(name)
+
+    def __missing__(self, name):
+        if self.lazy and name in self.lazy:
+            return self._load(name)
+
+        # behave like the defaultdict(dict) which previously held storage nodes
+        valu = {}
+        dict.__setitem__(self, name, valu)
+        return valu
+
+    def __setitem__(self, name, valu):
+        if self.lazy:
+            self.lazy.pop(name, None)
+        dict.__setitem__(self, name, valu)
+
+    def __contains__(self, name):
+        if self.lazy and name in self.lazy:
+            return True
+        return dict.__contains__(self, name)
+
+    def __iter__(self):
+        self._loadAll()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._loadAll()
+        return dict.__len__(self)
+
+    def __eq__(self, othr):
+        self._loadAll()
+        return dict.__eq__(self, othr)
+
+    def __ne__(self, othr):
+        return not self.__eq__(othr)
+
+    def __repr__(self):
+        self._loadAll()
+        return dict.__repr__(self)
+
+    def get(self, name, defv=None):
+        if self.lazy and name in self.lazy:
+            return self._load(name)
+        return dict.get(self, name, defv)
+
+    def pop(self, name, *args):
+        if self.lazy and name in self.lazy:
+            self._load(name)
+        return dict.pop(self, name, *args)
+
+    def keys(self):
+        self._loadAll()
+        return dict.keys(self)
+
+    def items(self):
+        self._loadAll()
+        return dict.items(self)
+
+    def values(self):
+        self._loadAll()
+        return dict.values(self)
+
+    def update(self, *args, **kwargs):
+        for name, valu in dict(*args, **kwargs).items():
+            self[name] = valu
+
+    def clear(self):
+        self.lazy = None
+        dict.clear(self)
+
+    def copy(self):
+        self._loadAll()
+        sode = StorNode(self.layr)
+        dict.update(sode, self)
+        return sode
+
+def _copyCompacted(paths):
+    '''
+    (In a separate process) Make compacted copies of a list of (srcpath, dstpath) slabs.
+    '''
+    srcpaths = [p[0] for p in paths]
+    dstpaths = dict(paths)
+
+    with s_t_backup.capturelmdbs(None, onlydirs=srcpaths) as lmdbinfo:
+        for path, env, txn in lmdbinfo:
+            s_t_backup.backup_lmdb(env, dstpaths[path], txn=txn)
+
 class Layer(s_nexus.Pusher):
     '''
     The base class for a cortex layer.
@@ -983,7 +1146,7 @@ class Layer(s_nexus.Pusher):
     def __repr__(self):
         return f'Layer ({self.__class__.__name__}): {self.iden}'
 
-    async def __anit__(self, layrinfo, dirn, nexsroot=None, allow_upstream=True):
+    async def __anit__(self, layrinfo, dirn, nexsroot=None, allow_upstream=True, sodecache=None):
 
         self.nexsroot = nexsroot
         self.layrinfo = layrinfo
@@ -998,6 +1161,11 @@ class Layer(s_nexus.Pusher):
         self.lockmemory = self.layrinfo.get('lockmemory')
         self.growsize = self.layrinfo.get('growsize')
         self.logedits = self.layrinfo.get('logedits')
+        self.readthreads = self.layrinfo.get('readthreads', False)
+        self.syncthread = self.layrinfo.get('syncthread', False)
+        self.columns = self.layrinfo.get('columns', False)
+
+        self._recoverCompaction()
 
         path = s_common.genpath(self.dirn, 'layer_v2.lmdb')
 
@@ -1005,6 +1173,14 @@ class Layer(s_nexus.Pusher):
 
         self.dirty = {}
 
+        # abbreviation to name mappings for decoding v4 storage nodes
+        self.sodeformnames = {}
+        self.sodenames = {'props': {}, 'tags': {}, 'tagprops': {}}
+
+        # node edits are applied under the editlock so compaction may swap storage between them
+        self.editlock = asyncio.Lock()
+        self.compacting = None
+
         await self._initLayerStorage()
 
         self.stortypes = [
@@ -1064,7 +1240,14 @@ class Layer(s_nexus.Pusher):
         self.windows = []
         self.upstreamwaits = collections.defaultdict(lambda: collections.defaultdict(list))
 
-        self.buidcache = s_cache.LruDict(BUID_CACHE_SIZE)
+        # storage nodes are cached by (<cache key>, <buid>) in a cache which may be shared by all layers
+        if sodecache is None:
+            sodecache = s_cache.SlruCache(SODE_CACHE_SIZE)
+
+        self.sodecache = sodecache
+        self.sodecachekey = s_common.guid()
+
+        await self._initLayerColumns()
 
         uplayr = layrinfo.get('upstream')
         if uplayr is not None and allow_upstream:
@@ -1085,13 +1268,18 @@ class Layer(s_nexus.Pusher):
         Nuke all the contents in the layer, leaving an empty layer
         '''
         self.dirty.clear()
-        self.buidcache.clear()
+
+        # orphan any storage nodes cached for the previous contents
+        self.sodecachekey = s_common.guid()
 
         await self.layrslab.trash()
         await self.nodeeditslab.trash()
         await self.dataslab.trash()
 
         await self._initLayerStorage()
+        await self._initLayerColumns()
+
+        self._clearAbrvCaches()
 
     async def clone(self, newdirn):
         '''
@@ -1127,15 +1315,315 @@ class Layer(s_nexus.Pusher):
                 dstpath = s_common.genpath(newdirn, relpath, name)
                 shutil.copy(srcpath, dstpath)
 
+    def _recoverCompaction(self):
+        '''
+        Clean up after a compaction which was interrupted by a shutdown.
+        '''
+        dirn = s_common.genpath(self.dirn, 'compact')
+        if not os.path.isdir(dirn):
+            return
+
+        # both the compacted and previous slabs are complete once the swap begins
+        for name in COMPACT_SLABS:
+
+            path = s_common.genpath(self.dirn, name)
+            if os.path.isdir(path):
+                continue
+
+            for tmpname in (name, f'{name}.old'):
+                tmppath = s_common.genpath(dirn, tmpname)
+                if os.path.isdir(tmppath):
+                    logger.warning(f'Recovering layer {self.iden} slab {name} from interrupted compaction')
+                    os.rename(tmppath, path)
+                    break
+
+        shutil.rmtree(dirn, ignore_errors=True)
+
+    def _getStorSize(self):
+        # the size of the used pages, since the data files may be sparse up to the map size
+        size = 0
+        for slab in (self.layrslab, self.dataslab):
+            size += (slab.lenv.info()['last_pgno'] + 1) * slab.pagesize
+        return size
+
+    async def compact(self, info=None):
+        '''
+        Build a compacted copy of the layer storage and swap it in while the layer remains online.
+
+        Args:
+            info (dict): An optional dict which is updated with the progress of the compaction.
+
+        Returns:
+            (dict): The size of the layer storage before and after compaction.
+
+        Notes:
+            The copy is made from a read transaction in a subprocess and is then caught up
+            from the nodeedit log.  The swap is issued through the nexus and holds off node
+            edits while the remaining nodeedits are applied.  Scans which are in progress
+            against the layer when the swap occurs are moved to the compacted slabs, and the
+            spawn processes are signaled to reopen the layer by the Cortex.
+        '''
+        if self.readonly:
+            raise s_exc.ReadOnlyLayer(mesg='May not compact a read-only layer')
+
+        if not self.logedits:
+            raise s_exc.BadConfValu(mesg='Layer logging must be enabled for compaction')
+
+        if self.compacting is not None:
+            raise s_exc.LayerInUse(mesg=f'Layer {self.iden} is already being compacted')
+
+        if info is None:
+            info = {}
+
+        dirn = s_common.genpath(self.dirn, 'compact')
+
+        comp = {
+            'iden': s_common.guid(),
+            'dirn': dirn,
+            'layr': None,
+            'info': info,
+            'offs': self.nodeeditlog.index(),
+            'swap': False,
+        }
+
+        self.compacting = comp
+
+        try:
+
+            before = self._getStorSize()
+            info.update({'state': 'copy', 'size': before, 'offs': comp['offs']})
+
+            await s_coro.executor(shutil.rmtree, dirn, ignore_errors=True)
+            s_common.gendir(dirn)
+
+            # the copy may include edits beyond offs, which converge when they are applied again
+            await self.layrslab.sync()
+            await self.dataslab.sync()
+
+            paths = [(str(slab.path), s_common.genpath(dirn, name))
+                     for (slab, name) in zip((self.layrslab, self.dataslab), COMPACT_SLABS)]
+
+            await s_coro.spawn((_copyCompacted, (paths,), {}))
+
+            layrinfo = {
+                'iden': self.iden,
+                'readonly': False,
+                'logedits': False,
+                'growsize': self.growsize,
+                'columns': self.columns,
+            }
+
+            comp['layr'] = await Layer.anit(layrinfo, dirn, allow_upstream=False)
+
+            info['state'] = 'catchup'
+
+            for _ in range(COMPACT_CATCHUP_PASSES):
+                await self._compactCatchUp(comp)
+                if self._getCompactLag(comp) <= COMPACT_SWAP_LAG:
+                    break
+            else:
+                mesg = f'Layer {self.iden} compaction could not catch up to the nodeedit log'
+                raise s_exc.SynErr(mesg=mesg)
+
+            info['state'] = 'swap'
+
+            if not await self._push('layer:compact', comp['iden']):
+                mesg = f'Layer {self.iden} compaction was not swapped in'
+                raise s_exc.SynErr(mesg=mesg)
+
+            after = self._getStorSize()
+            info.update({'state': 'done', 'size': after})
+
+            return {'before': before, 'after': after}
+
+        finally:
+
+            self.compacting = None
+
+            if not comp['swap']:
+
+                if comp['layr'] is not None:
+                    await comp['layr'].fini()
+
+                await s_coro.executor(shutil.rmtree, dirn, ignore_errors=True)
+
+    async def _compactCatchUp(self, comp):
+
+        layr = comp['layr']
+        info = comp['info']
+
+        for offs, (edits, meta) in self.nodeeditlog.iter(comp['offs']):
+
+            await layr._storNodeEdits(edits, meta, (offs, None))
+
+            comp['offs'] = offs + 1
+            info['offs'] = comp['offs']
+            info['indx'] = self.nodeeditlog.index()
+
+    def _getCompactLag(self, comp):
+        '''
+        Return the number of node edits which remain to be applied to the compacted layer.
+
+        Notes:
+            Counting stops once the lag exceeds COMPACT_SWAP_LAG.
+        '''
+        lag = 0
+
+        for offs, (edits, meta) in self.nodeeditlog.iter(comp['offs']):
+
+            for buid, form, nodeedits in edits:
+                lag += len(nodeedits)
+
+            if lag > COMPACT_SWAP_LAG:
+                break
+
+        return lag
+
+    @s_nexus.Pusher.onPush('layer:compact')
+    async def _swapCompacted(self, iden):
+
+        comp = self.compacting
+        if comp is None or comp['iden'] != iden:
+            return False
+
+        comp['swap'] = True
+
+        async with self.editlock:
+
+            layr = comp['layr']
+            dirn = comp['dirn']
+
+            await self._compactCatchUp(comp)
+
+            for name, valu in self.offsets.pack().items():
+                layr.offsets.set(name, valu)
+
+            await layr.fini()
+
+            await self._saveDirtySodes()
+
+            # the previous slabs remain open for in-flight readers while they are moved aside
+            oldslabs = (self.layrslab, self.dataslab)
+
+            for slab, name in zip(oldslabs, COMPACT_SLABS):
+                path = s_common.genpath(self.dirn, name)
+                oldpath = s_common.genpath(dirn, f'{name}.old')
+                os.rename(path, oldpath)
+                slab._setMovedPath(oldpath)
+                os.rename(s_common.genpath(dirn, name), path)
+
+            # orphan any storage nodes cached from the previous slabs
+            self.sodecachekey = s_common.guid()
+
+            self._clearAbrvCaches()
+
+            await self._initLayerSlabs()
+
+            # wait for any thread read batches and move the scans in progress to the new slabs
+            for slab, newslab in zip(oldslabs, (self.layrslab, self.dataslab)):
+                slab._moveScans(newslab)
+                await slab.fini()
+
+        # allow listeners ( such as the Cortex spawn pool ) to reopen the layer
+        await self.fire('layer:compact:swap')
+
+        await s_coro.executor(shutil.rmtree, dirn, ignore_errors=True)
+
+        return True
+
     async def waitForHot(self):
         '''
         Wait for the layer's slab to be prefaulted and locked into memory if lockmemory is true, otherwise return.
         '''
         await self.layrslab.lockdoneevent.wait()
 
+    async def getMemResidency(self):
+        '''
+        Get the number of bytes of the layer storage which are resident in memory.
+
+        Notes:
+            Per-db residency is only reported for the dbs in the lockdbs and lockbranches layer options.
+        '''
+        return await self.layrslab.getMemResidency()
+
+    async def _initLayerColumns(self):
+
+        if self.readonly:
+            return
+
+        if not self.columns:
+            if self.meta.get('columns'):
+                self.layrslab.dropdb('bycolumn')
+                self.layrslab.dropdb('columns:skip')
+                self.meta.set('columns', False)
+            return
+
+        if self.meta.get('columns'):
+            return
+
+        logger.warning(f'Building property columns for layer: {self.dirn}')
+
+        count = 0
+        for buid, byts in self.layrslab.scanByFull(db=self.bybuidv4):
+
+            sode = self._decSode(byts)
+
+            form = sode.get('form')
+            if form is None:
+                continue
+
+            valt = sode.get('valu')
+            if valt is not None:
+                self._setColumn(self.setPropAbrv(form, None), buid, valt)
+
+            for prop, valt in sode.get('props', {}).items():
+                self._setColumn(self.setPropAbrv(form, prop), buid, valt)
+                if prop[0] == '.':
+                    self._setColumn(self.setPropAbrv(None, prop), buid, valt)
+
+            count += 1
+            if count % 10000 == 0:
+                await asyncio.sleep(0)
+
+        self.meta.set('columns', True)
+
+    def _setColumn(self, abrv, buid, valt):
+
+        valu, stortype = valt
+
+        if stortype & STOR_FLAG_ARRAY or not self.stortypes[stortype].colsize:
+            # a property which has any values that may not be stored in a column is read from the sodes
+            if abrv not in self.colskip:
+                self.colskip.add(abrv)
+                self.layrslab.put(abrv, b'\x00', db=self.colskipdb)
+            return
+
+        byts = stortype.to_bytes(1, 'big') + self.stortypes[stortype].encColumn(valu)
+        self.layrslab.put(abrv + buid, byts, db=self.bycolumn)
+
+    def _delColumn(self, abrv, buid, valt):
+
+        stortype = valt[1]
+        if stortype & STOR_FLAG_ARRAY or not self.stortypes[stortype].colsize:
+            return
+
+        self.layrslab.delete(abrv + buid, db=self.bycolumn)
+
+    def _hasColumn(self, abrv):
+        return self.bycolumn is not None and abrv not in self.colskip
+
+    async def _iterColumnRows(self, abrv):
+
+        size = len(abrv)
+
+        for lkey, byts in self.layrslab.scanByPref(abrv, db=self.bycolumn):
+            yield lkey[size:], self.stortypes[byts[0]].decColumn(byts[1:])
+            await asyncio.sleep(0)
+
     async def _layrV2toV3(self):
 
         bybuid = self.layrslab.initdb('bybuid')
+        bybuidv3 = self.layrslab.initdb('bybuidv3')
         sode = collections.defaultdict(dict)
 
         tostor = []
@@ -1163,7 +1651,7 @@ class Layer(s_nexus.Pusher):
 
                     if len(tostor) >= 10000:
                         logger.warning(f'...syncing 10k nodes @{count}')
-                        self.layrslab.putmulti(tostor, db=self.bybuidv3)
+                        self.layrslab.putmulti(tostor, db=bybuidv3)
                         tostor.clear()
 
                 lastbuid = buid
@@ -1197,7 +1685,7 @@ class Layer(s_nexus.Pusher):
 
         # mop up the left overs
         if tostor:
-            self.layrslab.putmulti(tostor, db=self.bybuidv3)
+            self.layrslab.putmulti(tostor, db=bybuidv3)
 
         logger.warning('...removing old bybuid index')
         self.layrslab.dropdb('bybuid')
@@ -1207,33 +1695,86 @@ class Layer(s_nexus.Pusher):
 
         logger.warning(f'...complete! ({count} nodes)')
 
+    async def _layrV3toV4(self):
+
+        bybuidv3 = self.layrslab.initdb('bybuidv3')
+
+        count = 0
+        tostor = []
+
+        logger.warning(f'Converting layer from v3 to v4 storage nodes: {self.dirn}')
+
+        for buid, byts in self.layrslab.scanByFull(db=bybuidv3):
+
+            sode = StorNode(self)
+            sode.update(s_msgpack.un(byts))
+
+            tostor.append((buid, self._encSode(sode)))
+
+            count += 1
+            if len(tostor) >= 10000:
+                logger.warning(f'...syncing 10k nodes @{count}')
+                self.layrslab.putmulti(tostor, db=self.bybuidv4)
+                tostor.clear()
+                await asyncio.sleep(0)
+
+        if tostor:
+            self.layrslab.putmulti(tostor, db=self.bybuidv4)
+
+        logger.warning('...removing old bybuidv3 index')
+        self.layrslab.dropdb('bybuidv3')
+
+        self.meta.set('version', 4)
+        self.layrvers = 4
+
+        logger.warning(f'...complete! ({count} nodes)')
+
     async def _initLayerStorage(self):
 
+        await self._initLayerSlabs()
+
+        path = s_common.genpath(self.dirn, 'nodeedits.lmdb')
+        self.nodeeditslab = await s_lmdbslab.Slab.anit(path, readonly=self.readonly)
+        self.onfini(self.nodeeditslab)
+
+        self.nodeeditlog = self.nodeeditctor(self.nodeeditslab, 'nodeedits')
+
+        self.layrvers = self.meta.get('version', 2)
+
+        if self.layrvers < 3:
+            await self._layrV2toV3()
+
+        if self.layrvers < 4:
+            await self._layrV3toV4()
+
+    async def _initLayerSlabs(self):
+
         slabopts = {
             'readonly': self.readonly,
             'max_dbs': 128,
             'map_async': True,
             'readahead': True,
             'lockmemory': self.lockmemory,
+            'lockdbs': self.layrinfo.get('lockdbs'),
+            'lockbranches': self.layrinfo.get('lockbranches'),
+            'lockbudget': self.layrinfo.get('lockbudget'),
             'growsize': self.growsize,
+            'syncthread': self.syncthread,
         }
 
         path = s_common.genpath(self.dirn, 'layer_v2.lmdb')
         nodedatapath = s_common.genpath(self.dirn, 'nodedata.lmdb')
 
         self.layrslab = await s_lmdbslab.Slab.anit(path, **slabopts)
-        self.dataslab = await s_lmdbslab.Slab.anit(nodedatapath, map_async=True,
+        self.dataslab = await s_lmdbslab.Slab.anit(nodedatapath, map_async=True, syncthread=self.syncthread,
                                                    readahead=False, readonly=self.readonly)
 
         metadb = self.layrslab.initdb('layer:meta')
         self.meta = s_lmdbslab.SlabDict(self.layrslab, db=metadb)
         if self.fresh:
-            self.meta.set('version', 3)
+            self.meta.set('version', 4)
 
         self.formcounts = await self.layrslab.getHotCount('count:forms')
-
-        path = s_common.genpath(self.dirn, 'nodeedits.lmdb')
-        self.nodeeditslab = await s_lmdbslab.Slab.anit(path, readonly=self.readonly)
         self.offsets = await self.layrslab.getHotCount('offsets')
 
         self.tagabrv = self.layrslab.getNameAbrv('tagabrv')
@@ -1241,10 +1782,9 @@ class Layer(s_nexus.Pusher):
         self.tagpropabrv = self.layrslab.getNameAbrv('tagpropabrv')
 
         self.onfini(self.layrslab)
-        self.onfini(self.nodeeditslab)
         self.onfini(self.dataslab)
 
-        self.bybuidv3 = self.layrslab.initdb('bybuidv3')
+        self.bybuidv4 = self.layrslab.initdb('bybuidv4')
 
         self.byverb = self.layrslab.initdb('byverb', dupsort=True)
         self.edgesn1 = self.layrslab.initdb('edgesn1', dupsort=True)
@@ -1259,14 +1799,16 @@ class Layer(s_nexus.Pusher):
         self.nodedata = self.dataslab.initdb('nodedata')
         self.dataname = self.dataslab.initdb('dataname', dupsort=True)
 
-        self.nodeeditlog = self.nodeeditctor(self.nodeeditslab, 'nodeedits')
+        # optional (<abrv> + <buid>) -> fixed width value columns for analytic scans
+        self.bycolumn = None
+        self.colskip = set()
 
-        self.layrslab.on('commit', self._onLayrSlabCommit)
-
-        self.layrvers = self.meta.get('version', 2)
+        if self.columns and (not self.readonly or self.layrslab.dbexists('bycolumn')):
+            self.bycolumn = self.layrslab.initdb('bycolumn')
+            self.colskipdb = self.layrslab.initdb('columns:skip')
+            self.colskip.update(lkey for lkey, _ in self.layrslab.scanByFull(db=self.colskipdb))
 
-        if self.layrvers < 3:
-            await self._layrV2toV3()
+        self.layrslab.on('commit', self._onLayrSlabCommit)
 
     def getSpawnInfo(self):
         info = self.pack()
@@ -1318,6 +1860,127 @@ class Layer(s_nexus.Pusher):
 
         return s_msgpack.un(byts)
 
+    @s_cache.memoize()
+    def _getSodePropAbrv(self, form, prop):
+        return s_common.int64un(self.setPropAbrv(form, prop))
+
+    @s_cache.memoize()
+    def _getSodeTagAbrv(self, tag):
+        return s_common.int64un(self.tagabrv.setBytsToAbrv(tag.encode()))
+
+    @s_cache.memoize()
+    def _getSodeTagPropAbrv(self, form, tag, prop):
+        return s_common.int64un(self.setTagPropAbrv(form, tag, prop))
+
+    def _getSodeName(self, name, abrv):
+
+        byts = s_common.int64en(abrv)
+
+        if name == 'props':
+            return self.getAbrvProp(byts)[1]
+
+        if name == 'tags':
+            return self.tagabrv.abrvToName(byts)
+
+        return s_msgpack.un(self.tagpropabrv.abrvToByts(byts))[1:]
+
+    def _loadSodeNames(self, name, item):
+
+        names = self.sodenames[name]
+        if len(names) >= SODE_NAMES_MAX:
+            names.clear()
+
+        for abrv in item.keys():
+            if abrv not in names:
+                names[abrv] = self._getSodeName(name, abrv)
+
+        return names
+
+    def _clearAbrvCaches(self):
+        # abbreviations may be assigned differently once the layer storage is replaced
+        Layer.getPropAbrv.cache_clear()
+        Layer.getTagPropAbrv.cache_clear()
+        Layer._getSodePropAbrv.cache_clear()
+        Layer._getSodeTagAbrv.cache_clear()
+        Layer._getSodeTagPropAbrv.cache_clear()
+        self.sodeformnames.clear()
+        for names in self.sodenames.values():
+            names.clear()
+
+    def _encSode(self, sode):
+        '''
+        Encode a storage node as a v4 ( form, valu, props, tags, tagprops ) tuple.
+
+        Notes:
+            Names are replaced by the layer abbreviations and the props, tags, and
+            tagprops are encoded separately so they may be decoded on demand.  Fields
+            which were never decoded are saved without being encoded again.
+        '''
+        form = sode.get('form')
+        lazy = getattr(sode, 'lazy', None) or {}
+
+        formabrv = None
+        if form is not None:
+            formabrv = self._getSodePropAbrv(form, None)
+
+        props = lazy.get('props')
+        if props is None:
+            valu = dict.get(sode, 'props')
+            if valu:
+                props = s_msgpack.en({self._getSodePropAbrv(form, p): v for (p, v) in valu.items()})
+
+        tags = lazy.get('tags')
+        if tags is None:
+            valu = dict.get(sode, 'tags')
+            if valu:
+                tags = s_msgpack.en({self._getSodeTagAbrv(t): v for (t, v) in valu.items()})
+
+        tagprops = lazy.get('tagprops')
+        if tagprops is None:
+            valu = dict.get(sode, 'tagprops')
+            if valu:
+                tagprops = s_msgpack.en({self._getSodeTagPropAbrv(form, t, p): v for ((t, p), v) in valu.items()})
+
+        return s_msgpack.en((formabrv, sode.get('valu'), props, tags, tagprops))
+
+    def _decSode(self, byts):
+
+        formabrv, valt, props, tags, tagprops = s_msgpack.un(byts)
+
+        lazy = {}
+        sode = StorNode(self, lazy=lazy)
+
+        if formabrv is not None:
+            form = self.sodeformnames.get(formabrv)
+            if form is None:
+                form = self.sodeformnames[formabrv] = self.getAbrvProp(s_common.int64en(formabrv))[0]
+            dict.__setitem__(sode, 'form', form)
+
+        if valt is not None:
+            dict.__setitem__(sode, 'valu', valt)
+
+        if props is not None:
+            lazy['props'] = props
+
+        if tags is not None:
+            lazy['tags'] = tags
+
+        if tagprops is not None:
+            lazy['tagprops'] = tagprops
+
+        return sode
+
+    def _decSodeField(self, name, byts):
+
+        item = s_msgpack.un(byts)
+
+        names = self.sodenames[name]
+        try:
+            return dict(zip(map(names.__getitem__, item.keys()), item.values()))
+        except KeyError:
+            names = self._loadSodeNames(name, item)
+            return dict(zip(map(names.__getitem__, item.keys()), item.values()))
+
     async def getNodeValu(self, buid, prop=None):
         '''
         Retrieve either the form valu or a prop valu for the given node by buid.
@@ -1351,36 +2014,93 @@ class Layer(s_nexus.Pusher):
         kvlist = []
 
         for buid, sode in self.dirty.items():
-            self.buidcache[buid] = sode
-            kvlist.append((buid, s_msgpack.en(sode)))
+            byts = self._encSode(sode)
+            self.sodecache.put((self.sodecachekey, buid), sode, len(byts) + SODE_CACHE_OVERHEAD)
+            kvlist.append((buid, byts))
 
-        self.layrslab.putmulti(kvlist, db=self.bybuidv3)
+        self.layrslab.putmulti(kvlist, db=self.bybuidv4)
         self.dirty.clear()
 
     async def getStorNode(self, buid):
         return self._getStorNode(buid)
 
-    def _getStorNode(self, buid):
+    def _getStorNode(self, buid, scan=False):
+        '''
+        Get the storage node for a buid.
 
+        Args:
+            buid (bytes): The buid of the node.
+            scan (bool): If True, do not add the storage node to the cache ( used by full lifts ).
+        '''
         # check the dirty nodes first
         sode = self.dirty.get(buid)
         if sode is not None:
             return sode
 
-        sode = self.buidcache.get(buid)
+        key = (self.sodecachekey, buid)
+
+        if scan:
+            sode = self.sodecache.peek(key)
+        else:
+            sode = self.sodecache.get(key)
+
         if sode is not None:
             return sode
 
-        sode = collections.defaultdict(dict)
+        size = SODE_CACHE_OVERHEAD
 
-        self.buidcache[buid] = sode
+        byts = self.layrslab.get(buid, db=self.bybuidv4)
+        if byts is None:
+            sode = StorNode(self)
+        else:
+            sode = self._decSode(byts)
+            size += len(byts)
 
-        byts = self.layrslab.get(buid, db=self.bybuidv3)
-        if byts is not None:
-            sode.update(s_msgpack.un(byts))
+        if not scan:
+            self.sodecache.put(key, sode, size)
 
         return sode
 
+    async def scanByDups(self, lkey, db=None):
+        '''
+        Yield the dup rows for lkey from the layer slab.
+
+        Notes:
+            If the layer has readthreads enabled, rows are read in batches from a
+            worker thread so lifts may proceed concurrently with edits.
+        '''
+        if self.readthreads:
+            async for item in self.layrslab.aScanByDups(lkey, db=db):
+                yield item
+            return
+
+        for item in self.layrslab.scanByDups(lkey, db=db):
+            yield item
+
+    async def scanByPref(self, byts, db=None):
+        '''
+        Yield the rows with the given key prefix from the layer slab.
+        '''
+        if self.readthreads:
+            async for item in self.layrslab.aScanByPref(byts, db=db):
+                yield item
+            return
+
+        for item in self.layrslab.scanByPref(byts, db=db):
+            yield item
+
+    async def scanByRange(self, lmin, lmax=None, db=None):
+        '''
+        Yield the rows within a key range from the layer slab.
+        '''
+        if self.readthreads:
+            async for item in self.layrslab.aScanByRange(lmin, lmax=lmax, db=db):
+                yield item
+            return
+
+        for item in self.layrslab.scanByRange(lmin, lmax=lmax, db=db):
+            yield item
+
     async def getTagCount(self, tagname, formname=None):
         '''
         Return the number of tag rows in the layer for the given tag/form.
@@ -1416,7 +2136,7 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
+        async for _, buid in self.scanByPref(abrv, db=self.bytag):
             yield buid, self._getStorNode(buid)
 
     async def liftByTagValu(self, tag, cmpr, valu, form=None):
@@ -1433,7 +2153,7 @@ class Layer(s_nexus.Pusher):
         if filt is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr)
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
+        async for _, buid in self.scanByPref(abrv, db=self.bytag):
             # filter based on the ival value before lifting the node...
             valu = await self.getNodeTag(buid, tag)
             if filt(valu):
@@ -1464,7 +2184,7 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytagprop):
+        async for _, buid in self.scanByPref(abrv, db=self.bytagprop):
             yield buid, self._getStorNode(buid)
 
     async def liftByTagPropValu(self, form, tag, prop, cmprvals):
@@ -1480,8 +2200,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
-            yield buid, self._getStorNode(buid)
+        # full prop lifts bypass the storage node cache to avoid flushing it
+        async for _, buid in self.scanByPref(abrv, db=self.byprop):
+            yield buid, self._getStorNode(buid, scan=True)
 
     # NOTE: form vs prop valu lifting is differentiated to allow merge sort
     async def liftByFormValu(self, form, cmprvals):
@@ -1510,7 +2231,7 @@ class Layer(s_nexus.Pusher):
 
         for abrv, buid in self.dataslab.scanByDups(abrv, db=self.dataname):
 
-            sode = self._getStorNode(buid).copy()
+            sode = self._getStorNode(buid, scan=True).copy()
 
             byts = self.dataslab.get(buid + abrv, db=self.nodedata)
             if byts is not None:
@@ -1541,42 +2262,44 @@ class Layer(s_nexus.Pusher):
         Returns:
             List[Tuple[buid, form, edits]]  Same list, but with only the edits actually applied (plus the old value)
         '''
-        edited = False
+        async with self.editlock:
 
-        # use/abuse python's dict ordering behavior
-        results = {}
-        nexsindx = nexsitem[0]
+            edited = False
 
-        nodeedits = collections.deque(nodeedits)
-        while nodeedits:
+            # use/abuse python's dict ordering behavior
+            results = {}
+            nexsindx = nexsitem[0]
 
-            buid, form, edits = nodeedits.popleft()
+            nodeedits = collections.deque(nodeedits)
+            while nodeedits:
 
-            sode = self._getStorNode(buid)
+                buid, form, edits = nodeedits.popleft()
+
+                sode = self._getStorNode(buid)
 
-            changes = []
-            for edit in edits:
+                changes = []
+                for edit in edits:
 
-                delt = self.editors[edit[0]](buid, form, edit, sode, meta)
-                if delt and edit[2]:
-                    nodeedits.extend(edit[2])
+                    delt = self.editors[edit[0]](buid, form, edit, sode, meta)
+                    if delt and edit[2]:
+                        nodeedits.extend(edit[2])
 
-                changes.extend(delt)
+                    changes.extend(delt)
 
-            flatedit = results.get(buid)
-            if flatedit is None:
-                results[buid] = flatedit = (buid, form, [])
+                flatedit = results.get(buid)
+                if flatedit is None:
+                    results[buid] = flatedit = (buid, form, [])
 
-            flatedit[2].extend(changes)
+                flatedit[2].extend(changes)
 
-            if changes:
-                edited = True
+                if changes:
+                    edited = True
 
-        flatedits = list(results.values())
+            flatedits = list(results.values())
 
-        if self.logedits and edited:
-            offs = self.nodeeditlog.add((flatedits, meta), indx=nexsindx)
-            [(await wind.put((offs, results))) for wind in tuple(self.windows)]
+            if self.logedits and edited:
+                offs = self.nodeeditlog.add((flatedits, meta), indx=nexsindx)
+                [(await wind.put((offs, results))) for wind in tuple(self.windows)]
 
         await asyncio.sleep(0)
 
@@ -1604,8 +2327,8 @@ class Layer(s_nexus.Pusher):
 
         # no more refs in this layer.  time to pop it...
         self.dirty.pop(buid, None)
-        self.buidcache.pop(buid, None)
-        self.layrslab.delete(buid, db=self.bybuidv3)
+        self.sodecache.pop((self.sodecachekey, buid))
+        self.layrslab.delete(buid, db=self.bybuidv4)
 
     async def storNodeEditsNoLift(self, nodeedits, meta):
         '''
@@ -1640,6 +2363,9 @@ class Layer(s_nexus.Pusher):
             for indx in self.getStorIndx(stortype, valu):
                 self.layrslab.put(abrv + indx, buid, db=self.byprop)
 
+        if self.bycolumn is not None:
+            self._setColumn(abrv, buid, valt)
+
         self.formcounts.inc(form)
 
         retn = [
@@ -1681,13 +2407,16 @@ class Layer(s_nexus.Pusher):
             for indx in self.getStorIndx(stortype, valu):
                 self.layrslab.delete(abrv + indx, buid, db=self.byprop)
 
+        if self.bycolumn is not None:
+            self._delColumn(abrv, buid, valt)
+
         self.formcounts.inc(form, valu=-1)
 
         self._wipeNodeData(buid)
         # TODO edits to become async so we can sleep(0) on large deletes?
         self._delNodeEdges(buid)
 
-        self.buidcache.pop(buid, None)
+        self.sodecache.pop((self.sodecachekey, buid))
 
         self.mayDelBuid(buid, sode)
 
@@ -1760,6 +2489,11 @@ class Layer(s_nexus.Pusher):
                 if univabrv is not None:
                     self.layrslab.put(univabrv + indx, buid, db=self.byprop)
 
+        if self.bycolumn is not None:
+            self._setColumn(abrv, buid, (valu, stortype))
+            if univabrv is not None:
+                self._setColumn(univabrv, buid, (valu, stortype))
+
         return (
             (EDIT_PROP_SET, (prop, valu, oldv, stortype), ()),
         )
@@ -1805,6 +2539,11 @@ class Layer(s_nexus.Pusher):
                 if univabrv is not None:
                     self.layrslab.delete(univabrv + indx, buid, db=self.byprop)
 
+        if self.bycolumn is not None:
+            self._delColumn(abrv, buid, valt)
+            if univabrv is not None:
+                self._delColumn(univabrv, buid, valt)
+
         self.mayDelBuid(buid, sode)
         return (
             (EDIT_PROP_DEL, (prop, valu, stortype), ()),
@@ -2049,6 +2788,11 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
+        if self._hasColumn(abrv):
+            async for item in self._iterColumnRows(abrv):
+                yield item
+            return
+
         for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
 
             sode = self._getStorNode(buid)
@@ -2088,6 +2832,11 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
+        if self._hasColumn(abrv):
+            async for item in self._iterColumnRows(abrv):
+                yield item
+            return
+
         for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
 
             sode = self._getStorNode(buid)
@@ -2108,6 +2857,11 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
+        if self._hasColumn(abrv):
+            async for item in self._iterColumnRows(abrv):
+                yield item
+            return
+
         for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
 
             sode = self._getStorNode(buid)
@@ -2120,6 +2874,23 @@ class Layer(s_nexus.Pusher):
 
             yield buid, valt[0]
 
+    async def iterPropValues(self, form, prop):
+        '''
+        Yield the values of a form, a property, or a universal property ( if form is None ) in the layer.
+
+        Notes:
+            Values are read from the property columns rather than the storage nodes when available.
+        '''
+        if form is None:
+            genr = self.iterUnivRows(prop)
+        elif prop is None:
+            genr = self.iterFormRows(form)
+        else:
+            genr = self.iterPropRows(form, prop)
+
+        async for _, valu in genr:
+            yield valu
+
     async def getNodeData(self, buid, name):
         '''
         Return a single element of a buid's node data
@@ -2153,9 +2924,9 @@ class Layer(s_nexus.Pusher):
         '''
         await self._saveDirtySodes()
 
-        for buid, byts in self.layrslab.scanByFull(db=self.bybuidv3):
+        for buid, byts in self.layrslab.scanByFull(db=self.bybuidv4):
 
-            sode = s_msgpack.un(byts)
+            sode = self._decSode(byts)
 
             form = sode.get('form')
             if form is None:
@@ -1,13 +1,20 @@
 import os
+import time
 import shutil
+import struct
 import asyncio
+import tempfile
 import threading
+import contextlib
+import contextvars
 import collections
+import concurrent.futures
 
 import logging
 logger = logging.getLogger(__name__)
 
 import lmdb
+import regex
 
 import synapse.exc as s_exc
 import synapse.glob as s_glob
@@ -26,12 +33,54 @@ import synapse.lib.slabseqn as s_slabseqn
 COPY_CHUNKSIZE = 512
 PROGRESS_PERIOD = COPY_CHUNKSIZE * 1024
 
+# The number of rows read per worker thread batch by the aScanBy* methods
+READ_BATCH_SIZE = 1000
+
+# The upper bounds ( in milliseconds ) of the commit and flush latency histogram buckets
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# The default number of bytes of pending writes kept in memory before the replay log spills to disk
+REPLAY_LOG_MEMSIZE = 64 * s_const.mebibyte
+
+# Grow the map after a commit if less than this fraction of it is left unused
+MAP_HEADROOM = 0.1
+
+# The number of btree pages read per read transaction when finding the pages of a db to lock
+MEMLOCK_BATCH_SIZE = 10000
+# The max number of bytes locked at once ( and per read lock ) by a selective memory lock
+MEMLOCK_CHUNK_SIZE = 16 * s_const.mebibyte
+# The time in seconds between refreshes of a selective memory lock
+MEMLOCK_REFRESH = 600
+
+# matches runs of resident pages in a mincore() vector
+residentregex = regex.compile(b'[^\x00]+')
+
+# the LMDB ( 64 bit ) on disk structures used to find the btree pages of a db
+MDB_PAGEHDR = struct.Struct('<QHHHH')  # mp_pgno, mp_pad, mp_flags, mp_lower, mp_upper
+MDB_NODEHDR = struct.Struct('<HHH')  # mn_lo, mn_hi, mn_flags ( the child pgno of a branch node )
+MDB_DBINFO = struct.Struct('<IHHQQQQQ')  # md_pad, md_flags, md_depth, ..., md_entries, md_root
+MDB_P_BRANCH = 0x01
+MDB_P_INVALID = 0xffffffffffffffff
+
 # By default, double the map size each time we run out of space, until this amount, and then we only increase by that
 MAX_DOUBLE_SIZE = 100 * s_const.gibibyte
 
 int64min = s_common.int64en(0)
 int64max = s_common.int64en(0xffffffffffffffff)
 
+# an optional ScanCount which the scans started from the current context add their rows to
+ScanCounter = contextvars.ContextVar('ScanCounter', default=None)
+
+class ScanCount:
+    '''
+    A count of the rows scanned by the callers which set it in the ScanCounter contextvar.
+
+    This allows the rows scanned by a single query to be counted separately from
+    those of any other queries which are concurrently scanning the same slabs.
+    '''
+    def __init__(self):
+        self.rows = 0
+
 class Hist:
     '''
     A class for storing items in a slab by time.
@@ -544,6 +593,209 @@ def _mapsizeround(size):
 
     return _roundup(size, MAX_DOUBLE_SIZE)
 
+class ReadLock:
+    '''
+    A lock which may be held by many reader threads or exclusively ( for resize and close ).
+
+    Notes:
+        Writers take priority, so new readers wait while a writer is waiting for the
+        current readers to finish.  A thread which already holds the lock ( as a reader
+        or the writer ) may re-enter the lock without waiting.
+    '''
+    def __init__(self):
+        self.readers = 0
+        self.writer = None
+        self.cond = threading.Condition()
+        self.local = threading.local()
+
+    @contextlib.contextmanager
+    def reader(self):
+
+        depth = getattr(self.local, 'depth', 0)
+
+        with self.cond:
+            if not depth and self.writer != threading.get_ident():
+                self.cond.wait_for(lambda: self.writer is None)
+            self.readers += 1
+
+        self.local.depth = depth + 1
+
+        try:
+            yield
+
+        finally:
+            self.local.depth = depth
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextlib.contextmanager
+    def exclusive(self):
+
+        if self.writer == threading.get_ident():
+            yield
+            return
+
+        with self.cond:
+
+            self.cond.wait_for(lambda: self.writer is None)
+            self.writer = threading.get_ident()
+
+            try:
+                self.cond.wait_for(lambda: not self.readers)
+            except BaseException:  # pragma: no cover
+                self.writer = None
+                self.cond.notify_all()
+                raise
+
+        try:
+            yield
+
+        finally:
+            with self.cond:
+                self.writer = None
+                self.cond.notify_all()
+
+def _mergeRanges(ranges):
+    '''
+    Merge a list of (<start>, <end>) ranges into a sorted list of non-overlapping ranges.
+    '''
+    retn = []
+    for rnge in sorted(ranges):
+        if retn and rnge[0] <= retn[-1][1]:
+            retn[-1] = (retn[-1][0], max(retn[-1][1], rnge[1]))
+            continue
+        retn.append(rnge)
+    return retn
+
+def _bitsToRanges(bits):
+    '''
+    Convert a little endian bitmap into a list of (<start>, <end>) ranges of set bits.
+    '''
+    retn = []
+    for mtch in residentregex.finditer(bits):
+        for indx in range(mtch.start(), mtch.end()):
+            byte = bits[indx]
+            for bit in range(8):
+                if not byte & (1 << bit):
+                    continue
+
+                valu = (indx << 3) + bit
+                if retn and retn[-1][1] == valu:
+                    retn[-1][1] = valu + 1
+                else:
+                    retn.append([valu, valu + 1])
+
+    return [tuple(r) for r in retn]
+
+class ReplayLog:
+    '''
+    The log of write operations in the current slab transaction used to replay them after a map resize.
+
+    Operations are kept in memory until their size exceeds memsize bytes, after which they are
+    appended to an anonymous temporary file in the slab directory.
+    '''
+    def __init__(self, slab, memsize=REPLAY_LOG_MEMSIZE):
+        self.slab = slab
+        self.memsize = memsize
+
+        self.ops = []
+        self.count = 0
+        self.size = 0
+
+        self.fd = None
+
+    def __len__(self):
+        return self.count
+
+    def append(self, name, args, kwargs, size):
+
+        self.count += 1
+        self.size += size
+
+        if self.fd is not None:
+            self.fd.write(s_msgpack.en((name, args, kwargs)))
+            return
+
+        self.ops.append((name, args, kwargs))
+
+        if self.size > self.memsize:
+            self._spill()
+
+    def spilled(self):
+        return self.fd is not None
+
+    def _spill(self):
+
+        logger.info(f'lmdbslab {self.slab.path} spilling replay log to disk ({self.size} bytes)')
+
+        self.fd = tempfile.TemporaryFile(dir=self.slab.path)
+
+        for item in self.ops:
+            self.fd.write(s_msgpack.en(item))
+
+        self.ops.clear()
+
+    def __iter__(self):
+
+        yield from self.ops
+
+        if self.fd is None:
+            return
+
+        self.fd.seek(0)
+        try:
+            yield from s_msgpack.iterfd(self.fd)
+        finally:
+            self.fd.seek(0, os.SEEK_END)
+
+    def clear(self):
+
+        self.ops.clear()
+        self.count = 0
+        self.size = 0
+
+        if self.fd is not None:
+            self.fd.close()
+            self.fd = None
+
+class LatencyHist:
+    '''
+    A fixed bucket histogram of operation latencies in milliseconds.
+    '''
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.maxtime = 0
+
+    def add(self, took):
+        self.total += 1
+        self.maxtime = max(self.maxtime, took)
+
+        for i, maxv in enumerate(self.buckets):
+            if took <= maxv:
+                self.counts[i] += 1
+                return
+
+        self.counts[-1] += 1
+
+    def pack(self):
+        '''
+        Returns:
+            (dict): The count, max time, and a list of (<max millis>, <count>) tuples.
+
+        Notes:
+            The last bucket has a max of None and counts every latency above the largest bucket.
+        '''
+        maxs = list(self.buckets) + [None]
+        return {
+            'count': self.total,
+            'max': self.maxtime,
+            'buckets': list(zip(maxs, self.counts)),
+        }
+
 class Slab(s_base.Base):
     '''
     A "monolithic" LMDB instance for use in a asyncio loop thread.
@@ -552,8 +804,10 @@ class Slab(s_base.Base):
     allslabs = {}  # type: ignore
     synctask = None
     syncevnt = None  # set this event to trigger a sync
+    flushpool = None  # the dedicated writer thread used to flush syncthread slabs
 
-    COMMIT_PERIOD = 0.2  # time between commits
+    COMMIT_PERIOD = 0.2  # default max time between commits
+    WAITER_COMMIT_PERIOD = 0.02  # max time between commits while readers are waiting on writes
     DEFAULT_MAPSIZE = s_const.gibibyte
     DEFAULT_GROWSIZE = None
 
@@ -583,11 +837,12 @@ class Slab(s_base.Base):
     async def syncLoopTask(clas):
         while True:
             try:
-                await s_coro.event_wait(clas.syncevnt, timeout=clas.COMMIT_PERIOD)
+                await s_coro.event_wait(clas.syncevnt, timeout=clas._getSyncTimeout())
 
                 clas.syncevnt.clear()
 
-                await clas.syncLoopOnce()
+                now = time.monotonic()
+                await clas._syncSlabs([slab for slab in clas.allslabs.values() if slab._isCommitDue(now)])
 
             except asyncio.CancelledError:
                 raise
@@ -597,10 +852,51 @@ class Slab(s_base.Base):
 
     @classmethod
     async def syncLoopOnce(clas):
-        for slab in list(clas.allslabs.values()):
-            if slab.dirty:
-                await slab.sync()
-                await asyncio.sleep(0)
+        await clas._syncSlabs([slab for slab in clas.allslabs.values() if slab.dirty])
+
+    @classmethod
+    def _getSyncTimeout(clas):
+        '''
+        Return the time until the next dirty slab is due to be committed.
+        '''
+        now = time.monotonic()
+
+        timeout = clas.COMMIT_PERIOD
+        for slab in clas.allslabs.values():
+
+            if slab.readonly:
+                continue
+
+            period = slab._getCommitPeriod()
+            if not slab.dirty:
+                timeout = min(timeout, period)
+                continue
+
+            timeout = min(timeout, slab.lastcommit + period - now)
+
+        return max(timeout, 0)
+
+    @classmethod
+    async def _syncSlabs(clas, slabs):
+        '''
+        Commit the given slabs, those with waiting readers first, and wait for their flushes together.
+        '''
+        slabs.sort(key=lambda slab: (not slab.waiters, -len(slab.xactops)))
+
+        futs = []
+        for slab in slabs:
+
+            if slab.isfini or not slab.dirty:
+                continue
+
+            fut = await slab.sync(wait=False)
+            if fut is not None:
+                futs.append(fut)
+
+            await asyncio.sleep(0)
+
+        if futs:
+            await asyncio.gather(*futs)
 
     @classmethod
     async def getSlabStats(clas):
@@ -616,10 +912,21 @@ class Slab(s_base.Base):
                 'maxsize': slab.maxsize,
                 'growsize': slab.growsize,
                 'mapasync': slab.mapasync,
-
+                'syncthread': slab.syncthread,
+                'commitperiod': slab.commitperiod,
+                'commitbytes': slab.commitbytes,
+                'waiters': slab.waiters,
+                'commithist': slab.commithist.pack(),
+                'flushhist': slab.flushhist.pack(),
             })
         return retn
 
+    @classmethod
+    def _getFlushPool(clas):
+        if clas.flushpool is None:
+            clas.flushpool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='SlabFlush')
+        return clas.flushpool
+
     async def __anit__(self, path, **kwargs):
 
         await s_base.Base.__anit__(self)
@@ -651,10 +958,22 @@ class Slab(s_base.Base):
             mapsize = initial_mapsize
 
         # save the transaction deltas in case of error...
-        self.xactops = []
-        self.max_xactops_len = opts.pop('max_replay_log', 10000)
+        # ( commits are driven by the commit policy and map headroom rather than a count of writes by default )
+        self.max_xactops_len = opts.pop('max_replay_log', None)
+        self.replaymemsize = opts.pop('replay_log_memsize', REPLAY_LOG_MEMSIZE)
         self.recovering = False
 
+        # the commit policy for this slab
+        self.commitperiod = opts.pop('commit_period', self.COMMIT_PERIOD)
+        self.commitbytes = opts.pop('commit_bytes', None)
+
+        self.xactbytes = 0
+        self.xactlimit = None  # the size of pending writes at which to commit early to leave room to grow the map
+        self.lastcommit = time.monotonic()
+
+        # the number of readers waiting on writes to this slab
+        self.waiters = 0
+
         opts.setdefault('max_dbs', 128)
         opts.setdefault('writemap', True)
 
@@ -664,6 +983,13 @@ class Slab(s_base.Base):
         self.readonly = opts.get('readonly', False)
         self.lockmemory = opts.pop('lockmemory', False)
 
+        # lock only the pages of the named dbs and/or a byte budget of resident pages instead of the whole map
+        self.lockdbs = opts.pop('lockdbs', None)
+        self.lockbranches = opts.pop('lockbranches', None)
+        self.lockbudget = opts.pop('lockbudget', None)
+        if self.lockdbs or self.lockbranches or self.lockbudget:
+            self.lockmemory = True
+
         if self.lockmemory:
             lockmem_override = s_common.envbool('SYN_LOCKMEM_DISABLE')
             if lockmem_override:
@@ -672,6 +998,14 @@ class Slab(s_base.Base):
 
         self.mapasync = opts.setdefault('map_async', True)
 
+        # commit without flushing and flush the map from the writer thread instead
+        self.syncthread = opts.pop('syncthread', False)
+        if self.syncthread and not self.readonly:
+            opts['sync'] = False
+
+        self.flushfut = None
+        self.flushqueued = False
+
         self.mapsize = _mapsizeround(mapsize)
         if self.maxsize is not None:
             self.mapsize = min(self.mapsize, self.maxsize)
@@ -681,7 +1015,19 @@ class Slab(s_base.Base):
         self.lenv = lmdb.open(str(path), **opts)
         self.allslabs[path] = self
 
+        # the writer thread flushes the data file using its own descriptor rather than the env
+        self.flushfd = None
+        if self.syncthread and not self.readonly:
+            self.flushfd = os.open(os.path.join(self.lenv.path(), 'data.mdb'), os.O_RDONLY)
+
+        self.pagesize = self.lenv.stat()['psize']
+        self.xactops = ReplayLog(self, memsize=self.replaymemsize)
+
         self.scans = set()
+        self.threadscans = set()
+
+        # held by worker threads for the duration of a read batch
+        self.readlock = ReadLock()
 
         self.dirty = False
         if self.readonly:
@@ -701,6 +1047,11 @@ class Slab(s_base.Base):
         self.lock_progress = 0
         self.lock_goal = 0
 
+        self.dbpages = {}  # db name -> (<time>, <page ranges>) of the pages found by the last selective lock
+        self.lockedranges = []  # the (<addr>, <size>) ranges locked by the last selective lock
+
+        self.dbnames = {None: (None, False)}  # prepopulate the default DB for speed
+
         if self.lockmemory:
             async def memlockfini():
                 self.resizeevent.set()
@@ -710,11 +1061,14 @@ class Slab(s_base.Base):
         else:
             self.lockdoneevent.set()
 
-        self.dbnames = {None: (None, False)}  # prepopulate the default DB for speed
-
         self.onfini(self._onSlabFini)
 
         self.commitstats = collections.deque(maxlen=1000)  # stores Tuple[time, replayloglen, commit time delta]
+        self.commithist = LatencyHist()
+        self.flushhist = LatencyHist()
+
+        # the number of rows yielded by scans of this slab ( used by the storm profiler )
+        self.scanrows = 0
 
         if not self.readonly:
             await Slab.initSyncLoop(self)
@@ -758,6 +1112,9 @@ class Slab(s_base.Base):
             'lock_progress': self.lock_progress,  # how much we've locked so far
             'lock_goal': self.lock_goal,  # how much we want to lock
             'prefaulting': self.prefaulting,  # whether we are right meow prefaulting
+            'lockdbs': self.lockdbs,  # the dbs to lock instead of the whole map
+            'lockbranches': self.lockbranches,  # the dbs whose branch pages to lock instead of the whole map
+            'lockbudget': self.lockbudget,  # the max bytes of resident pages to lock
             'commitstats': list(self.commitstats),  # last X tuple(time,replaylogsize,commit time)
         }
 
@@ -790,7 +1147,54 @@ class Slab(s_base.Base):
             opts['maxsize'] = self.maxsize
         s_common.yamlmod(opts, self.optspath)
 
-    async def sync(self):
+    def _getCommitPeriod(self):
+        if self.waiters:
+            return min(self.commitperiod, self.WAITER_COMMIT_PERIOD)
+        return self.commitperiod
+
+    def _isCommitDue(self, now):
+
+        if not self.dirty:
+            return False
+
+        if self.max_xactops_len is not None and len(self.xactops) >= self.max_xactops_len:
+            return True
+
+        if self.commitbytes is not None and self.xactbytes >= self.commitbytes:
+            return True
+
+        # commit early to leave room to grow the map ( see _logXactOper )
+        if self.xactlimit is not None and self.xactbytes >= self.xactlimit:
+            return True
+
+        return now >= self.lastcommit + self._getCommitPeriod()
+
+    @contextlib.contextmanager
+    def waiter(self):
+        '''
+        A context manager used by readers waiting on writes to the slab to prioritize its commits.
+        '''
+        self.waiters += 1
+
+        if self.syncevnt is not None:
+            self.syncevnt.set()
+
+        try:
+            yield
+
+        finally:
+            self.waiters -= 1
+
+    async def sync(self, wait=True):
+        '''
+        Commit the current transaction.
+
+        Args:
+            wait (bool): If False, return the pending writer thread flush instead of waiting for it.
+
+        Returns:
+            (asyncio.Future): The pending flush future if wait=False and one is required, otherwise None.
+        '''
         try:
             # do this from the loop thread only to avoid recursion
             await self.fire('commit')
@@ -800,6 +1204,54 @@ class Slab(s_base.Base):
             self._handle_mapfull()
             # There's no need to re-try self.forcecommit as _growMapSize does it
 
+        if self.syncthread and not self.readonly:
+            fut = self._flushFromThread()
+            if not self.mapasync:
+                if not wait:
+                    return fut
+                await asyncio.shield(fut)
+
+    def _flushFromThread(self):
+        '''
+        Schedule a flush of the committed map pages on the writer thread.
+
+        Notes:
+            LMDB requires that a write transaction is committed by the thread which began it,
+            so only the flush to disk ( which is the slow part of a commit ) is moved off the
+            ioloop.  Writes continue into the next transaction while the flush is in progress.
+        '''
+        # a flush which has not started yet will include the latest commit
+        if self.flushqueued:
+            return self.flushfut
+
+        self.flushqueued = True
+
+        loop = asyncio.get_running_loop()
+        self.flushfut = loop.run_in_executor(self._getFlushPool(), self._flushEnv)
+        return self.flushfut
+
+    def _flushEnv(self):
+        '''
+        Flush the data file to disk ( from the writer thread ).
+
+        Notes:
+            The map is shared with the page cache, so an fsync() of the data file flushes the
+            pages written by committed transactions.  Using a separate file descriptor rather
+            than lenv.sync() means no lock is held during the flush, so the ioloop may resize the
+            map or begin a new transaction without waiting for the flush to complete.
+        '''
+        self.flushqueued = False
+
+        tick = time.perf_counter()
+
+        try:
+            os.fsync(self.flushfd)
+        except OSError:  # pragma: no cover
+            logger.exception(f'Error flushing slab {self.path}')
+            return
+
+        self.flushhist.add((time.perf_counter() - tick) * 1000)
+
     async def fini(self):
         await self.fire('commit')
         return await s_base.Base.fini(self)
@@ -815,8 +1267,24 @@ class Slab(s_base.Base):
                 continue
             break
 
-        self.lenv.close()
-        self.allslabs.pop(self.path, None)
+        # wait for any in-flight flush before closing its file descriptor
+        if self.flushfd is not None:
+
+            if self.flushfut is not None:
+                await asyncio.wait((self.flushfut,))
+
+            os.close(self.flushfd)
+            self.flushfd = None
+
+        # wait for any in-flight thread read batch to complete
+        with self.readlock.exclusive():
+            if self.syncthread and not self.readonly:
+                self.lenv.sync(True)
+            self.lenv.close()
+
+        if self.allslabs.get(self.path) is self:
+            self.allslabs.pop(self.path)
+
         del self.lenv
 
         if not self.allslabs:
@@ -866,7 +1334,9 @@ class Slab(s_base.Base):
 
         logger.warning('lmdbslab %s growing map size to: %d MiB', self.path, mapsize // s_const.mebibyte)
 
-        self.lenv.set_mapsize(mapsize)
+        # no read transactions may be active during a resize
+        with self.readlock.exclusive():
+            self.lenv.set_mapsize(mapsize)
         self.mapsize = mapsize
 
         self.resizeevent.set()
@@ -880,7 +1350,6 @@ class Slab(s_base.Base):
         if not s_thishost.get('hasmemlocking'):  # pragma: no cover
             return
         MAX_TOTAL_PERCENT = .90  # how much of all the RAM to take
-        MAX_LOCK_AT_ONCE = s_const.gibibyte
 
         # Calculate a reasonable maximum amount of memory to lock
 
@@ -919,7 +1388,11 @@ class Slab(s_base.Base):
 
         while not self.isfini:
 
-            self.resizeevent.wait()
+            if self.lockdbs or self.lockbranches or self.lockbudget:
+                self.resizeevent.wait(timeout=MEMLOCK_REFRESH)
+            else:
+                self.resizeevent.wait()
+
             if self.isfini:
                 break
 
@@ -949,28 +1422,11 @@ class Slab(s_base.Base):
             goal_end = memstart + min(memlen, filesize)
             self.lock_goal = goal_end - memstart
 
-            self.lock_progress = 0
-            prev_memend = memstart
-
-            # Actually do the prefaulting and locking.  Only do it a chunk at a time to maintain responsiveness.
-            while prev_memend < goal_end:
-                new_memend = min(prev_memend + MAX_LOCK_AT_ONCE, goal_end)
-                memlen = new_memend - prev_memend
-                PROT = 1 # PROT_READ
-                FLAGS = 0x8001  # MAP_POPULATE | MAP_SHARED (Linux only)  (for fast prefaulting)
-                try:
-                    self.prefaulting = True
-                    with s_thisplat.mmap(0, length=new_memend - prev_memend, prot=PROT, flags=FLAGS, fd=fileno,
-                                         offset=prev_memend - memstart):
-                        s_thisplat.mlock(prev_memend, memlen)
-                except OSError as e:
-                    logger.warning('error while attempting to lock memory of %s: %s', path, e)
-                    break
-                finally:
-                    self.prefaulting = False
+            if self.lockdbs or self.lockbranches or self.lockbudget:
+                self._lockSelected(fileno, memstart, min(memlen, filesize), max_to_lock)
 
-                prev_memend = new_memend
-                self.lock_progress = prev_memend - memstart
+            else:
+                self._lockMapRange(fileno, memstart, goal_end, path)
 
             if first_end:
                 first_end = False
@@ -982,6 +1438,296 @@ class Slab(s_base.Base):
         self.locking_memory = False
         logger.debug('memory locking thread ended')
 
+    def _lockMapRange(self, fileno, memstart, goal_end, path):
+        '''
+        Prefault and lock the whole map from the memory locking thread.
+        '''
+        MAX_LOCK_AT_ONCE = s_const.gibibyte
+
+        self.lock_progress = 0
+        prev_memend = memstart
+
+        # Actually do the prefaulting and locking.  Only do it a chunk at a time to maintain responsiveness.
+        while prev_memend < goal_end:
+            new_memend = min(prev_memend + MAX_LOCK_AT_ONCE, goal_end)
+            memlen = new_memend - prev_memend
+            PROT = 1 # PROT_READ
+            FLAGS = 0x8001  # MAP_POPULATE | MAP_SHARED (Linux only)  (for fast prefaulting)
+            try:
+                self.prefaulting = True
+                with s_thisplat.mmap(0, length=new_memend - prev_memend, prot=PROT, flags=FLAGS, fd=fileno,
+                                     offset=prev_memend - memstart):
+                    s_thisplat.mlock(prev_memend, memlen)
+            except OSError as e:
+                logger.warning('error while attempting to lock memory of %s: %s', path, e)
+                break
+            finally:
+                self.prefaulting = False
+
+            prev_memend = new_memend
+            self.lock_progress = prev_memend - memstart
+
+    def _lockSelected(self, fileno, memstart, maplen, max_to_lock):
+        '''
+        Lock the pages of the lockdbs, the branch pages of the lockbranches, and then the resident pages
+        up to lockbudget from the memory locking thread.
+
+        Notes:
+            LMDB is copy-on-write, so pages which are updated move.  The lock is refreshed every
+            MEMLOCK_REFRESH seconds, releasing the previously locked pages.
+        '''
+        pagesize = self.pagesize
+        maxpages = max_to_lock // pagesize
+
+        ranges = []
+
+        lockdbs = [(name, False) for name in self.lockdbs or ()]
+        lockdbs.extend((name, True) for name in self.lockbranches or ())
+
+        for name, branches in lockdbs:
+
+            # initdb() wakes the thread when a db we are waiting for is opened
+            if name not in self.dbnames:
+                continue
+
+            dbranges = self._getDbPageRanges(name, fileno, maplen, maxpages, branches=branches)
+            if dbranges is None:
+                return
+
+            self.dbpages[name] = (s_common.now(), dbranges)
+            ranges.extend(dbranges)
+
+        budget = self.lockbudget
+        if budget:
+            for rnge in self._iterResidentRanges(memstart, maplen):
+                if budget <= 0:
+                    break
+                size = min((rnge[1] - rnge[0]) * pagesize, budget)
+                ranges.append((rnge[0], rnge[0] + size // pagesize))
+                budget -= size
+
+        ranges = _mergeRanges(ranges)
+
+        self.lock_goal = min(sum(e - s for (s, e) in ranges) * pagesize, max_to_lock)
+        self.lock_progress = 0
+
+        for addr, size in self.lockedranges:
+            try:
+                s_thisplat.munlock(addr, size)
+            except OSError:  # pragma: no cover
+                pass
+
+        self.lockedranges = []
+
+        for spage, epage in ranges:
+
+            addr = memstart + spage * pagesize
+            size = min((epage - spage) * pagesize, self.lock_goal - self.lock_progress)
+            if size <= 0:
+                logger.warning('memory locking limit reached')
+                break
+
+            # lock large ranges in chunks so a resize is not blocked for long
+            while size > 0:
+
+                chunk = min(size, MEMLOCK_CHUNK_SIZE)
+
+                with self.readlock.reader():
+
+                    if self.isfini or self.resizeevent.is_set():
+                        return
+
+                    try:
+                        s_thisplat.mlock(addr, chunk)
+                    except OSError as e:
+                        logger.warning('error while attempting to lock memory of %s: %s', self.path, e)
+                        return
+
+                self.lockedranges.append((addr, chunk))
+                self.lock_progress += chunk
+
+                addr += chunk
+                size -= chunk
+
+    def _getDbPageRanges(self, name, fileno, maplen, maxpages, branches=False):
+        '''
+        Walk the btree of a db and return the ranges of map pages it occupies.
+
+        Args:
+            name (str): The db name.
+            fileno (int): A file descriptor for the data file.
+            maplen (int): The length of the data file.
+            maxpages (int): Stop descending the btree once this many pages have been found.
+            branches (bool): Only return the branch pages of the btree rather than its branch and leaf pages.
+
+        Notes:
+            Only the branch pages are read ( from the data file ), since they contain the page
+            numbers of their children, so the leaf pages are found without reading them.  Overflow
+            pages of large values and the pages of dupsort sub-databases are not included.
+
+        Returns:
+            (list): A list of (<start page>, <end page>) tuples or None if interrupted by a resize or fini.
+        '''
+        pagesize = self.pagesize
+        lastpage = maplen // pagesize
+
+        pagebits = bytearray((lastpage + 8) // 8)
+
+        def addpage(pgno):
+            pagebits[pgno >> 3] |= 1 << (pgno & 7)
+
+        def getchildren(pgno):
+
+            page = os.pread(fileno, pagesize, pgno * pagesize)
+            if len(page) < pagesize:  # pragma: no cover
+                return ()
+
+            # pages may have been reused since the root was read
+            pageno, _, flags, lower, _ = MDB_PAGEHDR.unpack_from(page)
+            if pageno != pgno or not flags & MDB_P_BRANCH:
+                return ()
+
+            retn = []
+            for indx in range(MDB_PAGEHDR.size, lower, 2):
+                offs = int.from_bytes(page[indx:indx + 2], 'little')
+                lo, hi, fl = MDB_NODEHDR.unpack_from(page, offs)
+                child = lo | (hi << 16) | (fl << 32)
+                if child < lastpage:
+                    retn.append(child)
+
+            return retn
+
+        with self.readlock.reader():
+
+            if self.isfini or self.resizeevent.is_set():
+                return None
+
+            with self.lenv.begin() as xact:
+                byts = xact.get(name.encode('utf8'))
+
+        if byts is None or len(byts) != MDB_DBINFO.size:  # pragma: no cover
+            return []
+
+        info = MDB_DBINFO.unpack(byts)
+        depth, root = info[2], info[7]
+
+        if root == MDB_P_INVALID or root >= lastpage:
+            return []
+
+        count = 0
+        level = [root]
+
+        for height in range(depth, 0, -1):
+
+            # the last level of the btree is the leaf pages
+            if height == 1 and branches:
+                break
+
+            for pgno in level:
+                addpage(pgno)
+
+            count += len(level)
+            if height == 1 or count >= maxpages:
+                break
+
+            nextlevel = []
+            for offs in range(0, len(level), MEMLOCK_BATCH_SIZE):
+
+                # use a new read transaction for each batch to avoid pinning old pages
+                with self.readlock.reader():
+
+                    if self.isfini or self.resizeevent.is_set():
+                        return None
+
+                    with self.lenv.begin():
+                        for pgno in level[offs:offs + MEMLOCK_BATCH_SIZE]:
+                            nextlevel.extend(getchildren(pgno))
+
+            level = nextlevel
+
+        return _bitsToRanges(pagebits)
+
+    def _iterResidentRanges(self, memstart, maplen, interrupt=True):
+        '''
+        Yield the (<start page>, <end page>) ranges of the resident pages of the map.
+
+        Args:
+            interrupt (bool): Stop if the map is resized or the slab is fini'd.
+        '''
+        pagesize = self.pagesize
+        chunksize = s_const.gibibyte
+
+        for offs in range(0, maplen, chunksize):
+
+            with self.readlock.reader():
+
+                if interrupt and (self.isfini or self.resizeevent.is_set()):
+                    return
+
+                vect = s_thisplat.mincore(memstart + offs, min(chunksize, maplen - offs))
+
+            base = offs // pagesize
+            for mtch in residentregex.finditer(vect):
+                yield (base + mtch.start(), base + mtch.end())
+
+    def _getMemResidency(self):
+        '''
+        Return the resident bytes of the map and the dbs found by the last selective memory lock.
+        '''
+        retn = {'bytes': 0, 'resident': 0, 'dbs': {}}
+
+        if not s_thishost.get('hasmemlocking'):  # pragma: no cover
+            return retn
+
+        path = s_common.genpath(self.path, 'data.mdb')
+
+        with self.readlock.reader():
+
+            if self.isfini:
+                raise s_exc.IsFini()
+
+            memstart, memlen = s_thisplat.getFileMappedRegion(path)
+            maplen = min(memlen, os.path.getsize(path))
+
+            pagesize = self.pagesize
+
+            retn['bytes'] = maplen
+            rngs = self._iterResidentRanges(memstart, maplen, interrupt=False)
+            retn['resident'] = sum(e - s for (s, e) in rngs) * pagesize
+
+            for name, (tick, ranges) in self.dbpages.items():
+
+                size = 0
+                resident = 0
+
+                for spage, epage in ranges:
+                    vect = s_thisplat.mincore(memstart + spage * pagesize, (epage - spage) * pagesize)
+                    size += len(vect) * pagesize
+                    resident += sum(mtch.end() - mtch.start() for mtch in residentregex.finditer(vect))
+
+                retn['dbs'][name] = {
+                    'time': tick,
+                    'bytes': size,
+                    'resident': resident * pagesize,
+                }
+
+        return retn
+
+    async def getMemResidency(self):
+        '''
+        Get the number of bytes of the map which are resident in memory.
+
+        Returns:
+            (dict): The total and resident bytes of the map, and of each db in lockdbs or lockbranches as of
+            its last lock.
+
+        Notes:
+            The pages of a db can only be found by reading its btree, so per-db residency is only known for
+            the dbs in lockdbs or lockbranches, using the pages found by the last ( periodic ) selective
+            memory lock.
+        '''
+        return await s_coro.executor(self._getMemResidency)
+
     def initdb(self, name, dupsort=False, integerkey=False):
         while True:
             try:
@@ -995,6 +1741,10 @@ class Slab(s_base.Base):
                     self.forcecommit()
 
                 self.dbnames[name] = (db, dupsort)
+
+                if name in (self.lockdbs or ()) or name in (self.lockbranches or ()):
+                    self.resizeevent.set()
+
                 return name
             except lmdb.MapFullError:
                 self._handle_mapfull()
@@ -1037,6 +1787,25 @@ class Slab(s_base.Base):
         finally:
             self._relXactForReading()
 
+    def getmulti(self, lkeys, db=None):
+        '''
+        Get the values for many keys using a single cursor.
+
+        Args:
+            lkeys (list): A list of key bytes.
+            db (str): The name of the db.
+
+        Returns:
+            list: A list of (lkey, lval) tuples in sorted key order ( lval is None if not present ).
+        '''
+        self._acqXactForReading()
+        realdb, _ = self.dbnames[db]
+        try:
+            with self.xact.cursor(db=realdb) as curs:
+                return [(lkey, curs.get(lkey)) for lkey in sorted(set(lkeys))]
+        finally:
+            self._relXactForReading()
+
     def last(self, db=None):
         '''
         Return the last key/value pair from the given db.
@@ -1254,30 +2023,180 @@ class Slab(s_base.Base):
 
             yield from scan.iternext()
 
+    async def aScanByDups(self, lkey, db=None):
+        '''
+        Yield the dup rows for lkey using read transactions on a worker thread.
+        '''
+        async for item in self._aScan(ThreadScan(self, db, lmin=lkey, pref=lkey, exact=True)):
+            yield item
+
+    async def aScanByPref(self, byts, db=None):
+        '''
+        Yield the rows with the given key prefix using read transactions on a worker thread.
+        '''
+        async for item in self._aScan(ThreadScan(self, db, lmin=byts, pref=byts)):
+            yield item
+
+    async def aScanByRange(self, lmin, lmax=None, db=None):
+        '''
+        Yield the rows within a key range using read transactions on a worker thread.
+        '''
+        async for item in self._aScan(ThreadScan(self, db, lmin=lmin, lmax=lmax)):
+            yield item
+
+    async def aScanByFull(self, db=None):
+        '''
+        Yield every row in the db using read transactions on a worker thread.
+        '''
+        async for item in self._aScan(ThreadScan(self, db)):
+            yield item
+
+    async def _aScan(self, scan):
+        '''
+        Stream the rows from a ThreadScan back to the ioloop in batches.
+
+        Notes:
+            Read transactions only see committed data, so while the slab has pending
+            writes each batch is read from the write transaction on the ioloop ( like
+            the scanBy* methods ) rather than committing the writes early.
+        '''
+        count = ScanCounter.get()
+
+        self.threadscans.add(scan)
+
+        try:
+
+            while not scan.done:
+
+                # the scan may be moved to another slab ( see _moveScans() )
+                slab = scan.slab
+
+                if slab.isfini:
+                    raise s_exc.IsFini()
+
+                if slab.dirty:
+                    items = scan.next(xact=slab.xact)
+                else:
+                    items = await s_coro.executor(scan.next)
+
+                slab.scanrows += len(items)
+                if count is not None:
+                    count.rows += len(items)
+
+                for item in items:
+                    yield item
+
+        finally:
+            scan.slab.threadscans.discard(scan)
+
+    def _setMovedPath(self, path):
+        '''
+        Update the path of an open slab whose directory has been renamed.
+        '''
+        if self.allslabs.get(self.path) is self:
+            self.allslabs.pop(self.path)
+
+        self.path = path
+        self.optspath = s_common.switchext(path, ext='.opts.yaml')
+        self.allslabs[path] = self
+
+    def _moveScans(self, slab):
+        '''
+        Move the scans in progress on this slab to another slab containing the same dbs and rows.
+
+        Notes:
+            This allows a copy of a slab to be swapped in without interrupting its readers.  Any
+            thread scan batch in progress is completed before the scans are moved, and on-loop
+            scans resume from their last row using the transaction of the new slab.
+        '''
+        names = {db: name for (name, (db, dupsort)) in self.dbnames.items()}
+
+        def getdb(scan):
+            name = names.get(scan.db, s_common.novalu)
+            if name is s_common.novalu:  # pragma: no cover
+                return None
+            return slab.dbnames.get(name)
+
+        with self.readlock.exclusive():
+
+            for scan in list(self.scans):
+
+                dbinfo = getdb(scan)
+                if dbinfo is None:  # pragma: no cover
+                    continue
+
+                scan.bump()
+
+                self.scans.discard(scan)
+                scan.slab = slab
+                scan.db = dbinfo[0]
+                slab.scans.add(scan)
+
+            for scan in list(self.threadscans):
+
+                dbinfo = getdb(scan)
+                if dbinfo is None:  # pragma: no cover
+                    continue
+
+                self.threadscans.discard(scan)
+                scan.slab = slab
+                scan.db = dbinfo[0]
+                slab.threadscans.add(scan)
+
     def _initCoXact(self):
         try:
             self.xact = self.lenv.begin(write=not self.readonly)
         except lmdb.MapResizedError:
             # This is what happens when some *other* process increased the mapsize.  setting mapsize to 0 should
             # set my mapsize to whatever the other process raised it to
-            self.lenv.set_mapsize(0)
+            with self.readlock.exclusive():
+                self.lenv.set_mapsize(0)
             self.mapsize = self.lenv.info()['map_size']
             self.xact = self.lenv.begin(write=not self.readonly)
         self.dirty = False
 
-    def _logXactOper(self, func, *args, **kwargs):
-        self.xactops.append((func, args, kwargs))
+    def _logXactOper(self, func, size, *args, **kwargs):
+
+        self.xactops.append(func.__name__, args, kwargs, size)
+        self.xactbytes += size
 
         if len(self.xactops) == self.max_xactops_len:
             self.syncevnt.set()
 
+        elif self.commitbytes is not None and self.xactbytes >= self.commitbytes:
+            self.syncevnt.set()
+
+        elif self.xactlimit is not None and self.xactbytes >= self.xactlimit:
+            self.syncevnt.set()
+
     def _runXactOpers(self):
         # re-run transaction operations in the event of an abort.  Return the last operation's return value.
         retn = None
-        for (f, a, k) in self.xactops:
-            retn = f(*a, **k)
+        for (name, a, k) in self.xactops:
+            retn = getattr(self, name)(*a, **k)
         return retn
 
+    def _checkMapHeadroom(self):
+        '''
+        Grow the map between transactions if the unused space at the end of the map is running low.
+
+        Notes:
+            The map may not be resized while a transaction is open, so this must only be called between
+            committing a transaction and beginning the next.
+        '''
+        used = (self.lenv.info()['last_pgno'] + 1) * self.pagesize
+
+        # leave room for at least two transactions the size of the last one
+        want = max(int(self.mapsize * MAP_HEADROOM), self.xactbytes * 2)
+
+        while self.mapsize - used < want:
+            if self.maxsize is not None and self.mapsize >= self.maxsize:
+                break
+            self._growMapSize()
+
+        # commit early if the next transaction would use up half of the remaining space
+        self.xactlimit = max(self.mapsize - used, 0) // 2
+
     def _handle_mapfull(self):
         [scan.bump() for scan in self.scans]
 
@@ -1316,7 +2235,8 @@ class Slab(s_base.Base):
             self.dirty = True
 
             if not self.recovering:
-                self._logXactOper(calling_func, lkey, *args, db=db, **kwargs)
+                size = len(lkey) + sum(len(a) for a in args if a is not None)
+                self._logXactOper(calling_func, size, lkey, *args, db=db, **kwargs)
 
             return xact_func(self.xact, lkey, *args, db=realdb, **kwargs)
 
@@ -1341,7 +2261,8 @@ class Slab(s_base.Base):
             self.dirty = True
 
             if not self.recovering:
-                self._logXactOper(self.putmulti, kvpairs, dupdata=dupdata, append=append, db=db)
+                size = sum(len(lkey) + len(lval) for (lkey, lval) in kvpairs)
+                self._logXactOper(self.putmulti, size, kvpairs, dupdata=dupdata, append=append, db=db)
 
             with self.xact.cursor(db=realdb) as curs:
                 return curs.putmulti(kvpairs, dupdata=dupdata, append=append)
@@ -1438,14 +2359,155 @@ class Slab(s_base.Base):
 
         # ok... lets commit and re-open
         starttime = s_common.now()
+        tick = time.perf_counter()
         self._finiCoXact()
         donetime = s_common.now()
 
+        self.commithist.add((time.perf_counter() - tick) * 1000)
+        self.lastcommit = time.monotonic()
         self.commitstats.append((starttime, xactopslen, donetime - starttime))
 
+        self._checkMapHeadroom()
+        self.xactbytes = 0
+
         self._initCoXact()
         return True
 
+class ThreadScan:
+    '''
+    A state-object used by the Slab aScanBy* methods.  Not to be instantiated directly.
+
+    Each batch of rows is read from a worker thread using a new read-only
+    transaction which is closed before the batch is returned, so no transaction
+    is held open while rows are being consumed by the ioloop.
+
+    Args:
+        slab (Slab):  which slab the scan is over
+        db (str):  name of open database on the slab
+        lmin (bytes):  the first key to scan from
+        lmax (bytes):  the (inclusive, prefix compared) last key to scan
+        pref (bytes):  a prefix all keys must match
+        exact (bool):  all keys must match pref exactly
+        size (int):  the number of rows to read per batch
+    '''
+    def __init__(self, slab, db, lmin=None, lmax=None, pref=None, exact=False, size=None):
+        self.slab = slab
+        self.db, self.dupsort = slab.dbnames[db]
+
+        if size is None:
+            size = READ_BATCH_SIZE
+
+        self.lmin = lmin
+        self.lmax = lmax
+        self.pref = pref
+        self.exact = exact
+        self.size = size
+
+        self.done = False
+        self.atitem = None
+
+    def _seek(self, curs):
+
+        if self.atitem is None:
+
+            if self.lmin is None:
+                return curs.first()
+
+            return curs.set_range(self.lmin)
+
+        lkey, lval = self.atitem
+
+        if self.dupsort:
+
+            if curs.set_range_dup(lkey, lval):
+                if curs.item() == self.atitem:
+                    return curs.next()
+                return True
+
+            if not curs.set_range(lkey):
+                return False
+
+            if curs.key() == lkey:
+                return curs.next_nodup()
+
+            return True
+
+        if not curs.set_range(lkey):
+            return False
+
+        if curs.key() == lkey:
+            return curs.next()
+
+        return True
+
+    def _isPastEnd(self, lkey):
+
+        if self.exact:
+            return lkey != self.pref
+
+        if self.pref is not None and lkey[:len(self.pref)] != self.pref:
+            return True
+
+        if self.lmax is not None and lkey[:len(self.lmax)] > self.lmax:
+            return True
+
+        return False
+
+    def next(self, xact=None):
+        '''
+        Return the next batch of rows.
+
+        Args:
+            xact (lmdb.Transaction): A transaction to read from, or None to read from a new
+                                     read transaction ( from a worker thread ).
+        '''
+        if xact is not None:
+            return self._nextFrom(xact)
+
+        while True:
+
+            slab = self.slab
+
+            with slab.readlock.reader():
+
+                # the scan was moved while we waited for the lock
+                if self.slab is not slab:
+                    continue
+
+                if slab.isfini:
+                    raise s_exc.IsFini()
+
+                with slab.lenv.begin(buffers=False) as xact:
+                    return self._nextFrom(xact)
+
+    def _nextFrom(self, xact):
+
+        retn = []
+
+        with xact.cursor(db=self.db) as curs:
+
+            if not self._seek(curs):
+                self.done = True
+                return retn
+
+            for item in curs.iternext():
+
+                if self._isPastEnd(item[0]):
+                    self.done = True
+                    break
+
+                retn.append(item)
+                if len(retn) >= self.size:
+                    break
+
+            else:
+                self.done = True
+
+        if retn:
+            self.atitem = retn[-1]
+
+        return retn
+
 class Scan:
     '''
     A state-object used by Slab.  Not to be instantiated directly.
@@ -1462,6 +2524,7 @@ class Scan:
         self.atitem = None
         self.bumped = False
         self.curs = None
+        self.count = ScanCounter.get()
 
     def __enter__(self):
         self.slab._acqXactForReading()
@@ -1510,6 +2573,10 @@ class Scan:
 
             while True:
 
+                self.slab.scanrows += 1
+                if self.count is not None:
+                    self.count.rows += 1
+
                 yield self.atitem
 
                 if self.bumped:
@@ -11,6 +11,51 @@ import synapse.lib.layer as s_layer
 
 logger = logging.getLogger(__name__)
 
+def joinSodes(sodes, name):
+    '''
+    Join one field of a node from a list of (layr, sode) tuples ordered from bottom to top.
+
+    Returns:
+        ((dict, dict)): The joined values and the layer which set each value.
+    '''
+    valu = {}
+    layrs = {}
+
+    for layr, sode in sodes:
+
+        stor = sode.get(name)
+        if not stor:
+            continue
+
+        if name == 'props' or name == 'tagprops':
+            for key, (v, stype) in stor.items():
+                valu[key] = v
+                layrs[key] = layr
+            continue
+
+        valu.update(stor)
+        layrs.update(dict.fromkeys(stor.keys(), layr))
+
+    return valu, layrs
+
+class NodeLayers(dict):
+    '''
+    Tracks which layer each node property, tag, and tagprop is retrieved from.
+
+    The props, tags, and tagprops maps are joined from the storage nodes on first access.
+    '''
+    def __init__(self, sodes, ndef=None):
+        dict.__init__(self, ndef=ndef)
+        self.sodes = sodes
+
+    def __missing__(self, name):
+        if name not in ('props', 'tags', 'tagprops'):
+            raise KeyError(name)
+
+        valu = joinSodes(self.sodes, name)[1]
+        dict.__setitem__(self, name, valu)
+        return valu
+
 class Node:
     '''
     A Cortex hypergraph node.
@@ -18,7 +63,7 @@ class Node:
     NOTE: This object is for local Cortex use during a single Xact.
     '''
     # def __init__(self, snap, buid=None, rawprops=None, proplayr=None):
-    def __init__(self, snap, sode, bylayer=None):
+    def __init__(self, snap, sode, bylayer=None, sodes=None):
         self.snap = snap
         self.sode = sode
 
@@ -27,25 +72,37 @@ class Node:
         # Tracks which property is retrieved from which layer
         self.bylayer = bylayer
 
+        # If set, the (layr, sode) tuples which props/tags/tagprops/nodedata are joined from on first access
+        self.sodes = sodes
+
         # if set, the node is complete.
         self.ndef = sode[1].get('ndef')
         self.form = snap.core.model.form(self.ndef[0])
 
-        self.props = sode[1].get('props')
-        if self.props is None:
-            self.props = {}
+        for name in ('props', 'tags', 'tagprops', 'nodedata'):
+
+            valu = sode[1].get(name)
+            if valu is None:
+                if sodes is not None:
+                    continue
+                valu = {}
+
+            setattr(self, name, valu)
 
-        self.tags = sode[1].get('tags')
-        if self.tags is None:
-            self.tags = {}
+    def __getattr__(self, name):
 
-        self.tagprops = sode[1].get('tagprops')
-        if self.tagprops is None:
-            self.tagprops = {}
+        # only called for attributes which have not been set ( the lazily joined fields )
+        sodes = self.__dict__.get('sodes')
+        if sodes is None or name not in ('props', 'tags', 'tagprops', 'nodedata'):
+            raise AttributeError(name)
 
-        self.nodedata = sode[1].get('nodedata')
-        if self.nodedata is None:
-            self.nodedata = {}
+        valu, layrs = joinSodes(sodes, name)
+        setattr(self, name, valu)
+
+        if name != 'nodedata' and isinstance(self.bylayer, NodeLayers):
+            self.bylayer.setdefault(name, layrs)
+
+        return valu
 
     def __repr__(self):
         return f'Node{{{self.pack()}}}'
@@ -669,22 +726,38 @@ class Node:
 class Path:
     '''
     A path context tracked through the storm runtime.
+
+    Notes:
+        A path is forked for each pivot, so forking does not copy the path.  The nodes are
+        kept as a linked list shared with the path it was forked from, and the variables are
+        shared until either path modifies them.  Paths which do not keep their node history
+        ( see Runtime.keeppath ) only link the most recent node, which allows the earlier
+        nodes to be released.
     '''
-    def __init__(self, runt, vars, nodes):
+    def __init__(self, runt, vars, nodes, link=None):
 
-        self.node = None
         self.runt = runt
         # we must "smell" like a runt for some AST ops
         self.snap = runt.snap
         self.model = runt.model
-        self.nodes = nodes
 
+        # a linked list of ( node, link ) tuples from the most recent node
+        self.link = link
+        for node in nodes:
+            self.link = (node, self.link)
+
+        self._nodes = None
+
+        self.node = None
+        if self.link is not None:
+            self.node = self.link[0]
+
+        self.keep = runt.keeppath
         self.traces = []
 
-        if len(nodes):
-            self.node = nodes[-1]
+        self._vars = vars
+        self.varsowned = True
 
-        self.vars = vars
         self.frames = []
         self.ctors = {}
 
@@ -697,6 +770,35 @@ class Path:
 
         self.metadata = {}
 
+    @property
+    def vars(self):
+        # copy our vars before they may be modified if they are shared
+        if not self.varsowned:
+            self._vars = dict(self._vars)
+            self.varsowned = True
+        return self._vars
+
+    @vars.setter
+    def vars(self, valu):
+        self._vars = valu
+        self.varsowned = True
+
+    @property
+    def nodes(self):
+        # the list is only constructed when asked for
+        if self._nodes is None:
+
+            self._nodes = []
+
+            link = self.link
+            while link is not None:
+                self._nodes.append(link[0])
+                link = link[1]
+
+            self._nodes.reverse()
+
+        return self._nodes
+
     def trace(self):
         '''
         Construct and return a Trace object for this path.
@@ -708,7 +810,7 @@ class Path:
     def getVar(self, name, defv=s_common.novalu):
 
         # check if the name is in our variables
-        valu = self.vars.get(name, s_common.novalu)
+        valu = self._vars.get(name, s_common.novalu)
         if valu is not s_common.novalu:
             return valu
 
@@ -740,12 +842,21 @@ class Path:
             ret['nodes'] = [node.iden() for node in self.nodes]
         return ret
 
+    def _share(self, link):
+
+        path = Path(self.runt, self._vars, (), link=link)
+        path.keep = self.keep
+
+        path.varsowned = False
+        self.varsowned = False
+
+        return path
+
     def fork(self, node):
 
-        nodes = list(self.nodes)
-        nodes.append(node)
+        link = self.link if self.keep else None
 
-        path = Path(self.runt, dict(self.vars), nodes)
+        path = self._share((node, link))
         path.traces.extend(self.traces)
 
         [t.addFork(path) for t in self.traces]
@@ -753,9 +864,7 @@ class Path:
         return path
 
     def clone(self):
-        path = Path(self.runt,
-                    copy.copy(self.vars),
-                    copy.copy(self.nodes),)
+        path = self._share(self.link)
         path.traces = list(self.traces)
         path.frames = [(copy.copy(vars), runt) for (vars, runt) in self.frames]
         return path
@@ -763,7 +872,7 @@ class Path:
     def initframe(self, initvars=None, initrunt=None):
 
         # full copy for now...
-        framevars = self.vars.copy()
+        framevars = self._vars.copy()
         if initvars is not None:
             framevars.update(initvars)
 
@@ -778,7 +887,7 @@ class Path:
     def finiframe(self, runt):
 
         if not self.frames:
-            self.vars.clear()
+            self.vars = {}
             self.runt = runt
             return
 
@@ -796,16 +905,21 @@ class Trace:
 
     def addPath(self, path):
 
-        [self.nodes.add(n) for n in path.nodes]
+        nodes = path.nodes
 
-        for i in range(len(path.nodes[:-1])):
-            n1 = path.nodes[i]
-            n2 = path.nodes[i + 1]
+        [self.nodes.add(n) for n in nodes]
+
+        for i in range(len(nodes[:-1])):
+            n1 = nodes[i]
+            n2 = nodes[i + 1]
             self.edges.add((n1, n2))
 
     def addFork(self, path):
         self.nodes.add(path.node)
-        self.edges.add((path.nodes[-2], path.nodes[-1]))
+
+        prev = path.link[1]
+        if prev is not None:
+            self.edges.add((prev[0], path.node))
 
 def props(pode):
     '''
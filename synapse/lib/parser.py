@@ -1,4 +1,5 @@
 import ast
+import copy
 import lark  # type: ignore
 import regex  # type: ignore
 
@@ -322,10 +323,33 @@ class AstConverter(lark.Transformer):
 with s_datfile.openDatFile('synapse.lib/storm.lark') as larkf:
     _grammar = larkf.read().decode()
 
-QueryParser = lark.Lark(_grammar, regex=True, start='query', propagate_positions=True)
-LookupParser = lark.Lark(_grammar, regex=True, start='lookup', propagate_positions=True)
-StormCmdParser = lark.Lark(_grammar, regex=True, start='stormcmdargs', propagate_positions=True)
-CmdrParser = lark.Lark(_grammar, regex=True, start='cmdrargs', propagate_positions=True)
+_starts = ('query', 'lookup', 'stormcmdargs', 'cmdrargs')
+
+@s_cache.memoize()
+def getStormLark():
+    '''
+    Get the lark parser for the storm grammar.
+
+    Notes:
+        The grammar analysis is only done once for all the start rules and is
+        deferred until the first parse.
+    '''
+    return lark.Lark(_grammar, regex=True, start=list(_starts), propagate_positions=True)
+
+class LarkParser:
+    '''
+    Parse text from one start rule of the storm grammar.
+    '''
+    def __init__(self, start):
+        self.start = start
+
+    def parse(self, text):
+        return getStormLark().parse(text, start=self.start)
+
+QueryParser = LarkParser('query')
+LookupParser = LarkParser('lookup')
+StormCmdParser = LarkParser('stormcmdargs')
+CmdrParser = LarkParser('cmdrargs')
 
 _eofre = regex.compile(r'''Terminal\('(\w+)'\)''')
 
@@ -410,6 +434,213 @@ def parseQuery(text, mode='storm'):
 
     return Parser(text).query()
 
+# The prefix of the variable names which replace literal values in a parameterized query
+PARAM_PREFIX = '__param'
+
+# Literal values which may be replaced by variables ( comments are matched to skip them )
+_paramre = regex.compile(r'''
+    (?P<comm>//[^\n]*|/\*.*?\*/)
+    |(?P<dquo>"(?:[^"\\]|\\.)*")
+    |(?P<squo>'[^']*')
+    |(?<==\s*)(?P<word>\w[\w.:-]*)(?=[\s\])}|,]|$)
+''', regex.VERBOSE | regex.DOTALL)
+
+_paramvarre = regex.compile(r'\$' + PARAM_PREFIX + r'(\d+)\b')
+
+def getQueryParams(text):
+    '''
+    Find the literal values in storm query text which may be replaced by variables.
+
+    Notes:
+        Only quoted strings and unquoted words following an "=" are considered.
+        Whether each one may actually be replaced is checked by parseParamQuery().
+
+    Returns:
+        list: A list of (offs, endoffs, valu) tuples.
+    '''
+    if PARAM_PREFIX in text:
+        return []
+
+    params = []
+    for mat in _paramre.finditer(text):
+
+        kind = mat.lastgroup
+        if kind == 'comm':
+            continue
+
+        byts = mat.group(kind)
+        if kind == 'dquo':
+            try:
+                valu = unescape(byts)
+            except Exception:
+                continue
+
+        elif kind == 'squo':
+            valu = byts[1:-1]
+
+        else:
+            valu = byts
+
+        params.append((mat.start(kind), mat.end(kind), valu))
+
+    return params
+
+def getParamText(text, params, literals=()):
+    '''
+    Replace the literal values in storm query text with $__param<indx> variables.
+
+    Args:
+        text (str): The storm query text.
+        params (list): The (offs, endoffs, valu) tuples from getQueryParams().
+        literals (set): The indexes of params which should not be replaced.
+    '''
+    offs = 0
+    segs = []
+    for indx, (soff, eoff, valu) in enumerate(params):
+
+        if indx in literals:
+            continue
+
+        segs.append(text[offs:soff])
+        segs.append(f'${PARAM_PREFIX}{indx}')
+        offs = eoff
+
+    segs.append(text[offs:])
+    return ''.join(segs)
+
+class ParamQuery:
+    '''
+    A parsed storm query which has variables in place of its literal values.
+
+    Args:
+        query (s_ast.Query): The parsed query with $__param<indx> variables.
+        paths (dict): The kid indexes of the path to each param variable by param index.
+        literals (dict): The values of params which were left in the query text.
+    '''
+    def __init__(self, query, paths, literals):
+        self.query = query
+        self.paths = paths
+        self.literals = literals
+
+    def fill(self, text, params):
+        '''
+        Get a copy of the query with the param variables replaced by Const values.
+
+        Returns:
+            (s_ast.Query|None): The query or None if the literals do not match.
+        '''
+        for indx, valu in self.literals.items():
+            if params[indx][2] != valu:
+                return None
+
+        query = copy.deepcopy(self.query)
+        query.text = text.strip()
+
+        for indx, path in self.paths.items():
+
+            astn = query
+            for kidx in path[:-1]:
+                astn = astn.kids[kidx]
+
+            const = s_ast.Const(params[indx][2])
+            const.parent = astn
+            const.pindex = path[-1]
+
+            astn.kids[path[-1]] = const
+
+        return query
+
+def _getAstAttrs(astn):
+    return {k: v for (k, v) in vars(astn).items() if k not in ('kids', 'parent', 'pindex', 'text')}
+
+def _cmpParamAst(rawn, tmpn, params, path, paths, keep):
+    '''
+    Compare a parsed query to the same query parsed with param variables.
+
+    Returns:
+        bool: False if the queries differ other than by the param variables.
+    '''
+    if type(tmpn) is s_ast.VarValue and len(tmpn.kids) == 1 and type(tmpn.kids[0]) is s_ast.Const:
+
+        name = tmpn.kids[0].valu
+        if isinstance(name, str) and name.startswith(PARAM_PREFIX):
+
+            indx = int(name[len(PARAM_PREFIX):])
+            if type(rawn) is s_ast.Const and not rawn.kids and rawn.valu == params[indx][2]:
+                paths[indx] = path
+            else:
+                keep.add(indx)
+
+            return True
+
+    if type(rawn) is not type(tmpn) or len(rawn.kids) != len(tmpn.kids):
+        return False
+
+    tmpattrs = _getAstAttrs(tmpn)
+    if _getAstAttrs(rawn) != tmpattrs or getattr(rawn, 'text', None) != getattr(tmpn, 'text', None):
+
+        # query text captured from the template ( such as a command argument subquery ) must keep its literals
+        idxs = [int(i) for i in _paramvarre.findall(repr(tmpattrs) + str(getattr(tmpn, 'text', '')))]
+        if not idxs:
+            return False
+
+        keep.update(idxs)
+
+    for kidx, (rawk, tmpk) in enumerate(zip(rawn.kids, tmpn.kids)):
+        if not _cmpParamAst(rawk, tmpk, params, path + (kidx,), paths, keep):
+            return False
+
+    return True
+
+def parseParamQuery(text, params):
+    '''
+    Parse storm query text with its literal values replaced by variables.
+
+    Args:
+        text (str): The storm query text.
+        params (list): The (offs, endoffs, valu) tuples from getQueryParams().
+
+    Notes:
+        The query is also parsed with its literal values to confirm that replacing them
+        does not change the structure of the query.  Literal values which may not be
+        replaced ( such as those within a command argument subquery ) are left in place.
+
+    Returns:
+        (ParamQuery|None): The parameterized query or None if no values may be replaced.
+    '''
+    rawq = parseQuery(text)
+
+    literals = {}
+    for _ in range(2):
+
+        try:
+            tmpq = Parser(getParamText(text, params, literals=literals)).query()
+        except s_exc.BadSyntax:
+            return None
+
+        keep = set()
+        paths = {}
+
+        if _getAstAttrs(rawq) != _getAstAttrs(tmpq) or len(rawq.kids) != len(tmpq.kids):
+            return None
+
+        for kidx, (rawk, tmpk) in enumerate(zip(rawq.kids, tmpq.kids)):
+            if not _cmpParamAst(rawk, tmpk, params, (kidx,), paths, keep):
+                return None
+
+        if not keep:
+            break
+
+        literals.update({indx: params[indx][2] for indx in keep})
+
+    else:
+        return None
+
+    if not paths or len(paths) + len(literals) != len(params):
+        return None
+
+    return ParamQuery(tmpq, paths, literals)
+
 def massage_vartokn(x):
     return s_ast.Const('' if not x else (x[1:-1] if x[0] == "'" else (unescape(x) if x[0] == '"' else x)))
 
@@ -537,16 +768,18 @@ alist: "(" _WS? valu (_WS? "," _WS? valu)* _WS? ")"
 JUSTCHARS: /[^()=\[\]{}'"\s]*[^,()=\[\]{}'"\s]/
 '''
 
-CmdStringParser = lark.Lark(CmdStringGrammar,
-                            start='cmdstring',
-                            regex=True,
-                            propagate_positions=True)
+@s_cache.memoize()
+def getCmdStringLark():
+    return lark.Lark(CmdStringGrammar,
+                     start='cmdstring',
+                     regex=True,
+                     propagate_positions=True)
 
 def parse_cmd_string(text, off):
     '''
     Parse in a command line string which may be quoted.
     '''
-    tree = CmdStringParser.parse(text[off:])
+    tree = getCmdStringLark().parse(text[off:])
     valu, newoff = CmdStringer().transform(tree)
     return valu, off + newoff
 
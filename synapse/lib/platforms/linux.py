@@ -131,6 +131,27 @@ def munlock(address, length):
     err = c.get_errno()
     raise OSError(err, os.strerror(err))
 
+# int mincore(void *addr, size_t length, unsigned char *vec);
+_mincore = libc.mincore
+_mincore.restype = c.c_int
+_mincore.argtypes = [c.c_void_p, c.c_size_t, c.POINTER(c.c_ubyte)]
+
+def mincore(address, length):
+    '''
+    Return a bytes object with one byte per page of the ( page aligned ) memory range which is
+    non-zero if the page is resident, raising an OSError on error
+    '''
+    pagesize = resource.getpagesize()
+
+    vec = (c.c_ubyte * ((length + pagesize - 1) // pagesize))()
+
+    retn = _mincore(address, length, vec)
+    if not retn:
+        return bytes(vec)
+
+    err = c.get_errno()
+    raise OSError(err, os.strerror(err))
+
 # void *mmap(void *addr, size_t length, int prot, int flags, int fd, off_t offset);
 _mmap = libc.mmap
 _mmap.restype = c.c_void_p
@@ -240,4 +240,5 @@ class SlabSeqn:
             return True
 
         evnt = self.getOffsetEvent(offs)
-        return await s_coro.event_wait(evnt, timeout=timeout)
+        with self.slab.waiter():
+            return await s_coro.event_wait(evnt, timeout=timeout)
@@ -17,6 +17,7 @@ import synapse.lib.cache as s_cache
 import synapse.lib.layer as s_layer
 import synapse.lib.storm as s_storm
 import synapse.lib.types as s_types
+import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.spooled as s_spooled
 
 logger = logging.getLogger(__name__)
@@ -79,6 +80,13 @@ class Snap(s_base.Base):
         self.livenodes = weakref.WeakValueDictionary()  # buid -> Node
         self._warnonce_keys = set()
 
+        # the number of nodes joined from storage nodes ( used by the storm profiler and budgets )
+        self.nodejoins = 0
+        # the rows scanned while a profiled or budgeted storm query runs ( see Runtime.iterStormQuery )
+        self.scancount = s_lmdbslab.ScanCount()
+        self.profiler = None
+        self.budget = None
+
         self.onfini(self.stack.close)
         self.changelog = []
         self.tagtype = self.core.model.type('ival')
@@ -256,64 +264,53 @@ class Snap(s_base.Base):
             await asyncio.sleep(0)
             return node
 
-        ndef = None
-        tags = {}
-        props = {}
-        nodedata = {}
-        tagprops = {}
-
-        bylayer = {
-            'ndef': None,
-            'tags': {},
-            'props': {},
-            'tagprops': {},
-        }
+        self.nodejoins += 1
+        if self.budget is not None:
+            self.budget.check()
 
-        for layr in self.layers:
+        # only the ndef is joined here, the remaining node fields are joined on first access
+        if len(self.layers) == 1:
+
+            layr = self.layers[0]
 
             sode = cache.get(layr.iden)
             if sode is None:
                 sode = await layr.getStorNode(buid)
 
-            form = sode.get('form')
             valt = sode.get('valu')
-            if valt is not None:
-                ndef = (form, valt[0])
-                bylayer['ndef'] = layr
-
-            storprops = sode.get('props')
-            if storprops is not None:
-                for prop, (valu, stype) in storprops.items():
-                    props[prop] = valu
-                    bylayer['props'][prop] = layr
-
-            stortags = sode.get('tags')
-            if stortags is not None:
-                tags.update(stortags)
-                bylayer['tags'].update({p: layr for p in stortags.keys()})
-
-            stortagprops = sode.get('tagprops')
-            if stortagprops is not None:
-                for tagprop, (valu, stype) in stortagprops.items():
-                    tagprops[tagprop] = valu
-                    bylayer['tagprops'][tagprop] = layr
-
-            stordata = sode.get('nodedata')
-            if stordata is not None:
-                nodedata.update(stordata)
-
-        if ndef is None:
-            return None
-
-        pode = (buid, {
-            'ndef': ndef,
-            'tags': tags,
-            'props': props,
-            'nodedata': nodedata,
-            'tagprops': tagprops,
-        })
-
-        node = s_node.Node(self, pode, bylayer=bylayer)
+            if valt is None:
+                return None
+
+            ndef = (sode.get('form'), valt[0])
+            sodes = ((layr, sode),)
+            ndeflayr = layr
+
+        else:
+
+            ndef = None
+            sodes = []
+            ndeflayr = None
+
+            for layr in self.layers:
+
+                sode = cache.get(layr.iden)
+                if sode is None:
+                    sode = await layr.getStorNode(buid)
+
+                sodes.append((layr, sode))
+
+                valt = sode.get('valu')
+                if valt is not None:
+                    ndef = (sode.get('form'), valt[0])
+                    ndeflayr = layr
+
+            if ndef is None:
+                return None
+
+        pode = (buid, {'ndef': ndef})
+        bylayer = s_node.NodeLayers(sodes, ndef=ndeflayr)
+
+        node = s_node.Node(self, pode, bylayer=bylayer, sodes=sodes)
         self.livenodes[buid] = node
         self.buidcache.append(node)
 
@@ -621,6 +618,9 @@ class Snap(s_base.Base):
             mesg = 'The snapshot is in read-only mode.'
             raise s_exc.IsReadOnly(mesg=mesg)
 
+        if self.budget is not None:
+            self.budget.addEdits(edits)
+
         meta = await self.getSnapMeta()
 
         todo = s_common.todo('storNodeEdits', edits, meta)
@@ -940,6 +940,12 @@ class Snap(s_base.Base):
 
     async def iterNodeEdgesN1(self, buid, verb=None):
 
+        # a single layer can not contain duplicate edges
+        if len(self.layers) == 1:
+            async for edge in self.layers[0].iterNodeEdgesN1(buid, verb=verb):
+                yield edge
+            return
+
         async with await s_spooled.Set.anit(dirn=self.core.dirn) as edgeset:
 
             for layr in self.layers:
@@ -953,6 +959,12 @@ class Snap(s_base.Base):
 
     async def iterNodeEdgesN2(self, buid, verb=None):
 
+        # a single layer can not contain duplicate edges
+        if len(self.layers) == 1:
+            async for edge in self.layers[0].iterNodeEdgesN2(buid, verb=verb):
+                yield edge
+            return
+
         async with await s_spooled.Set.anit(dirn=self.core.dirn) as edgeset:
 
             for layr in self.layers:
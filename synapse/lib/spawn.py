@@ -21,6 +21,7 @@ import synapse.datamodel as s_datamodel
 
 import synapse.lib.base as s_base
 import synapse.lib.boss as s_boss
+import synapse.lib.cache as s_cache
 import synapse.lib.coro as s_coro
 import synapse.lib.hive as s_hive
 import synapse.lib.link as s_link
@@ -320,6 +321,7 @@ class SpawnCore(s_base.Base):
         self.spawninfo = spawninfo
 
         self.conf = spawninfo.get('conf')
+        self.querycache = s_cache.SlruCache(self.conf.get('storm:query:cache:size'))
         self.iden = spawninfo.get('iden')
         self.dirn = spawninfo.get('dirn')
 
@@ -518,11 +520,13 @@ class SpawnCore(s_base.Base):
     getStormMods = s_cortex.Cortex.getStormMods
     getStormPkg = s_cortex.Cortex.getStormPkg
     getStormQuery = s_cortex.Cortex.getStormQuery
+    _getParamStormQuery = s_cortex.Cortex._getParamStormQuery
     getStormSvc = s_cortex.Cortex.getStormSvc
     loadStormPkg = s_cortex.Cortex.loadStormPkg
 
     _initStormCmds = s_cortex.Cortex._initStormCmds
     _initStormOpts = s_cortex.Cortex._initStormOpts
+    _initStormBudget = s_cortex.Cortex._initStormBudget
 
     _viewFromOpts = s_cortex.Cortex._viewFromOpts
     _userFromOpts = s_cortex.Cortex._userFromOpts
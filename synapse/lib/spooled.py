@@ -102,3 +102,49 @@ class Set(Spooled):
             return
 
         self.realset.discard(valu)
+
+class List(Spooled):
+    '''
+    A minimal append only list-like implementation that will spool to a slab on large growth.
+    '''
+
+    async def __anit__(self, dirn=None, size=10000):
+        await Spooled.__anit__(self, dirn=dirn, size=size)
+        self.realitems = []
+        self.len = 0
+
+    def __len__(self):
+        '''
+        Returns how many items are in the list, regardless of whether in RAM or backed to slab
+        '''
+        return self.len
+
+    async def append(self, valu):
+
+        if self.fallback:
+            self.slab.put(s_common.int64en(self.len), s_msgpack.en(valu))
+            self.len += 1
+            return
+
+        self.realitems.append(valu)
+        self.len += 1
+
+        if self.len >= self.size:
+            await self._initFallBack()
+            self.slab.putmulti([(s_common.int64en(i), s_msgpack.en(v)) for i, v in enumerate(self.realitems)])
+            self.realitems.clear()
+
+    async def iter(self, offs=0):
+        '''
+        Yield the items in the list starting at the given offset.
+        '''
+        if offs < 0:
+            offs = 0
+
+        if not self.fallback:
+            for valu in self.realitems[offs:]:
+                yield valu
+            return
+
+        for _, byts in self.slab.scanByRange(s_common.int64en(offs)):
+            yield s_msgpack.un(byts)
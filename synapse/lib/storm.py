@@ -1,3 +1,4 @@
+import time
 import asyncio
 import logging
 import argparse
@@ -16,11 +17,21 @@ import synapse.lib.config as s_config
 import synapse.lib.scrape as s_scrape
 import synapse.lib.grammar as s_grammar
 import synapse.lib.spooled as s_spooled
+import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.provenance as s_provenance
 import synapse.lib.stormtypes as s_stormtypes
 
 logger = logging.getLogger(__name__)
 
+# the max length of the operator repr in a storm profile
+PROFILE_REPR_SIZE = 200
+
+# the max number of output nodes buffered for each parallel command queue
+PARALLEL_QUEUE_SIZE = 1000
+
+# the max number of seconds between checks for expired storm cursors
+CURSOR_CULL_PERIOD = 60
+
 addtriggerdescr = '''
 Add a trigger to the cortex.
 
@@ -228,6 +239,56 @@ reqValidDdef = s_config.getJsValidator({
     }
 })
 
+reqValidBudget = s_config.getJsValidator({
+    'type': 'object',
+    'properties': {
+        'timeout': {'type': 'number', 'exclusiveMinimum': 0},
+        'nodes': {'type': 'integer', 'minimum': 0},
+        'rows': {'type': 'integer', 'minimum': 0},
+        'edits': {'type': 'integer', 'minimum': 0},
+        'spool': {'type': 'integer', 'minimum': 0},
+    },
+    'additionalProperties': False,
+})
+
+def getStormBudget(user, budget=None):
+    '''
+    Get the storm budget limits for a user.
+
+    Args:
+        user (HiveUser): The user running the storm query.
+        budget (dict): Requested limits which may only lower the limits set for the user.
+
+    Notes:
+        Default limits are set by an admin in the "storm:budget" info of users and roles.
+        Limits set on the user take precedence over those set on their roles, and the
+        highest limit set on any of their roles is used.
+
+    Returns:
+        (dict): The merged budget limits.
+    '''
+    limits = {}
+    for role in user.getRoles():
+        rolelims = role.info.get('storm:budget')
+        if not rolelims:
+            continue
+
+        for name, valu in rolelims.items():
+            curv = limits.get(name)
+            limits[name] = valu if curv is None else max(curv, valu)
+
+    userlims = user.info.get('storm:budget')
+    if userlims:
+        limits.update(userlims)
+
+    if budget:
+        reqValidBudget(budget)
+        for name, valu in budget.items():
+            curv = limits.get(name)
+            limits[name] = valu if curv is None else min(curv, valu)
+
+    return limits
+
 stormcmds = (
     {
         'name': 'queue.add',
@@ -1047,6 +1108,405 @@ class StormDmon(s_base.Base):
                 self.err_evnt.set()
                 await self.waitfini(timeout=1)
 
+class StormCursor(s_base.Base):
+    '''
+    The spooled packed nodes produced by a storm query which may be paged through by its user.
+    '''
+    async def __anit__(self, core, user, text, ttl, spool):
+
+        await s_base.Base.__anit__(self)
+
+        self.iden = s_common.guid()
+        self.user = user.iden
+        self.text = text
+        self.ttl = ttl
+        self.created = s_common.now()
+        self.tick = time.monotonic()
+
+        # the cursor does not expire while its query is still running
+        self.building = True
+
+        self.podes = await s_spooled.List.anit(dirn=core.dirn, size=spool)
+        self.onfini(self.podes)
+
+    def __len__(self):
+        return len(self.podes)
+
+    def touch(self):
+        self.tick = time.monotonic()
+
+    def isExpired(self):
+        if self.building:
+            return False
+        return time.monotonic() - self.tick > self.ttl
+
+    async def getPage(self, offs, size):
+        '''
+        Get a page of packed nodes from the cursor.
+
+        Returns:
+            (dict): The page of packed nodes and the offset of the next page (or None).
+        '''
+        self.touch()
+
+        podes = []
+        if size > 0:
+            async for pode in self.podes.iter(offs=offs):
+                podes.append(pode)
+                if len(podes) >= size:
+                    break
+
+        offs = max(offs, 0)
+
+        nextoffs = offs + len(podes)
+        if nextoffs >= len(self.podes):
+            nextoffs = None
+
+        return {
+            'iden': self.iden,
+            'offs': offs,
+            'count': len(self.podes),
+            'nodes': podes,
+            'next': nextoffs,
+        }
+
+    def pack(self):
+        return {
+            'iden': self.iden,
+            'user': self.user,
+            'query': self.text,
+            'count': len(self.podes),
+            'created': self.created,
+        }
+
+class CursorManager(s_base.Base):
+    '''
+    Manager for StormCursor objects.
+
+    Notes:
+        Cursors which have not been used within their TTL are deleted.  The number
+        of nodes a user may hold across their cursors and the number of nodes each
+        cursor holds in memory before spooling them to disk are limited by the
+        "storm:cursor:nodes" and "storm:cursor:spool" cortex configuration options.
+    '''
+    async def __anit__(self, core):
+
+        await s_base.Base.__anit__(self)
+
+        self.core = core
+        self.cursors = {}
+
+        self.ttl = core.conf.get('storm:cursor:ttl')
+        self.maxnodes = core.conf.get('storm:cursor:nodes')
+        self.spool = core.conf.get('storm:cursor:spool')
+
+        self.onfini(self._finiAllCursors)
+        self.schedCoro(self._cullCursorsLoop())
+
+    async def _finiAllCursors(self):
+        await asyncio.gather(*[curs.fini() for curs in self.cursors.values()])
+
+    async def _cullCursorsLoop(self):
+
+        while not self.isfini:
+
+            await self.waitfini(timeout=min(self.ttl, CURSOR_CULL_PERIOD))
+
+            for curs in list(self.cursors.values()):
+                if curs.isExpired():
+                    await self.popCursor(curs.iden)
+
+    async def addCursor(self, view, text, opts, user):
+        '''
+        Run a storm query and spool the packed nodes it produces into a new cursor.
+
+        Returns:
+            (StormCursor): The new cursor.
+        '''
+        spool = getStormBudget(user, opts.get('budget')).get('spool')
+        if spool is None or spool > self.spool:
+            spool = self.spool
+
+        curs = await StormCursor.anit(self.core, user, text, self.ttl, max(spool, 1))
+        self.cursors[curs.iden] = curs
+
+        done = False
+        try:
+
+            async for pode in view.iterStormPodes(text, opts=opts):
+
+                # the nodes of other cursors being built by the user concurrently are included
+                if self._getUserNodes(user) >= self.maxnodes:
+                    mesg = f'Storm cursors exceeded the max number of nodes per user ({self.maxnodes}).'
+                    raise s_exc.StormBudgetExceeded(mesg=mesg, name='cursor:nodes', limit=self.maxnodes)
+
+                await curs.podes.append(pode)
+
+            done = True
+
+        finally:
+            if not done:
+                await self.popCursor(curs.iden)
+
+        curs.building = False
+        curs.touch()
+        return curs
+
+    def _getUserNodes(self, user):
+        return sum(len(c) for c in self.cursors.values() if c.user == user.iden)
+
+    def reqCursor(self, iden, user=None):
+        '''
+        Get a cursor by iden and confirm the user may access it.
+        '''
+        curs = self.cursors.get(iden)
+        if curs is None or curs.isExpired():
+            raise s_exc.NoSuchIden(mesg=f'No storm cursor with iden {iden}.', iden=iden)
+
+        if user is not None and curs.user != user.iden and not user.isAdmin():
+            mesg = f'User {user.name} may not access the storm cursor {iden}.'
+            raise s_exc.AuthDeny(mesg=mesg, user=user.name)
+
+        return curs
+
+    def getCursorDefs(self, user=None):
+        return [c.pack() for c in self.cursors.values() if user is None or c.user == user.iden]
+
+    async def popCursor(self, iden):
+        '''Remove the cursor and fini it if it exists.'''
+        curs = self.cursors.pop(iden, None)
+        if curs is not None:
+            await curs.fini()
+
+class StormProfiler:
+    '''
+    Collects per-operator statistics for a storm runtime.
+
+    Notes:
+        The times, scanned rows, and joined nodes of each operator do not include
+        those of its upstream operators but do include any subqueries it runs.
+        Rows and joins are counted per snap, so the rows scanned by other queries
+        on the same layers are not included.
+    '''
+    def __init__(self, runt):
+        self.runt = runt
+        self.snap = runt.snap
+        self.tick = time.perf_counter()
+        self.opers = {}
+        self.graph = []
+
+    def _getOperInfo(self, oper):
+
+        info = self.opers.get(oper)
+        if info is not None:
+            return info
+
+        depth = 0
+        astn = getattr(oper, 'parent', None)
+        while astn is not None:
+            if isinstance(astn, s_ast.Query):
+                depth += 1
+            astn = getattr(astn, 'parent', None)
+
+        info = self.opers[oper] = {
+            'oper': oper.__class__.__name__,
+            'repr': repr(oper)[:PROFILE_REPR_SIZE],
+            'depth': depth - 1,
+            'nodes:in': 0,
+            'nodes:out': 0,
+            'took': 0.0,
+            'rows': 0,
+            'joins': 0,
+        }
+        return info
+
+    def _getCounts(self):
+        return (time.perf_counter(), self.snap.scancount.rows, self.snap.nodejoins)
+
+    def _addCounts(self, info, counts, sign):
+        took, rows, joins = self._getCounts()
+        info['took'] += sign * (took - counts[0])
+        info['rows'] += sign * (rows - counts[1])
+        info['joins'] += sign * (joins - counts[2])
+
+    def addGraphDegree(self, degree, count, took):
+        '''
+        Record the nodes yielded and the time spent by a subgraph walking one degree out.
+        '''
+        self.graph.append({
+            'degree': degree,
+            'nodes': count,
+            'took': round(took * 1000, 3),
+        })
+
+    def iterOper(self, oper, runt, genr):
+        '''
+        Run a storm operator and record its statistics.
+        '''
+        info = self._getOperInfo(oper)
+        return self._iterOper(info, oper, runt, genr)
+
+    async def _iterOper(self, info, oper, runt, genr):
+
+        anext = genr.__aiter__().__anext__
+
+        async def ingenr():
+
+            # subtract the work done by upstream operators
+            while True:
+
+                counts = self._getCounts()
+                try:
+                    item = await anext()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    self._addCounts(info, counts, -1)
+
+                info['nodes:in'] += 1
+                yield item
+
+        outgenr = oper.run(runt, ingenr())
+
+        while True:
+
+            counts = self._getCounts()
+            try:
+                item = await outgenr.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                self._addCounts(info, counts, 1)
+
+            info['nodes:out'] += 1
+            yield item
+
+    def pack(self):
+        '''
+        Get the collected statistics in (msgpack safe) dictionary form.
+
+        Returns:
+            (dict): The total time, a list of per-operator stats in order of first execution,
+            and a list of per-degree stats for any subgraphs.
+        '''
+        opers = []
+        for info in self.opers.values():
+            info = dict(info)
+            info['took'] = round(info['took'] * 1000, 3)
+            opers.append(info)
+
+        return {
+            'took': round((time.perf_counter() - self.tick) * 1000, 3),
+            'opers': opers,
+            'graph': list(self.graph),
+        }
+
+class StormBudget:
+    '''
+    Enforces resource limits on a storm runtime and any runtimes derived from it.
+
+    Notes:
+        The limits are checked as nodes are joined, edits are applied, and the runtime
+        ticks.  The runtime task is also cancelled once the timeout expires, so a query
+        blocked in a single call does not run past its timeout.
+    '''
+    def __init__(self, runt, limits):
+
+        self.runt = runt
+        self.snap = runt.snap
+        self.limits = limits
+
+        self.timeout = limits.get('timeout')
+        self.maxnodes = limits.get('nodes')
+        self.maxrows = limits.get('rows')
+        self.maxedits = limits.get('edits')
+        self.spool = limits.get('spool')
+
+        self.tick = time.monotonic()
+        self.rows = self.snap.scancount.rows
+        self.joins = self.snap.nodejoins
+        self.edits = 0
+
+        self.task = None
+        self.timer = None
+        self.running = False
+        self.timedout = False
+
+        if self.timeout is not None:
+            self.timer = asyncio.get_event_loop().call_later(self.timeout, self._onTimeout)
+
+    def _onTimeout(self):
+        self.timedout = True
+        # only cancel the task while it is running the query rather than consuming its output
+        if self.running:
+            self.task.cancel()
+
+    def fini(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    async def step(self, anext):
+        '''
+        Run one step of the budgeted query, raising StormBudgetExceeded if it times out.
+        '''
+        self.check()
+
+        self.task = asyncio.current_task()
+        self.running = True
+
+        try:
+            return await anext()
+
+        except asyncio.CancelledError:
+            if self.timedout:
+                self._raiseExceeded('timeout', self.timeout)
+            raise
+
+        finally:
+            self.running = False
+
+    def _raiseExceeded(self, name, limit):
+        mesg = f'Storm query exceeded its {name} budget ({limit}).'
+        raise s_exc.StormBudgetExceeded(mesg=mesg, name=name, limit=limit)
+
+    def check(self):
+        '''
+        Raise StormBudgetExceeded if the runtime has exceeded any of its limits.
+        '''
+        if self.timedout or (self.timeout is not None and time.monotonic() - self.tick > self.timeout):
+            self._raiseExceeded('timeout', self.timeout)
+
+        if self.maxnodes is not None and self.snap.nodejoins - self.joins > self.maxnodes:
+            self._raiseExceeded('nodes', self.maxnodes)
+
+        if self.maxrows is not None and self.snap.scancount.rows - self.rows > self.maxrows:
+            self._raiseExceeded('rows', self.maxrows)
+
+    def _getEditCount(self, nodeedits):
+        count = 0
+        for _, _, edits in nodeedits:
+            count += len(edits)
+            for edit in edits:
+                # edits may include the node edits for nodes they create
+                count += self._getEditCount(edit[2])
+        return count
+
+    def addEdits(self, nodeedits):
+        '''
+        Account for node edits about to be applied by the runtime.
+        '''
+        self.edits += self._getEditCount(nodeedits)
+        if self.maxedits is not None and self.edits > self.maxedits:
+            self._raiseExceeded('edits', self.maxedits)
+
+        self.check()
+
+    def getSpoolSize(self, size):
+        if self.spool is None:
+            return size
+        return min(size, self.spool)
+
 class Runtime:
     '''
     A Runtime represents the instance of a running query.
@@ -1076,6 +1536,9 @@ class Runtime:
 
         self.inputs = []    # [synapse.lib.node.Node(), ...]
 
+        # whether paths keep their full node history ( see iterStormQuery )
+        self.keeppath = True
+
         self.iden = s_common.guid()
 
         varz = self.opts.get('vars')
@@ -1091,6 +1554,18 @@ class Runtime:
 
         self.proxies = {}
 
+        # runtimes created while a query is being profiled share its profiler
+        self.profiler = snap.profiler
+        if self.profiler is None and self.opts.get('profile'):
+            self.profiler = snap.profiler = StormProfiler(self)
+
+        # runtimes created within a budgeted query share its budget
+        self.budget = snap.budget
+        if self.budget is None and self.opts.get('budget'):
+            limits = self.opts.get('budget')
+            reqValidBudget(limits)
+            self.budget = snap.budget = StormBudget(self, limits)
+
     async def dyncall(self, iden, todo, gatekeys=()):
         return await self.snap.core.dyncall(iden, todo, gatekeys=gatekeys)
 
@@ -1136,13 +1611,41 @@ class Runtime:
         return await self.snap.warnonce(mesg, **info)
 
     def tick(self):
-        pass
+        if self.budget is not None:
+            self.budget.check()
 
     def cancel(self):
         self.task.cancel()
 
+    @property
+    def vars(self):
+        # copy our vars before they may be modified if they are shared with a path
+        if not self.varsowned:
+            self._vars = dict(self._vars)
+            self.varsowned = True
+        return self._vars
+
+    @vars.setter
+    def vars(self, valu):
+        self._vars = valu
+        self.varsowned = True
+
     def initPath(self, node):
-        return s_node.Path(self, dict(self.vars), [node])
+        path = s_node.Path(self, self._vars, [node])
+
+        # the path shares our vars until either of us modifies them
+        path.varsowned = False
+        self.varsowned = False
+
+        return path
+
+    async def getSpooledSet(self, size=10000):
+        '''
+        Get a spooled Set which holds no more items in memory than the runtime budget allows.
+        '''
+        if self.budget is not None:
+            size = self.budget.getSpoolSize(size)
+        return await s_spooled.Set.anit(dirn=self.snap.core.dirn, size=size)
 
     def getOpt(self, name, defval=None):
         return self.opts.get(name, defval)
@@ -1152,7 +1655,7 @@ class Runtime:
 
     def getVar(self, name, defv=None):
 
-        item = self.vars.get(name, s_common.novalu)
+        item = self._vars.get(name, s_common.novalu)
         if item is not s_common.novalu:
             return item
 
@@ -1224,9 +1727,61 @@ class Runtime:
             for name, valu in query.opts.items():
                 self.opts.setdefault(name, valu)
 
-            async for node, path in query.iterNodePaths(self, genr=genr):
-                self.tick()
-                yield node, path
+            # paths only keep their full node history if it may be used
+            self.keeppath = bool(self.opts.get('path')) or query.usesPath(self.snap.core)
+
+            profiler = None
+            if self.profiler is not None and self.profiler.runt is self:
+                profiler = self.profiler
+
+            budget = None
+            if self.budget is not None and self.budget.runt is self:
+                budget = self.budget
+
+            try:
+
+                genr = query.iterNodePaths(self, genr=genr)
+                if profiler is not None or budget is not None:
+                    genr = self._iterCounted(genr, budget)
+
+                async for node, path in genr:
+                    self.tick()
+                    yield node, path
+
+            finally:
+                if profiler is not None:
+                    self.snap.profiler = None
+                if budget is not None:
+                    budget.fini()
+                    self.snap.budget = None
+
+            if profiler is not None:
+                await self.snap.fire('profile', **profiler.pack())
+
+    async def _iterCounted(self, genr, budget=None):
+        '''
+        Count the rows scanned by each step of the query for its profiler and budget.
+        '''
+        anext = genr.__aiter__().__anext__
+
+        while True:
+
+            token = s_lmdbslab.ScanCounter.set(self.snap.scancount)
+
+            try:
+
+                if budget is not None:
+                    item = await budget.step(anext)
+                else:
+                    item = await anext()
+
+            except StopAsyncIteration:
+                return
+
+            finally:
+                s_lmdbslab.ScanCounter.reset(token)
+
+            yield item
 
     def canPropName(self, name):
         if name not in self.modulefuncs and name not in self.ctors:
@@ -1630,6 +2185,8 @@ class Cmd:
     pkgname = ''
     svciden = ''
     forms = {}  # type: ignore
+    # set to True by commands which run storm on the incoming paths ( see Query.usesPath() )
+    usespath = False
 
     def __init__(self, runt, runtsafe):
 
@@ -1880,17 +2437,17 @@ class UniqCmd(Cmd):
 
     async def execStormCmd(self, runt, genr):
 
-        buidset = set()
+        async with await runt.getSpooledSet() as buidset:
 
-        async for node, path in genr:
+            async for node, path in genr:
 
-            if node.buid in buidset:
-                # all filters must sleep
-                await asyncio.sleep(0)
-                continue
+                if node.buid in buidset:
+                    # all filters must sleep
+                    await asyncio.sleep(0)
+                    continue
 
-            buidset.add(node.buid)
-            yield node, path
+                await buidset.add(node.buid)
+                yield node, path
 
 class MaxCmd(Cmd):
     '''
@@ -2419,6 +2976,193 @@ class TeeCmd(Cmd):
                 async for nnode, npath in subr.iterStormQuery(query):
                     yield nnode, npath
 
+class ParallelCmd(Cmd):
+    '''
+    Execute a storm query for multiple input nodes concurrently.
+
+    Each input node is run through the query in its own runtime, using the
+    variables from its path, and the nodes it yields are given paths forked
+    from the input node's path.  Nodes are yielded as soon as they are
+    produced unless --ordered is specified.
+
+    Examples:
+
+        # Look up to 20 FQDNs using a storm service at a time
+        inet:fqdn#todo | parallel --size 20 { | myservice.lookup }
+
+        # Keep the output in the same order as the input nodes
+        inet:ipv4#todo | parallel --ordered { -> inet:dns:a }
+    '''
+    name = 'parallel'
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+
+        pars.add_argument('--size', type=int, default=8,
+                          help='The maximum number of input nodes to run the query for at once.')
+
+        pars.add_argument('--ordered', default=False, action='store_true',
+                          help='Yield the output of each input node in the order of the input nodes.')
+
+        pars.add_argument('query', help='The query to execute on the input nodes.')
+
+        return pars
+
+    async def _getParallelQuery(self, runt):
+
+        if self.opts.size < 1:
+            mesg = 'The parallel command --size must be greater than 0.'
+            raise s_exc.StormRuntimeError(mesg=mesg, size=self.opts.size)
+
+        text = self.opts.query
+        if text.startswith('{') and text.endswith('}'):
+            text = text[1:-1]
+
+        return await runt.getStormQuery(text)
+
+    async def execStormCmd(self, runt, genr):
+
+        # the options are set by the first node if the arguments are not runtsafe
+        genr = await s_ast.pullone(genr)
+        if self.opts is None:
+            return
+
+        tasks = set()
+
+        async def execquery(query, node, path, outq):
+
+            try:
+
+                subr = await runt.getScopeRuntime(query, opts={'vars': dict(path.vars)})
+                subr.addInput(node)
+
+                async for subn, subp in subr.iterStormQuery(query):
+                    realpath = path.fork(subn)
+                    realpath.vars.update(subp.vars)
+                    await outq.put(('node', (subn, realpath)))
+
+                await outq.put(('fini', None))
+
+            except asyncio.CancelledError:  # pragma: no cover
+                raise
+
+            except Exception as e:
+                await outq.put(('err', e))
+
+        def schedquery(query, node, path, outq):
+            task = runt.snap.schedCoro(execquery(query, node, path, outq))
+            task.add_done_callback(tasks.discard)
+            tasks.add(task)
+
+        try:
+
+            if self.opts.ordered:
+                genr = self._execOrdered(runt, genr, schedquery)
+            else:
+                genr = self._execUnordered(runt, genr, schedquery)
+
+            async for item in genr:
+                yield item
+
+        finally:
+            [task.cancel() for task in list(tasks)]
+
+    async def _execOrdered(self, runt, genr, schedquery):
+
+        # one queue per input node, drained in the order of the input nodes
+        pending = collections.deque()
+
+        async def drain():
+            outq = pending.popleft()
+            while True:
+                mesg, item = await outq.get()
+                if mesg == 'fini':
+                    return
+                if mesg == 'err':
+                    raise item
+                yield item
+
+        async for node, path in genr:
+
+            query = await self._getParallelQuery(runt)
+
+            while len(pending) >= self.opts.size:
+                async for item in drain():
+                    yield item
+
+            outq = asyncio.Queue(maxsize=PARALLEL_QUEUE_SIZE)
+            pending.append(outq)
+            schedquery(query, node, path, outq)
+
+        while pending:
+            async for item in drain():
+                yield item
+
+    async def _execUnordered(self, runt, genr, schedquery):
+
+        running = 0
+        outq = asyncio.Queue(maxsize=PARALLEL_QUEUE_SIZE)
+
+        # the next input node is pulled while the output is drained
+        pulltask = None
+        gettask = None
+        pulling = True
+
+        async def pull():
+            try:
+                return await genr.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        async def get():
+            return await outq.get()
+
+        try:
+
+            while True:
+
+                # the size is checked for each node as it may not be runtsafe
+                if pulltask is None and pulling and (not running or running < self.opts.size):
+                    pulltask = runt.snap.schedCoro(pull())
+
+                if gettask is None and running:
+                    gettask = runt.snap.schedCoro(get())
+
+                futs = [t for t in (pulltask, gettask) if t is not None]
+                if not futs:
+                    return
+
+                done, _ = await asyncio.wait(futs, return_when=asyncio.FIRST_COMPLETED)
+
+                if gettask in done:
+
+                    mesg, item = gettask.result()
+                    gettask = None
+
+                    if mesg == 'fini':
+                        running -= 1
+
+                    elif mesg == 'err':
+                        raise item
+
+                    else:
+                        yield item
+
+                if pulltask in done:
+
+                    item = pulltask.result()
+                    pulltask = None
+
+                    if item is None:
+                        pulling = False
+                    else:
+                        query = await self._getParallelQuery(runt)
+                        running += 1
+                        schedquery(query, *item, outq)
+
+        finally:
+            [task.cancel() for task in (pulltask, gettask) if task is not None]
+
 class TreeCmd(Cmd):
     '''
     Walk elements of a tree using a recursive pivot.
@@ -2904,7 +3648,7 @@ class LiftByVerb(Cmd):
 
     async def execStormCmd(self, runt, genr):
 
-        async with await s_spooled.Set.anit(dirn=self.runt.snap.core.dirn) as idenset:
+        async with await runt.getSpooledSet() as idenset:
 
             if self.runtsafe:
                 verb = await s_stormtypes.tostr(self.opts.verb)
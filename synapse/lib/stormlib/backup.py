@@ -15,7 +15,7 @@ class BackupLib(s_stormtypes.Lib):
             'del': self._delBackup,
         }
 
-    async def _runBackup(self, name=None, wait=True):
+    async def _runBackup(self, name=None, wait=True, base=None):
         '''
         Run a cortex backup.
 
@@ -24,13 +24,16 @@ class BackupLib(s_stormtypes.Lib):
 
             wait (bool): If true, wait for the backup to complete before returning.
 
+            base (str): The name of a previous backup to create an incremental backup from.
+
         Returns:
             str: The name of the newly created backup.
         '''
         name = await s_stormtypes.tostr(name, noneok=True)
         wait = await s_stormtypes.tobool(wait)
+        base = await s_stormtypes.tostr(base, noneok=True)
 
-        todo = s_common.todo('runBackup', name=name, wait=wait)
+        todo = s_common.todo('runBackup', name=name, wait=wait, base=base)
         gatekeys = ((self.runt.user.iden, ('backup', 'run'), None),)
         return await self.dyncall('cortex', todo, gatekeys=gatekeys)
 
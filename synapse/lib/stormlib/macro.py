@@ -94,6 +94,7 @@ class MacroExecCmd(s_storm.Cmd):
     '''
 
     name = 'macro.exec'
+    usespath = True
 
     def getArgParser(self):
         pars = s_storm.Cmd.getArgParser(self)
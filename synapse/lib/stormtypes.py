@@ -2754,6 +2754,7 @@ class Layer(Prim):
             'edits': self._methLayerEdits,
             'getTagCount': self._methGetTagCount,
             'getPropCount': self._methGetPropCount,
+            'getPropValues': self._methGetPropValues,
         }
 
     async def _methGetTagCount(self, tagname, formname=None):
@@ -2793,6 +2794,33 @@ class Layer(Prim):
         gatekeys = ((self.runt.user.iden, ('layer', 'read'), layriden),)
         return await self.runt.dyncall(layriden, todo, gatekeys=gatekeys)
 
+    async def _methGetPropValues(self, propname):
+        '''
+        Yield the values of the given full form/property name in the layer.
+
+        Example:
+            $tally = $lib.stats.tally()
+            for $asn in $lib.layer.get().getPropValues(inet:ipv4:asn) { $tally.inc($asn) }
+        '''
+        propname = await tostr(propname)
+
+        prop = self.runt.snap.core.model.prop(propname)
+        if prop is None:
+            mesg = f'No property named {propname}'
+            raise s_exc.NoSuchProp(mesg=mesg, name=propname)
+
+        if prop.isform:
+            todo = s_common.todo('iterPropValues', prop.name, None)
+        elif prop.isuniv:
+            todo = s_common.todo('iterPropValues', None, prop.name)
+        else:
+            todo = s_common.todo('iterPropValues', prop.form.name, prop.name)
+
+        layriden = self.valu.get('iden')
+        gatekeys = ((self.runt.user.iden, ('layer', 'read'), layriden),)
+        async for valu in self.runt.dyniter(layriden, todo, gatekeys=gatekeys):
+            yield valu
+
     async def _methLayerEdits(self, offs=0, wait=True):
         '''
         Yield (offs, nodeedits) tuples from the given offset.
@@ -165,6 +165,7 @@ class View(s_nexus.Pusher):  # type: ignore
         '''
         opts = self.core._initStormOpts(opts)
         user = self.core._userFromOpts(opts)
+        opts = self.core._initStormBudget(opts, user)
 
         self.core._logStormQuery(text, user)
 
@@ -200,6 +201,7 @@ class View(s_nexus.Pusher):  # type: ignore
         opts = self.core._initStormOpts(opts)
 
         user = self.core._userFromOpts(opts)
+        opts = self.core._initStormBudget(opts, user)
 
         MSG_QUEUE_SIZE = 1000
         chan = asyncio.Queue(MSG_QUEUE_SIZE, loop=self.loop)
@@ -237,6 +239,9 @@ class View(s_nexus.Pusher):  # type: ignore
                     else:
                         [snap.on(n, chan.put) for n in show]
 
+                        if opts.get('profile') and 'profile' not in show:
+                            snap.on('profile', chan.put)
+
                     if shownode:
                         async for pode in snap.iterStormPodes(text, opts=opts, user=user):
                             await chan.put(('node', pode))
@@ -312,6 +317,7 @@ class View(s_nexus.Pusher):  # type: ignore
     async def iterStormPodes(self, text, opts=None):
         opts = self.core._initStormOpts(opts)
         user = self.core._userFromOpts(opts)
+        opts = self.core._initStormBudget(opts, user)
         info = {'query': text, 'opts': opts}
         await self.core.boss.promote('storm', user=user, info=info)
 
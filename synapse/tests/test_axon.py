@@ -1,4 +1,5 @@
 import io
+import asyncio
 import hashlib
 import logging
 import unittest.mock as mock
@@ -10,6 +11,8 @@ import synapse.axon as s_axon
 import synapse.common as s_common
 import synapse.telepath as s_telepath
 
+import synapse.lib.hashset as s_hashset
+
 import synapse.tests.utils as s_t_utils
 
 logger = logging.getLogger(__name__)
@@ -321,6 +324,138 @@ class AxonTest(s_t_utils.SynTest):
                 self.gt(len(byts), 1)
                 self.eq(bbuf, b''.join(byts))
 
+    async def test_axon_putmany(self):
+
+        async with self.getTestAxon() as axon:
+
+            bigbuf = b'V' * s_hashset.THREAD_MIN_SIZE
+            bighash = hashlib.sha256(bigbuf).digest()
+
+            files = [abuf, b'', bigbuf, abuf, pbuf]
+            retn = [item async for item in axon.putmany(files)]
+            self.eq(retn, [asdfretn, emptyretn, (len(bigbuf), bighash), asdfretn, pennretn])
+
+            self.eq(b'', b''.join([byts async for byts in axon.get(emptyhash)]))
+            await self.check_blob(axon, bighash)
+            await self.check_blob(axon, pennhash)
+
+            info = await axon.metrics()
+            self.eq(4, info.get('file:count'))
+            self.eq(len(bigbuf) + 17, info.get('size:bytes'))
+
+            self.eq([rgryhash, bbufhash], await axon.wants([asdfhash, rgryhash, pennhash, bbufhash, emptyhash]))
+
+            async with axon.getLocalProxy() as prox:
+                retn = [item async for item in prox.putmany([rbuf, abuf])]
+                self.eq(retn, [rgryretn, asdfretn])
+                self.eq([bbufhash], await prox.wants([bbufhash, rgryhash]))
+
+                # putmany() calls are bounded by their total size
+                with mock.patch('synapse.axon.PUTMANY_MAX_SIZE', len(abuf)):
+                    await self.agenraises(s_exc.BadArg, prox.putmany([abuf, rbuf]))
+                    self.eq([asdfretn], [item async for item in prox.putmany([abuf])])
+
+    async def test_axon_upload_batch(self):
+
+        async with self.getTestAxon() as axon:
+
+            # many small writes are batched before hashing
+            async with await axon.upload(hashnames=s_hashset.hashnames) as fd:
+                hashset = fd.hashset
+                for chunk in s_common.chunks(bbuf, 65536):
+                    await fd.write(chunk)
+                    self.lt(fd.pendsize, s_axon.UPLOAD_BATCH_SIZE)
+
+                self.eq(bbufretn, await fd.save())
+                self.eq(hashset.size, len(bbuf))
+                self.eq(dict(hashset.digests()).get('md5'), hashlib.md5(bbuf).digest())
+                self.ne(hashset, fd.hashset)
+                self.eq(0, fd.pendsize)
+
+            await self.check_blob(axon, bbufhash)
+
+            # the sha256 is computed even if it is not requested
+            async with await axon.upload(hashnames=('md5',)) as fd:
+                await fd.write(abuf)
+                hashset = fd.hashset
+                self.eq(asdfretn, await fd.save())
+                self.eq(dict(hashset.digests()).get('md5'), hashlib.md5(abuf).digest())
+
+            self.true(await axon.has(asdfhash))
+
+    async def test_axon_compress(self):
+
+        with self.getTestDir() as dirn:
+
+            # store some raw blobs prior to enabling compression
+            async with self.getTestAxon(dirn=dirn) as axon:
+                self.none(axon.blobcodec)
+                self.eq(asdfretn, await axon.put(abuf))
+                self.eq(bbufretn, await axon.put(bbuf))
+
+                info = await axon.metrics()
+                self.eq(info.get('size:bytes'), info.get('size:stored'))
+
+            conf = {'axon:compress': 'newp'}
+            async with self.getTestAxon(dirn=dirn, conf=conf) as axon:
+                self.eq('zlib', axon.blobcodec)
+
+            async with self.getTestAxon(dirn=dirn, conf={'axon:compress': 'zlib'}) as axon:
+
+                # mixed stores are readable
+                await self.check_blob(axon, bbufhash)
+                await self.check_blob(axon, asdfhash)
+
+                # new blobs are compressed if it helps
+                self.eq(pennretn, await axon.put(pbuf))
+                vbuf = b'v' * 100000
+                size, vhash = await axon.put(vbuf)
+                self.eq(100000, size)
+                await self.check_blob(axon, vhash)
+                await self.check_blob(axon, pennhash)
+
+                self.none(axon.blobslab.get(pennhash + b'\x00' * 8, db=axon.blobcodecs))
+                self.eq(b'zlib', axon.blobslab.get(vhash + b'\x00' * 8, db=axon.blobcodecs))
+
+                info = await axon.metrics()
+                self.lt(info.get('size:stored'), info.get('size:bytes'))
+
+                with self.raises(s_exc.BadArg):
+                    await axon.recompress(codec='newp')
+
+                stats = await axon.recompress()
+                self.eq('zlib', stats.get('codec'))
+                self.eq(4, stats.get('files'))
+                self.eq(2, stats.get('chunks'))
+                self.lt(stats.get('after'), stats.get('before'))
+
+                after = await axon.metrics()
+                self.eq(after.get('size:bytes'), info.get('size:bytes'))
+                self.eq(after.get('size:stored'), info.get('size:stored') - stats['before'] + stats['after'])
+
+                await self.check_blob(axon, bbufhash)
+                await self.check_blob(axon, vhash)
+
+                # a second run has nothing to do
+                stats = await axon.recompress()
+                self.eq(0, stats.get('chunks'))
+
+                async with axon.getLocalProxy() as prox:
+                    self.none(await prox.recompress(wait=False))
+
+                while axon.recompressing:
+                    await asyncio.sleep(0.01)
+
+            # without a codec, recompress decodes chunks back to raw
+            async with self.getTestAxon(dirn=dirn) as axon:
+                stats = await axon.recompress()
+                self.none(stats.get('codec'))
+                self.eq(3, stats.get('chunks'))
+                await self.check_blob(axon, bbufhash)
+                await self.check_blob(axon, vhash)
+                info = await axon.metrics()
+                self.eq(info.get('size:bytes'), info.get('size:stored'))
+
     async def test_axon_perms(self):
         async with self.getTestAxon() as axon:
             user = await axon.auth.addUser('user')
@@ -336,6 +471,7 @@ class AxonTest(s_t_utils.SynTest):
                 await self.asyncraises(s_exc.AuthDeny, prox.wants((asdfhash,)))
                 await self.asyncraises(s_exc.AuthDeny, prox.put(abuf))
                 await self.asyncraises(s_exc.AuthDeny, prox.puts((abuf,)))
+                await self.agenraises(s_exc.AuthDeny, prox.putmany((abuf,)))
                 await self.asyncraises(s_exc.AuthDeny, prox.upload())
                 await self.asyncraises(s_exc.AuthDeny, prox.metrics())
                 # now add rules and run the test suite
@@ -243,6 +243,20 @@ class CmdCoreTest(s_t_utils.SynTest):
             await cmdr.runCmdLine('storm --spawn inet:ipv4=1.2.3.4')
             outp.expect('#visi.woot')
 
+            # The storm --profile option prints per-operator stats
+            outp = self.getTestOutp()
+            cmdr = await s_cmdr.getItemCmdr(core, outp=outp)
+            await cmdr.runCmdLine('storm --profile inet:ipv4#visi.woot | limit 10')
+            outp.expect('profile: ')
+            outp.expect('took(ms)')
+            outp.expect('LiftFormTag: [Const: inet:ipv4, TagName: [Const: visi.woot]]')
+            outp.expect('CmdOper: [Const: limit, List: [Const: 10]]')
+
+            outp = self.getTestOutp()
+            cmdr = await s_cmdr.getItemCmdr(core, outp=outp)
+            await cmdr.runCmdLine('storm --profile inet:ipv4#visi.woot | graph --refs')
+            outp.expect('graph degree')
+
     async def test_log(self):
 
         def check_locs_cleanup(cobj):
@@ -2416,6 +2416,29 @@ class CortexBasicTest(s_t_utils.SynTest):
                     ndefs.add(node.ndef)
             self.isin(('inet:asn', 1138), ndefs)
 
+            # rule queries run once per node, so their limits apply per node
+            await core.nodes('[ inet:dns:a=(foo.com, 0.0.0.0) inet:dns:a=(foo.com, 0.0.0.1) inet:dns:a=(bar.com, 0.0.0.1) ]')
+
+            q = 'inet:ipv4=0 inet:ipv4=1 | graph --degrees 2 --pivot { <- * | limit 1 }'
+            msgs = await core.stormlist(q, opts={'profile': True})
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.len(4, nodes)
+            self.eq(['inet:ipv4', 'inet:ipv4', 'inet:dns:a', 'inet:dns:a'], [n[0][0] for n in nodes])
+
+            # the profiler records the nodes yielded and time spent for each degree out
+            prof = [m[1] for m in msgs if m[0] == 'profile'][0]
+            self.eq([0, 1], [d['degree'] for d in prof['graph']])
+            self.eq([2, 2], [d['nodes'] for d in prof['graph']])
+
+            msgs = await core.stormlist(q.replace(' | limit 1', ''), opts={'profile': True})
+            self.len(5, [m for m in msgs if m[0] == 'node'])
+            prof = [m[1] for m in msgs if m[0] == 'profile'][0]
+            self.eq([2, 3], [d['nodes'] for d in prof['graph']])
+
+            msgs = await core.stormlist(q)
+            self.len(4, [m for m in msgs if m[0] == 'node'])
+            self.len(0, [m for m in msgs if m[0] == 'profile'])
+
     async def test_storm_two_level_assignment(self):
         async with self.getTestCore() as core:
             q = '$foo=baz $bar=$foo [test:str=$bar]'
@@ -3104,6 +3127,158 @@ class CortexBasicTest(s_t_utils.SynTest):
             counts = nstat.get('formcounts')
             self.eq(counts.get('test:str'), 1)
 
+    async def test_cortex_storm_cursor(self):
+
+        conf = {'storm:cursor:ttl': 1, 'storm:cursor:nodes': 8, 'storm:cursor:spool': 2}
+        async with self.getTestCoreAndProxy(conf=conf) as (core, prox):
+
+            await core.nodes('for $i in $lib.list(1, 2, 3, 4, 5) { [ inet:ipv4=$i ] }')
+
+            info = await prox.addStormCursor('inet:ipv4')
+            iden = info['iden']
+            self.eq(5, info['count'])
+            self.eq('inet:ipv4', info['query'])
+            self.eq(core.auth.rootuser.iden, info['user'])
+
+            # the cursor spools its nodes to disk past the spool size
+            self.true(core.stormcursors.cursors[iden].podes.fallback)
+
+            page = await prox.getStormCursor(iden, size=2)
+            self.eq(0, page['offs'])
+            self.eq(2, page['next'])
+            self.eq(5, page['count'])
+            self.eq([1, 2], [p[0][1] for p in page['nodes']])
+
+            page = await prox.getStormCursor(iden, offs=page['next'], size=2)
+            self.eq(4, page['next'])
+            self.eq([3, 4], [p[0][1] for p in page['nodes']])
+
+            page = await prox.getStormCursor(iden, offs=page['next'], size=2)
+            self.none(page['next'])
+            self.eq([5], [p[0][1] for p in page['nodes']])
+
+            page = await prox.getStormCursor(iden, offs=10)
+            self.none(page['next'])
+            self.eq([], page['nodes'])
+
+            self.eq([iden], [c['iden'] for c in await prox.getStormCursors()])
+
+            # the nodes held by a user's cursors are limited
+            with self.raises(s_exc.StormBudgetExceeded):
+                await prox.addStormCursor('inet:ipv4')
+            self.len(1, core.stormcursors.cursors)
+
+            with self.raises(s_exc.BadSyntax):
+                await prox.addStormCursor('inet:ipv4 |')
+            self.len(1, core.stormcursors.cursors)
+
+            visi = await prox.addUser('visi')
+            await prox.addUserRule(visi['iden'], (True, ('node',)))
+
+            async with core.getLocalProxy(user='visi') as visiprox:
+
+                with self.raises(s_exc.AuthDeny):
+                    await visiprox.getStormCursor(iden)
+
+                with self.raises(s_exc.AuthDeny):
+                    await visiprox.delStormCursor(iden)
+
+                with self.raises(s_exc.AuthDeny):
+                    await visiprox.addStormCursor('inet:ipv4', opts={'user': core.auth.rootuser.iden})
+
+                # the user spool budget limits the nodes held in memory
+                info = await visiprox.addStormCursor('inet:ipv4 +inet:ipv4=0.0.0.1')
+                self.false(core.stormcursors.cursors[info['iden']].podes.fallback)
+                self.eq([info['iden']], [c['iden'] for c in await visiprox.getStormCursors()])
+
+                await prox.setUserStormBudget(visi['iden'], {'spool': 1})
+                info = await visiprox.addStormCursor('inet:ipv4 +inet:ipv4=0.0.0.1')
+                self.true(core.stormcursors.cursors[info['iden']].podes.fallback)
+
+                await visiprox.delStormCursor(info['iden'])
+                self.none(core.stormcursors.cursors.get(info['iden']))
+
+            await prox.delStormCursor(iden)
+            with self.raises(s_exc.NoSuchIden):
+                await prox.getStormCursor(iden)
+
+            # cursors built concurrently by a user share the node limit
+            q = 'inet:ipv4 $lib.time.sleep(0.01)'
+            rets = await asyncio.gather(prox.addStormCursor(q), prox.addStormCursor(q), return_exceptions=True)
+            self.len(1, [r for r in rets if isinstance(r, s_exc.StormBudgetExceeded)])
+            self.len(1, [r for r in rets if isinstance(r, dict)])
+            self.len(1, await prox.getStormCursors())
+            await prox.delStormCursor([r for r in rets if isinstance(r, dict)][0]['iden'])
+
+            # a cursor is not deleted while its query is still running past the ttl
+            info = await prox.addStormCursor('inet:ipv4 $lib.time.sleep(0.3)')
+            self.eq(5, info['count'])
+            page = await prox.getStormCursor(info['iden'])
+            self.len(5, page['nodes'])
+            await prox.delStormCursor(info['iden'])
+
+            # cursors are deleted once they have not been used within their ttl
+            info = await prox.addStormCursor('inet:ipv4')
+            curs = core.stormcursors.cursors[info['iden']]
+            curs.tick -= 2
+
+            with self.raises(s_exc.NoSuchIden):
+                await prox.getStormCursor(info['iden'])
+
+            await asyncio.sleep(1.5)
+            self.none(core.stormcursors.cursors.get(info['iden']))
+            self.true(curs.isfini)
+
+    async def test_cortex_storm_query_cache(self):
+
+        async with self.getTestCore() as core:
+
+            query = core.getStormQuery('inet:fqdn=foo.com')
+            self.true(query is core.getStormQuery('inet:fqdn=foo.com'))
+            self.false(query is core.getStormQuery('inet:fqdn=bar.com'))
+            self.none(core.querycache.get(('param', 'inet:fqdn=$__param0')))
+
+            stat = (await core.stat())['querycache']
+            self.eq(stat['hits'], 1)
+
+        conf = {'storm:query:autoparam': True, 'storm:query:cache:size': 100000}
+        async with self.getTestCore(conf=conf) as core:
+
+            await core.nodes('[ inet:fqdn=foo.com inet:fqdn=bar.com ]')
+
+            nodes = await core.nodes('inet:fqdn=foo.com')
+            self.len(1, nodes)
+            self.eq(nodes[0].ndef, ('inet:fqdn', 'foo.com'))
+
+            hits = core.querycache.stat()['hits']
+
+            nodes = await core.nodes('inet:fqdn=bar.com')
+            self.len(1, nodes)
+            self.eq(nodes[0].ndef, ('inet:fqdn', 'bar.com'))
+
+            self.eq(core.querycache.stat()['hits'], hits + 1)
+            self.nn(core.querycache.get(('param', 'inet:fqdn=$__param0')))
+
+            # each parameterized query is a separate instance
+            self.false(core.getStormQuery('inet:fqdn=baz.com') is core.getStormQuery('inet:fqdn=baz.com'))
+
+            # queries which may not be parameterized are cached by their text
+            text = 'function x() { inet:fqdn=foo.com return() } $x()'
+            self.len(0, await core.nodes(text))
+            self.false(core.querycache.get(('param', 'function x() { inet:fqdn=$__param0 return() } $x()')))
+            self.true(core.getStormQuery(text) is core.getStormQuery(text))
+
+            nodes = await core.nodes('inet:fqdn=foo.com | tee { inet:fqdn=bar.com }')
+            self.sorteq([n.ndef for n in nodes], [('inet:fqdn', 'foo.com'), ('inet:fqdn', 'bar.com')])
+
+            nodes = await core.nodes('inet:fqdn=bar.com | tee { inet:fqdn=foo.com }')
+            self.sorteq([n.ndef for n in nodes], [('inet:fqdn', 'foo.com'), ('inet:fqdn', 'bar.com')])
+
+            for i in range(100):
+                await core.nodes(f'[ test:str="{i}" :hehe=haha ] | limit 1')
+
+            self.le(core.querycache.size, 100000)
+
     async def test_stat_lock(self):
         self.thisHostMust(hasmemlocking=True)
         conf = {'layers:lockmemory': True}
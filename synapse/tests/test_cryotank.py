@@ -1,7 +1,12 @@
+import os
+import asyncio
+
 import synapse.common as s_common
 import synapse.cryotank as s_cryotank
 
 import synapse.lib.const as s_const
+import synapse.lib.lmdbslab as s_lmdbslab
+import synapse.lib.slabseqn as s_slabseqn
 
 import synapse.tests.utils as s_t_utils
 from synapse.tests.utils import alist
@@ -114,3 +119,190 @@ class CryoTest(s_t_utils.SynTest):
                 self.eq(tank.slab.mapsize, s_const.mebibyte * 64)
                 _, conf = await cryo.hive.get(('cryo', 'names', 'conftest'))
                 self.eq(conf, {'map_size': s_const.mebibyte * 64})
+
+    async def test_cryo_query(self):
+
+        items = [{'type': 'dns', 'ipv4': 1, 'info': {'tags': ['foo', 'bar']}},
+                 {'type': 'http', 'ipv4': 2},
+                 {'type': 'dns', 'ipv4': 3, 'info': {'tags': ['baz']}}]
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCryo(dirn) as cryo:
+
+                tank = await cryo.init('nope')
+                await tank.puts(items)
+                await tank.puts(items)
+
+                conf = {'indx:fields': ('type', 'info/tags/0')}
+                tank = await cryo.init('indx', conf=conf)
+
+                _, conf = await cryo.hive.get(('cryo', 'names', 'indx'))
+                self.eq(conf, {'indx:fields': ('type', 'info/tags/0')})
+
+                tick = s_common.now()
+                await tank.puts(items)
+                await tank.puts(items)
+
+                async with cryo.getLocalProxy() as prox:
+
+                    for name in ('nope', 'indx'):
+
+                        rows = await alist(prox.query(name, fields={'type': 'dns'}))
+                        self.eq([0, 2, 3, 5], [r[0] for r in rows])
+
+                        rows = await alist(prox.query(name, fields={'type': 'dns', 'ipv4': 3}))
+                        self.eq(2, rows[0][0])
+                        self.eq('baz', rows[0][1]['info']['tags'][0])
+
+                        rows = await alist(prox.query(name, fields={'info/tags/0': 'foo'}, offs=1, size=1))
+                        self.eq([3], [r[0] for r in rows])
+
+                        self.len(0, await alist(prox.query(name, fields={'info/tags/9': 'foo'})))
+                        self.len(0, await alist(prox.query(name, fields={'type': 'newp'})))
+
+                    self.len(6, await alist(prox.query('indx', tick=tick)))
+                    self.len(0, await alist(prox.query('indx', tick=s_common.now() + 10000)))
+                    self.len(0, await alist(prox.query('indx', tock=tick - 10000)))
+                    self.len(3, await alist(prox.query('indx', tock=s_common.now(), size=3)))
+
+                async with cryo.getLocalProxy(share='cryotank/indx') as lprox:
+                    rows = await alist(lprox.query(fields={'type': 'http'}))
+                    self.eq([1, 4], [r[0] for r in rows])
+
+            # add an index to an existing tank and ensure it is populated
+            async with self.getTestCryo(dirn) as cryo:
+
+                tank = cryo.tanks.get('nope')
+                self.false(tank._isFieldIndexed('type'))
+                await tank.fini()
+
+                conf = {'indx:fields': ('type',)}
+                tank = await s_cryotank.CryoTank.anit(tank.dirn, conf=conf)
+
+                # the ingest time index is populated from the metrics
+                self.len(6, await alist(tank.query(tick=0)))
+
+                for _ in range(100):
+                    if tank._isFieldIndexed('type'):
+                        break
+                    await asyncio.sleep(0.01)
+
+                self.true(tank._isFieldIndexed('type'))
+
+                await tank.puts(items)
+
+                rows = await alist(tank.query(fields={'type': 'http'}))
+                self.eq([1, 4, 7], [r[0] for r in rows])
+
+                await tank.fini()
+
+    async def test_cryo_trim(self):
+
+        items = [{'type': 'dns', 'data': 'x' * 100} for _ in range(10)]
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCryo(dirn) as cryo:
+
+                conf = {'seg:maxsize': 1000, 'trim:maxsize': 4000, 'indx:fields': ('type',)}
+                tank = await cryo.init('size', conf=conf)
+
+                for _ in range(3):
+                    await tank.puts(items)
+
+                info = await tank.info()
+                self.eq(30, info['indx'])
+                self.eq(30, info['stat']['entries'])
+                self.eq([0, 10, 20], [s['offs'] for s in info['segs']])
+
+                # the next puts() rolls over and removes the oldest segment
+                await tank.puts(items)
+
+                info = await tank.info()
+                self.eq(30, info['stat']['entries'])
+                self.eq([10, 20, 30], [s['offs'] for s in info['segs']])
+                self.false(os.path.isdir(os.path.join(tank.dirn, 'segs', f'{0:020d}.lmdb')))
+
+                rows = await alist(tank.slice(0, 100))
+                self.eq(list(range(10, 40)), [r[0] for r in rows])
+                self.len(30, await alist(tank.rows(5, 100)))
+                self.eq(39, tank.last()[0])
+
+                rows = await alist(tank.query(fields={'type': 'dns'}))
+                self.eq(list(range(10, 40)), [r[0] for r in rows])
+                self.len(30, await alist(tank.query(tick=0)))
+
+                # trim by consumer offsets
+                tank = await cryo.init('offs', conf={'seg:maxsize': 1000, 'trim:offsets': True})
+                for _ in range(3):
+                    await tank.puts(items)
+
+                async with cryo.getLocalProxy() as prox:
+
+                    self.eq(0, await prox.trim('offs'))
+
+                    iden = s_common.guid()
+                    self.len(15, await alist(prox.slice('offs', 15, 100, iden=iden)))
+                    self.eq(1, await prox.trim('offs'))
+
+                    # segments still being read are not removed
+                    genr = tank.slice(0, 100)
+                    self.eq(10, (await genr.__anext__())[0])
+
+                    tank.setOffset(iden, 30)
+                    self.eq(0, await tank.trim())
+
+                    await genr.aclose()
+                    self.eq(1, await tank.trim())
+                    self.eq([20], [s['offs'] for s in (await tank.info())['segs']])
+
+                # trim by age
+                tank = await cryo.init('age', conf={'seg:maxsize': 1000, 'trim:maxage': 10000})
+                for _ in range(3):
+                    await tank.puts(items)
+
+                self.eq(0, await tank.trim())
+                tank.segs[0].time -= 20000
+                self.eq(1, await tank.trim())
+
+            async with self.getTestCryo(dirn) as cryo:
+
+                tank = cryo.tanks.get('size')
+                self.eq([10, 20, 30], [s['offs'] for s in (await tank.info())['segs']])
+
+                await tank.puts(items)
+                self.eq(49, tank.last()[0])
+                self.len(30, await alist(tank.slice(0, 100)))
+
+                tank = cryo.tanks.get('age')
+                self.eq(10, (await tank.info())['segs'][0]['offs'])
+
+    async def test_cryo_legacy(self):
+
+        with self.getTestDir() as dirn:
+
+            # a tank which stored items in the main slab
+            path = os.path.join(dirn, 'tank.lmdb')
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+                items = s_slabseqn.SlabSeqn(slab, 'items')
+                metrics = s_slabseqn.SlabSeqn(slab, 'metrics')
+                metrics.add(items.save(cryodata))
+
+            conf = {'seg:maxsize': 10, 'trim:maxsize': 10}
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                info = await tank.info()
+                self.eq([0, 2], [s['offs'] for s in info['segs']])
+                self.eq(2, info['stat']['entries'])
+
+                self.eq(((0, cryodata[0]), (1, cryodata[1])), await alist(tank.slice(0)))
+
+                await tank.puts(cryodata)
+                self.eq([(2, cryodata[0]), (3, cryodata[1])], await alist(tank.slice(0)))
+
+                self.false(tank.slab.dbexists('items'))
+
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+                self.eq(3, tank.last()[0])
+                self.len(2, await alist(tank.slice(0)))
@@ -281,3 +281,62 @@ class CacheTest(s_t_utils.SynTest):
         lru = s_cache.LruDict(0)
         lru['nope'] = 42
         self.none(lru.get('nope', None))
+
+    def test_lib_cache_slru(self):
+
+        cache = s_cache.SlruCache(100, protect=0.5)
+
+        cache.put('foo', 'FOO', 20)
+        cache.put('bar', 'BAR', 20)
+        self.len(2, cache)
+        self.eq(40, cache.size)
+        self.isin('foo', cache)
+
+        # a second hit promotes to the protected segment
+        self.eq('FOO', cache.get('foo'))
+        self.isin('foo', cache.protected)
+        self.eq(20, cache.protsize)
+
+        # a scan of new keys only evicts probationary keys
+        for i in range(10):
+            cache.put(i, i, 20)
+
+        self.eq('FOO', cache.get('foo'))
+        self.notin('bar', cache)
+        self.le(cache.size, 100)
+
+        # peek does not promote
+        self.eq(9, cache.peek(9))
+        self.notin(9, cache.protected)
+        self.none(cache.peek('newp'))
+
+        # protected values beyond the protected size are demoted
+        cache.get(8)
+        cache.get(9)
+        self.eq(40, cache.protsize)
+        self.notin('foo', cache.protected)
+        self.isin('foo', cache.probation)
+
+        # updates adjust the size
+        cache.put(9, 'nine', 30)
+        self.eq(50, cache.protsize)
+        self.eq('nine', cache.get(9))
+
+        self.eq('nine', cache.pop(9))
+        self.none(cache.pop(9))
+        self.eq(20, cache.protsize)
+
+        self.none(cache.get('newp'))
+
+        stat = cache.stat()
+        self.eq(100, stat['maxsize'])
+        self.eq(len(cache), stat['count'])
+        self.eq(cache.size, stat['size'])
+        self.eq(6, stat['hits'])
+        self.eq(2, stat['misses'])
+        self.eq(8, stat['evictions'])
+
+        cache.clear()
+        self.len(0, cache)
+        self.eq(0, cache.size)
+        self.eq(0, cache.protsize)
@@ -618,3 +618,60 @@ class CellTest(s_t_utils.SynTest):
 
                     with self.raises(s_exc.BadArg):
                         await proxy.runBackup(name='foo/bar')
+
+                    info = await proxy.getBackupInfo('foo/bar')
+                    self.eq('full', info['type'])
+                    self.eq(core.iden, info['iden'])
+                    self.eq(await core.getNexsIndx(), info['nexsindx'])
+                    self.gt(info['slabs']['slabs/cell.lmdb']['bytes'], 0)
+
+    async def test_cell_backup_incr(self):
+
+        with self.getTestDir() as dirn:
+
+            backdirn = os.path.join(dirn, 'backups')
+            coredirn = os.path.join(dirn, 'cortex')
+
+            conf = {'backup:dir': backdirn}
+            s_common.yamlsave(conf, coredirn, 'cell.yaml')
+
+            async with self.getTestCore(dirn=coredirn) as core:
+
+                await core.nodes('[ inet:ipv4=1.2.3.4 ]')
+
+                async with core.getLocalProxy() as proxy:
+
+                    with self.raises(s_exc.BadArg):
+                        await proxy.runBackup(name='incr', base='newp')
+
+                    await proxy.runBackup(name='full')
+
+                    await core.nodes('[ inet:ipv4=5.6.7.8 ]')
+                    await proxy.runBackup(name='incr00', base='full')
+
+                    info = await proxy.getBackupInfo('incr00')
+                    self.eq('incr', info['type'])
+                    self.eq('full', info['base'])
+                    self.eq((await proxy.getBackupInfo('full'))['nexsindx'], info['offs'])
+                    self.eq(await core.getNexsIndx(), info['nexsindx'])
+                    self.gt(info['slabs']['nexus.mpk']['bytes'], 0)
+
+                    await core.nodes('[ inet:ipv4=9.9.9.9 ]')
+                    await proxy.runBackup(name='incr01', base='incr00')
+
+                    self.sorteq(('full', 'incr00', 'incr01'), await proxy.getBackups())
+
+                    # a backup with nothing to capture
+                    await proxy.runBackup(name='incr02', base='incr01')
+                    self.eq(0, (await proxy.getBackupInfo('incr02'))['slabs']['nexus.mpk']['bytes'])
+
+            async with self.getTestCore(conf={'nexslog:en': False}) as core:
+                s_common.yamlsave({'iden': core.iden, 'nexsindx': 0}, backdirn, 'other', 'backup.yaml')
+                core.backdirn = backdirn
+                with self.raises(s_exc.BadConfValu):
+                    await core.runBackup(name='newp', base='other')
+
+            async with self.getTestCore() as core:
+                core.backdirn = backdirn
+                with self.raises(s_exc.BadArg):
+                    await core.runBackup(name='newp', base='full')
@@ -1079,6 +1079,59 @@ class GrammarTest(s_t_utils.SynTest):
             tree = parser.query()
             self.eq(str(tree), _ParseResults[i])
 
+    def test_parser_params(self):
+
+        text = 'inet:fqdn=foo.com [ :issuer="visi" +#bar ] | limit 10'
+        params = s_parser.getQueryParams(text)
+        self.eq([p[2] for p in params], ['foo.com', 'visi'])
+
+        ptxt = s_parser.getParamText(text, params)
+        self.eq(ptxt, 'inet:fqdn=$__param0 [ :issuer=$__param1 +#bar ] | limit 10')
+        self.eq(text, s_parser.getParamText(text, params, literals={0, 1}))
+
+        pque = s_parser.parseParamQuery(text, params)
+        self.nn(pque)
+
+        self.eq(str(pque.fill(text, params)), str(s_parser.parseQuery(text)))
+
+        newt = 'inet:fqdn=vertex.link [ :issuer="hehe haha" +#bar ] | limit 10'
+        newp = s_parser.getQueryParams(newt)
+        self.eq(ptxt, s_parser.getParamText(newt, newp))
+
+        query = pque.fill(newt, newp)
+        self.eq(query.text, newt)
+        self.eq(str(query), str(s_parser.parseQuery(newt)))
+
+        # the template is not modified by fill()
+        self.eq(str(pque.fill(text, params)), str(s_parser.parseQuery(text)))
+
+        # values in command argument subqueries must stay literal
+        text = 'inet:fqdn=foo.com | tee { inet:fqdn=bar.com }'
+        params = s_parser.getQueryParams(text)
+        pque = s_parser.parseParamQuery(text, params)
+        self.nn(pque)
+        self.eq(pque.literals, {1: 'bar.com'})
+
+        newt = 'inet:fqdn=baz.com | tee { inet:fqdn=bar.com }'
+        self.eq(str(pque.fill(newt, s_parser.getQueryParams(newt))), str(s_parser.parseQuery(newt)))
+
+        newt = 'inet:fqdn=baz.com | tee { inet:fqdn=newp.com }'
+        self.none(pque.fill(newt, s_parser.getQueryParams(newt)))
+
+        # comments are skipped
+        self.eq([], s_parser.getQueryParams('// inet:fqdn=foo.com\ninet:fqdn'))
+
+        # queries without any replaceable values
+        self.none(s_parser.parseParamQuery('inet:fqdn', []))
+        self.eq([], s_parser.getQueryParams('inet:fqdn=$__param0'))
+
+        text = 'function x() { inet:fqdn=foo.com return(10) } $x()'
+        self.none(s_parser.parseParamQuery(text, s_parser.getQueryParams(text)))
+
+        # invalid syntax is the caller's problem
+        with self.raises(s_exc.BadSyntax):
+            s_parser.parseParamQuery('inet:fqdn=foo.com |', s_parser.getQueryParams('inet:fqdn=foo.com |'))
+
     def test_cmdrargs(self):
         q = '''add {inet:fqdn | graph 2 --filter { -#nope } } inet:f-M +1 { [ graph:node='*' :type=m1]}'''
         correct = (
@@ -47,3 +47,25 @@ class HashsetTest(s_t_utils.SynTest):
         hset = s_hashset.HashSet()
         hset.eatfd(fd)
         self.hashset_assertions(hset)
+
+    async def test_lib_hashset_aupdate(self):
+
+        byts = b'V' * (s_hashset.THREAD_MIN_SIZE + 10)
+
+        hset = s_hashset.HashSet()
+        hset.update(byts)
+        hset.update(asdf)
+
+        aset = s_hashset.HashSet()
+        await aset.aupdate(byts)
+        await aset.aupdate(asdf)
+
+        self.eq(hset.size, aset.size)
+        self.eq(hset.digests(), aset.digests())
+        self.eq(hset.guid(), aset.guid())
+
+    def test_lib_hashset_names(self):
+        hset = s_hashset.HashSet(names=('sha256',))
+        hset.update(asdf)
+        self.eq(('sha256',), tuple(dict(hset.digests()).keys()))
+        self.eq(hset.size, 8)
@@ -1,4 +1,5 @@
 import json
+import asyncio
 
 import aiohttp
 import aiohttp.client_exceptions as a_exc
@@ -6,6 +7,7 @@ import aiohttp.client_exceptions as a_exc
 import synapse.cortex as s_cortex
 
 import synapse.lib.httpapi as s_httpapi
+import synapse.lib.msgpack as s_msgpack
 
 import synapse.tests.utils as s_tests
 
@@ -832,6 +834,128 @@ class HttpApiTest(s_tests.SynTest):
                         self.eq(data.get('status'), 'err')
                         self.eq(data.get('code'), 'NotAuthenticated')
 
+    async def test_http_storm_stream(self):
+
+        async with self.getTestCore() as core:
+
+            visi = await core.auth.addUser('visi')
+            await visi.setAdmin(True)
+            await visi.setPasswd('secret')
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 ]')
+
+            host, port = await core.addHttpsPort(0, host='127.0.0.1')
+
+            async with self.getHttpSess(auth=('visi', 'secret'), port=port) as sess:
+
+                body = {'query': 'inet:ipv4'}
+                headers = {'Accept': 'application/msgpack'}
+
+                async with sess.get(f'https://localhost:{port}/api/v1/storm/nodes', json=body, headers=headers) as resp:
+                    self.eq('application/msgpack', resp.headers.get('Content-Type'))
+                    unpk = s_msgpack.Unpk()
+                    podes = [item for size, item in unpk.feed(await resp.read())]
+
+                self.eq([0x01020304, 0x05060708], [p[0][1] for p in podes])
+
+                headers = {'Accept': 'application/x-ndjson, application/json;q=0.9'}
+                async with sess.get(f'https://localhost:{port}/api/v1/storm/nodes', json=body, headers=headers) as resp:
+                    self.eq('application/x-ndjson', resp.headers.get('Content-Type'))
+                    lines = (await resp.read()).decode().splitlines()
+
+                self.eq([0x01020304, 0x05060708], [json.loads(line)[0][1] for line in lines])
+
+                headers = {'Accept': 'application/msgpack'}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body, headers=headers) as resp:
+                    unpk = s_msgpack.Unpk()
+                    mesgs = [item for size, item in unpk.feed(await resp.read())]
+
+                self.eq(('init', 'node', 'node', 'fini'), [m[0] for m in mesgs])
+
+                headers = {'Accept': 'application/x-ndjson'}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body, headers=headers) as resp:
+                    mesgs = [json.loads(line) for line in (await resp.read()).decode().splitlines()]
+
+                self.eq(['init', 'node', 'node', 'fini'], [m[0] for m in mesgs])
+
+                # buffered items are flushed while the query is blocked
+                await core.nodes('[ inet:ipv4=9.9.9.9 ]')
+                body = {'query': 'inet:ipv4 if ($node.repr() = "9.9.9.9") { $lib.time.sleep(2) }'}
+                url = f'https://localhost:{port}/api/v1/storm/nodes'
+                resp = await asyncio.wait_for(sess.get(url, json=body, headers=headers), timeout=1)
+                lines = [await asyncio.wait_for(resp.content.readline(), timeout=1) for _ in range(2)]
+                self.eq([0x01020304, 0x05060708], [json.loads(line)[0][1] for line in lines])
+                lines = (await resp.read()).decode().splitlines()
+                resp.release()
+
+                self.eq([0x09090909], [json.loads(line)[0][1] for line in lines])
+
+    async def test_http_storm_cursor(self):
+
+        async with self.getTestCore() as core:
+
+            visi = await core.auth.addUser('visi')
+            await visi.setPasswd('secret')
+            await visi.addRule((True, ('node',)))
+
+            await core.nodes('for $i in $lib.list(1, 2, 3, 4, 5) { [ inet:ipv4=$i ] }')
+
+            host, port = await core.addHttpsPort(0, host='127.0.0.1')
+            url = f'https://localhost:{port}/api/v1/storm/cursor'
+
+            async with self.getHttpSess(auth=('visi', 'secret'), port=port) as sess:
+
+                async with sess.post(url, json={'query': 'inet:ipv4', 'size': 2}) as resp:
+                    retn = await resp.json()
+                    self.eq('ok', retn.get('status'))
+
+                page = retn['result']
+                iden = page['iden']
+                self.eq(5, page['count'])
+                self.eq(0, page['offs'])
+                self.eq(2, page['next'])
+                self.eq([1, 2], [p[0][1] for p in page['nodes']])
+
+                async with sess.get(url, json={'iden': iden, 'offs': 2, 'size': 10}) as resp:
+                    retn = await resp.json()
+                    self.eq('ok', retn.get('status'))
+
+                page = retn['result']
+                self.none(page['next'])
+                self.eq([3, 4, 5], [p[0][1] for p in page['nodes']])
+
+                async with sess.post(url, json={'query': 'inet:ipv4 $lib.newp()'}) as resp:
+                    retn = await resp.json()
+                    self.eq('NoSuchName', retn.get('code'))
+
+                async with sess.post(url, json={'query': 'inet:ipv4', 'opts': {'user': core.auth.rootuser.iden}}) as resp:
+                    retn = await resp.json()
+                    self.eq('AuthDeny', retn.get('code'))
+
+                async with sess.post(url, json={'size': 10}) as resp:
+                    retn = await resp.json()
+                    self.eq('BadArg', retn.get('code'))
+
+                async with sess.post(url, json={'iden': iden, 'size': 'newp'}) as resp:
+                    retn = await resp.json()
+                    self.eq('BadArg', retn.get('code'))
+
+                async with sess.delete(url, json={}) as resp:
+                    retn = await resp.json()
+                    self.eq('BadArg', retn.get('code'))
+
+                async with sess.delete(url, json={'iden': iden}) as resp:
+                    retn = await resp.json()
+                    self.eq('ok', retn.get('status'))
+
+                async with sess.get(url, json={'iden': iden}) as resp:
+                    retn = await resp.json()
+                    self.eq('NoSuchIden', retn.get('code'))
+
+                async with sess.delete(url, json={'iden': iden}) as resp:
+                    retn = await resp.json()
+                    self.eq('NoSuchIden', retn.get('code'))
+
     async def test_healthcheck(self):
         async with self.getTestCore() as core:
             # Run http instead of https for this test
@@ -2,6 +2,7 @@ import os
 import math
 import asyncio
 import contextlib
+import unittest.mock as mock
 
 import synapse.exc as s_exc
 import synapse.common as s_common
@@ -10,6 +11,7 @@ import synapse.telepath as s_telepath
 import synapse.lib.time as s_time
 import synapse.lib.layer as s_layer
 import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdbslab as s_lmdbslab
 
 import synapse.tools.backup as s_tools_backup
 
@@ -925,6 +927,405 @@ class LayerTest(s_t_utils.SynTest):
             nodes = await core.nodes('.created')
             self.len(0, nodes)
 
+    async def test_layer_readthreads(self):
+
+        async with self.getTestCore(conf={'layers:readthreads': True}) as core:
+
+            layr = core.getLayer()
+            self.true(layr.readthreads)
+            self.true(layr.layrinfo.get('readthreads'))
+
+            await core.addTagProp('score', ('int', {}), {})
+
+            q = '[ inet:ipv4=$ipv4 :asn=$asn +#foo.bar=2020 ]'
+            for i in range(100):
+                await core.nodes(q, opts={'vars': {'ipv4': i, 'asn': i % 10}})
+            await core.nodes('[ inet:fqdn=vertex.link inet:fqdn=woot.com +#foo:score=10 ]')
+            await core.nodes('[ test:str=vertex test:str=woot ]')
+
+            # lifts do not require the edits to be committed
+            self.true(layr.layrslab.dirty)
+            self.len(100, await core.nodes('inet:ipv4'))
+
+            self.len(1, await core.nodes('inet:ipv4=10'))
+            self.len(10, await core.nodes('inet:ipv4:asn=3'))
+            self.len(11, await core.nodes('inet:ipv4*range=(10, 20)'))
+            self.len(100, await core.nodes('inet:ipv4#foo.bar'))
+            self.len(100, await core.nodes('inet:ipv4#foo.bar@=2020'))
+            self.len(1, await core.nodes('test:str^=vert'))
+            self.len(2, await core.nodes('inet:fqdn#foo:score=10'))
+            self.len(2, await core.nodes('#foo:score'))
+
+            # lift concurrently with edits
+            async def addnodes():
+                for i in range(100):
+                    await core.nodes('[ inet:ipv4=$ipv4 :asn=3 ]', opts={'vars': {'ipv4': i + 1000}})
+
+            task = core.schedCoro(addnodes())
+
+            count = 0
+            async for node in core.eval('inet:ipv4:asn=3'):
+                count += 1
+                await asyncio.sleep(0)
+
+            await task
+            self.ge(count, 10)
+            self.len(110, await core.nodes('inet:ipv4:asn=3'))
+
+        async with self.getTestCore() as core:
+            self.false(core.getLayer().readthreads)
+
+    async def test_layer_sodecache(self):
+
+        async with self.getTestCore(conf={'layers:cache:size': 100000}) as core:
+
+            layr = core.getLayer()
+            self.true(layr.sodecache is core.sodecache)
+
+            ldef = await core.addLayer()
+            self.true(core.getLayer(ldef.get('iden')).sodecache is core.sodecache)
+
+            await core.nodes('[ test:str=foo test:str=bar test:str=baz ]')
+            await layr.layrslab.sync()
+
+            core.sodecache.clear()
+
+            # full lifts do not fill the cache
+            self.len(3, await core.nodes('test:str'))
+            self.len(0, core.sodecache)
+
+            self.len(1, await core.nodes('test:str=foo'))
+            self.len(1, core.sodecache)
+
+            self.len(1, await core.nodes('test:str=foo'))
+
+            stat = (await core.stat())['sodecache']
+            self.eq(100000, stat['maxsize'])
+            self.eq(1, stat['count'])
+            self.ge(stat['hits'], 1)
+            self.ge(stat['misses'], 4)
+
+            # the cache is bounded by size
+            await core.nodes('for $x in $ints { [ test:int=$x ] }', opts={'vars': {'ints': list(range(2000))}})
+            await layr.layrslab.sync()
+            self.le(core.sodecache.size, 100000)
+            self.gt(core.sodecache.stat()['evictions'], 0)
+
+            # truncating a layer orphans its cached storage nodes
+            cachekey = layr.sodecachekey
+            await layr.truncate()
+            self.ne(cachekey, layr.sodecachekey)
+            self.len(0, await core.nodes('test:str=foo'))
+
+    async def test_layer_lockdbs(self):
+
+        self.thisHostMust(hasmemlocking=True)
+
+        async with self.getTestCore() as core:
+
+            ldef = await core.addLayer(ldef={'lockdbs': ['byprop', 'bytag'], 'lockbranches': ['bybuidv4'],
+                                             'lockbudget': 100000})
+            layr = core.getLayer(ldef.get('iden'))
+
+            self.eq(['byprop', 'bytag'], layr.layrslab.lockdbs)
+            self.eq(['bybuidv4'], layr.layrslab.lockbranches)
+            self.eq(100000, layr.layrslab.lockbudget)
+            self.true(layr.layrslab.lockmemory)
+
+            await asyncio.wait_for(layr.waitForHot(), timeout=8)
+
+            resi = await layr.getMemResidency()
+            self.gt(resi['bytes'], 0)
+            self.isin('resident', resi)
+
+            # the branch pages of the lockbranches dbs are found and reported once they have data
+            vdef = await core.addView({'layers': (layr.iden,)})
+            nodes = await core.nodes('for $x in $ints { [ test:int=$x ] }',
+                                     opts={'view': vdef.get('iden'), 'vars': {'ints': list(range(1000))}})
+            self.len(1000, nodes)
+            await layr.layrslab.sync()
+
+            layr.layrslab.lockdoneevent.clear()
+            layr.layrslab.resizeevent.set()
+            await asyncio.wait_for(layr.waitForHot(), timeout=8)
+
+            self.isin('bybuidv4', layr.layrslab.dbpages)
+
+            resi = await layr.getMemResidency()
+            self.gt(resi['dbs']['bybuidv4']['bytes'], 0)
+            self.gt(resi['dbs']['bybuidv4']['resident'], 0)
+
+            await self.asyncraises(s_exc.SchemaViolation, core.addLayer(ldef={'lockbudget': -1}))
+
+    async def test_layer_compact(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+
+                for i in range(2000):
+                    await core.nodes('[ test:str=$valu :tick=2020 +#foo.bar ]', opts={'vars': {'valu': f'v{i}'}})
+
+                await core.nodes('test:str^=v1 | delnode')
+                await core.nodes('[ test:str=keep ] $node.data.set(foo, bar)')
+
+                added = []
+                states = []
+                done = asyncio.Event()
+
+                async def addnodes():
+                    while not done.is_set():
+                        valu = f'during{len(added)}'
+                        await core.nodes('[ test:str=$valu +#baz ]', opts={'vars': {'valu': valu}})
+                        added.append(valu)
+                        states.extend([t.info.get('state') for t in core.boss.ps() if t.name == 'layer:compact'])
+                        await asyncio.sleep(0.01)
+
+                task = core.schedCoro(addnodes())
+
+                stats = await core.compactLayer(layr.iden)
+                done.set()
+                await task
+
+                self.lt(stats['after'], stats['before'])
+                self.isin('copy', states)
+                self.none(layr.compacting)
+
+                self.false(os.path.isdir(s_common.genpath(layr.dirn, 'compact')))
+
+                self.len(0, await core.nodes('test:str^=v1'))
+                self.len(889, await core.nodes('test:str^=v'))
+                self.len(889, await core.nodes('#foo.bar'))
+                self.len(len(added), await core.nodes('#baz'))
+                nodes = await core.nodes('test:str=keep')
+                self.eq('bar', await nodes[0].getData('foo'))
+
+                self.eq(890 + len(added), (await layr.getFormCounts())['test:str'])
+
+                await core.nodes('[ test:str=after :tick=2021 ]')
+                self.len(1, await core.nodes('test:str:tick=2021'))
+
+                await self.asyncraises(s_exc.NoSuchLayer, core.compactLayer('newp'))
+
+                ldef = await core.addLayer(ldef={'logedits': False})
+                await self.asyncraises(s_exc.BadConfValu, core.compactLayer(ldef.get('iden')))
+
+                # scans in progress are moved to the compacted slabs
+                await layr.layrslab.sync()
+                count = len(await alist(layr.layrslab.aScanByFull(db=layr.bybuidv4)))
+                self.gt(count, 1)
+
+                oldslab = layr.layrslab
+                scan = layr.layrslab.scanByFull(db=layr.bybuidv4)
+                ascan = layr.layrslab.aScanByFull(db=layr.bybuidv4)
+                rows = [next(scan)]
+                arows = [await ascan.__anext__()]
+
+                bumps = []
+                async def bump():
+                    bumps.append(True)
+
+                with mock.patch.object(core.spawnpool, 'bump', bump):
+                    async with core.getLocalProxy() as proxy:
+                        stats = await proxy.compactLayer(layr.iden)
+                        self.isin('after', stats)
+
+                self.len(1, bumps)
+                self.true(oldslab.isfini)
+                self.len(0, oldslab.threadscans)
+
+                rows.extend(scan)
+                arows.extend(await alist(ascan))
+                self.len(count, rows)
+                self.eq(rows, arows)
+
+                # catch up is bounded by the node edits remaining rather than the log entries
+                offs = layr.nodeeditlog.index()
+                await core.nodes('[ test:str=lag0 test:str=lag1 ]')
+                comp = {'offs': offs}
+                self.eq(4, layr._getCompactLag(comp))
+
+                with mock.patch('synapse.lib.layer.COMPACT_SWAP_LAG', 1):
+                    self.eq(2, layr._getCompactLag(comp))
+
+                path = s_common.genpath(layr.dirn, 'layer_v2.lmdb')
+
+            # an interrupted swap is recovered from the previous slab
+            compdirn = s_common.gendir(path, '..', 'compact')
+            os.rename(path, s_common.genpath(compdirn, 'layer_v2.lmdb.old'))
+
+            async with self.getTestCore(dirn=dirn) as core:
+                self.false(os.path.isdir(compdirn))
+                self.len(889, await core.nodes('test:str^=v'))
+                self.len(1, await core.nodes('test:str=after'))
+
+    async def test_layer_columns(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.none(layr.bycolumn)
+
+                await core.nodes('[ inet:ipv4=1.2.3.4 :asn=10 :loc=us .seen=(2020, 2021) ]')
+                await core.nodes('[ inet:ipv4=5.6.7.8 :asn=20 ]')
+
+                await layr.layrinfo.set('columns', True)
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.nn(layr.bycolumn)
+                self.true(layr.meta.get('columns'))
+
+                # the columns were built from the existing storage nodes
+                rows = await alist(layr.iterPropRows('inet:ipv4', 'asn'))
+                self.sorteq([(s_common.buid(('inet:ipv4', 0x01020304)), 10),
+                             (s_common.buid(('inet:ipv4', 0x05060708)), 20)], rows)
+
+                await core.nodes('[ inet:ipv4=9.9.9.9 :asn=30 .seen=2019 ]')
+                await core.nodes('inet:ipv4=5.6.7.8 [ -:asn ]')
+                await core.nodes('[ test:guid=* :tick=2020 ]')
+
+                self.true(layr._hasColumn(layr.getPropAbrv('inet:ipv4', 'asn')))
+                self.true(layr._hasColumn(layr.getPropAbrv(None, '.seen')))
+                self.false(layr._hasColumn(layr.getPropAbrv('inet:ipv4', 'loc')))
+
+                vals = await alist(layr.iterPropValues('inet:ipv4', 'asn'))
+                self.sorteq([10, 30], vals)
+
+                vals = await alist(layr.iterPropValues('inet:ipv4', None))
+                self.sorteq([0x01020304, 0x05060708, 0x09090909], vals)
+
+                tick = s_time.parse('2020')
+                self.eq([tick], await alist(layr.iterPropValues('test:guid', 'tick')))
+                self.len(1, await alist(layr.iterPropValues('test:guid', None)))
+
+                vals = await alist(layr.iterPropValues(None, '.seen'))
+                self.sorteq([(s_time.parse('2019'), s_time.parse('2019') + 1),
+                             (s_time.parse('2020'), s_time.parse('2021'))], vals)
+
+                # values which are not stored in columns are read from the storage nodes
+                self.eq(['us'], await alist(layr.iterPropValues('inet:ipv4', 'loc')))
+
+                q = """
+                $tally = $lib.stats.tally()
+                for $asn in $lib.layer.get().getPropValues(inet:ipv4:asn) { $tally.inc($asn) }
+                for ($asn, $count) in $tally { $lib.print('{a}={c}', a=$asn, c=$count) }
+                """
+                msgs = await core.stormlist(q)
+                self.stormIsInPrint('10=1', msgs)
+                self.stormIsInPrint('30=1', msgs)
+
+                await core.nodes('inet:ipv4=9.9.9.9 | delnode')
+                self.eq([10], await alist(layr.iterPropValues('inet:ipv4', 'asn')))
+
+                with self.raises(s_exc.NoSuchProp) as cm:
+                    await core.nodes('for $v in $lib.layer.get().getPropValues(newp:newp) {}')
+                self.eq('No property named newp:newp', cm.exception.get('mesg'))
+                self.eq('newp:newp', cm.exception.get('name'))
+
+                await layr.layrinfo.set('columns', False)
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.none(layr.bycolumn)
+                self.false(layr.meta.get('columns'))
+                self.false(layr.layrslab.dbexists('bycolumn'))
+                self.eq([10], await alist(layr.iterPropValues('inet:ipv4', 'asn')))
+
+            async with self.getTestCore(conf={'layers:columns': True}) as core:
+                self.true(core.getLayer().columns)
+
+    async def test_layer_v4(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                await core.addTagProp('score', ('int', {}), {})
+
+                layr = core.getLayer()
+                self.eq(layr.layrvers, 4)
+
+                nodes = await core.nodes('[ inet:ipv4=1.2.3.4 :asn=10 +#foo.bar:score=10 ]')
+                buid = nodes[0].buid
+
+                await layr._saveDirtySodes()
+
+                byts = layr.layrslab.get(buid, db=layr.bybuidv4)
+                sode = layr._decSode(byts)
+
+                # props, tags, and tagprops are only decoded when they are accessed
+                self.eq('inet:ipv4', sode.get('form'))
+                self.eq((0x01020304, s_layer.STOR_TYPE_U32), sode.get('valu'))
+                self.sorteq(('props', 'tags', 'tagprops'), sode.lazy.keys())
+
+                self.eq((10, s_layer.STOR_TYPE_I64), sode['props'].get('asn'))
+                self.notin('props', sode.lazy)
+                self.isin('tags', sode)
+                self.eq(sode.get('tags').get('foo.bar'), (None, None))
+
+                # unchanged fields are saved without being encoded again
+                self.eq(byts, layr._encSode(sode))
+
+                self.eq(sode, layr._getStorNode(buid).copy())
+                self.eq(((10, s_layer.STOR_TYPE_I64)), sode.copy()['tagprops'].get(('foo.bar', 'score')))
+
+                sode = layr._decSode(byts)
+                sode['props'] = {}
+                self.eq(None, s_msgpack.un(layr._encSode(sode))[2])
+
+                empty = layr._getStorNode(s_common.buid())
+                self.eq({}, empty['props'])
+                self.eq({'props': {}}, empty)
+
+                # rewind the layer to v3 storage nodes to exercise the migration
+                v3db = layr.layrslab.initdb('bybuidv3')
+                rows = [(lkey, s_msgpack.en(layr._decSode(lval).copy()))
+                        for lkey, lval in layr.layrslab.scanByFull(db=layr.bybuidv4)]
+
+                layr.layrslab.putmulti(rows, db=v3db)
+                layr.layrslab.dropdb('bybuidv4')
+                layr.meta.set('version', 3)
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr = core.getLayer()
+                self.eq(layr.layrvers, 4)
+                self.false(layr.layrslab.dbexists('bybuidv3'))
+
+                nodes = await core.nodes('inet:ipv4=1.2.3.4')
+                self.len(1, nodes)
+                self.eq(10, nodes[0].get('asn'))
+                self.eq(10, nodes[0].getTagProp('foo.bar', 'score'))
+                self.len(1, await core.nodes('#foo.bar:score=10'))
+
+    async def test_layer_syncthread(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn, conf={'layers:syncthread': True}) as core:
+
+                layr = core.getLayer()
+                self.true(layr.syncthread)
+                self.true(layr.layrslab.syncthread)
+                self.true(layr.dataslab.syncthread)
+
+                await core.nodes('[ inet:ipv4=1.2.3.4 ]')
+                await layr.layrslab.sync()
+                await layr.layrslab.flushfut
+
+                stats = [s for s in await s_lmdbslab.Slab.getSlabStats() if s['path'] == layr.layrslab.path][0]
+                self.ge(stats['flushhist']['count'], 1)
+
+            async with self.getTestCore(dirn=dirn) as core:
+                self.len(1, await core.nodes('inet:ipv4=1.2.3.4'))
+
     async def test_layer_flat_edits(self):
         nodeedits = (
             (b'asdf', 'test:junk', (
@@ -989,4 +1390,4 @@ class LayerTest(s_t_utils.SynTest):
             self.true(nodes[0].getTagProp('foo.bar', 'confidence'), 22)
 
             for layr in core.layers.values():
-                self.eq(layr.layrvers, 3)
+                self.eq(layr.layrvers, 4)
@@ -1,6 +1,8 @@
 import os
+import time
 import asyncio
 import pathlib
+import threading
 import multiprocessing
 import synapse.exc as s_exc
 import synapse.common as s_common
@@ -87,6 +89,153 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 self.eq(testlist, (b'hehe', b'hoho'))
                 self.eq(dupslist, (b'hehe', b'hoho'))
 
+    def test_lmdbslab_readlock(self):
+
+        lock = s_lmdbslab.ReadLock()
+
+        held = threading.Event()
+        release = threading.Event()
+        events = []
+
+        def read():
+            with lock.reader():
+                held.set()
+                release.wait()
+                # a reader may re-enter the lock while a writer is waiting
+                with lock.reader():
+                    events.append('reread')
+
+        def write():
+            with lock.exclusive():
+                events.append('write')
+                # the reentrant use of the lock by the writer does not wait
+                with lock.exclusive():
+                    pass
+                with lock.reader():
+                    pass
+
+        def read2():
+            with lock.reader():
+                events.append('read2')
+
+        thr1 = threading.Thread(target=read)
+        thr1.start()
+        self.true(held.wait(timeout=5))
+
+        thr2 = threading.Thread(target=write)
+        thr2.start()
+        while lock.writer is None:
+            time.sleep(0.01)
+
+        # new readers wait for the waiting writer
+        thr3 = threading.Thread(target=read2)
+        thr3.start()
+        time.sleep(0.1)
+        self.eq([], events)
+
+        release.set()
+        [t.join(timeout=5) for t in (thr1, thr2, thr3)]
+
+        self.eq(['reread', 'write', 'read2'], events)
+        self.eq(0, lock.readers)
+        self.none(lock.writer)
+
+    async def test_lmdbslab_getmulti(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                testdb = slab.initdb('test')
+
+                slab.put(b'hehe', b'haha', db=testdb)
+                slab.put(b'hoho', b'lolz', db=testdb)
+
+                retn = slab.getmulti([b'hoho', b'newp', b'hehe', b'hoho'], db=testdb)
+                self.eq(retn, ((b'hehe', b'haha'), (b'hoho', b'lolz'), (b'newp', None)))
+                self.eq((), slab.getmulti((), db=testdb))
+
+            async with await s_lmdbslab.Slab.anit(path, readonly=True) as slab:
+                testdb = slab.initdb('test')
+                self.eq(((b'hehe', b'haha'),), slab.getmulti([b'hehe'], db=testdb))
+
+    async def test_lmdbslab_ascan(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+            async with await s_lmdbslab.Slab.anit(path, map_size=100000, growsize=100000) as slab:
+
+                testdb = slab.initdb('test')
+                dupsdb = slab.initdb('dups', dupsort=True)
+
+                rows = [(b'\x00' + i.to_bytes(2, 'big'), b'v' * 100) for i in range(200)]
+                rows.extend([(b'\x01' + i.to_bytes(2, 'big'), b'v') for i in range(200)])
+                slab.putmulti(rows, db=testdb)
+
+                dups = [(b'\x00', i.to_bytes(2, 'big')) for i in range(200)]
+                dups.extend([(b'\x01', i.to_bytes(2, 'big')) for i in range(10)])
+                slab.putmulti(dups, dupdata=True, db=dupsdb)
+
+                # the rows are not committed yet and must still be visible
+                self.true(slab.dirty)
+
+                with patch('synapse.lib.lmdbslab.READ_BATCH_SIZE', 7):
+
+                    self.eq(rows, await alist(slab.aScanByFull(db=testdb)))
+                    self.eq(rows[:200], await alist(slab.aScanByPref(b'\x00', db=testdb)))
+                    self.eq(rows[10:21], await alist(slab.aScanByRange(rows[10][0], rows[20][0], db=testdb)))
+                    self.eq(rows[390:], await alist(slab.aScanByRange(rows[390][0], db=testdb)))
+                    self.eq([], await alist(slab.aScanByPref(b'\x02', db=testdb)))
+
+                    self.eq(dups, await alist(slab.aScanByFull(db=dupsdb)))
+                    self.eq(dups[:200], await alist(slab.aScanByDups(b'\x00', db=dupsdb)))
+                    self.eq(dups[200:], await alist(slab.aScanByPref(b'\x01', db=dupsdb)))
+                    self.eq([], await alist(slab.aScanByDups(b'\x02', db=dupsdb)))
+
+                    # pending writes are read from the write transaction rather than committed
+                    self.true(slab.dirty)
+
+                    await slab.sync()
+                    self.false(slab.dirty)
+
+                    self.eq(rows, await alist(slab.aScanByFull(db=testdb)))
+                    self.eq(dups[:200], await alist(slab.aScanByDups(b'\x00', db=dupsdb)))
+
+                    # deletes and writes between batches are picked up by the next batch
+                    items = []
+                    async for item in slab.aScanByDups(b'\x00', db=dupsdb):
+                        items.append(item)
+                        if len(items) == 7:
+                            slab.delete(b'\x00', (7).to_bytes(2, 'big'), db=dupsdb)
+                            slab.put(b'\x00', (300).to_bytes(2, 'big'), dupdata=True, db=dupsdb)
+                            await slab.sync()
+
+                    self.len(200, items)
+                    self.notin((b'\x00', (7).to_bytes(2, 'big')), items)
+                    self.eq((b'\x00', (300).to_bytes(2, 'big')), items[-1])
+
+                    # grow the map in the middle of a scan
+                    mapsize = slab.mapsize
+                    items = []
+                    async for item in slab.aScanByPref(b'\x00', db=testdb):
+                        items.append(item)
+                        if len(items) == 7:
+                            slab.putmulti([(b'\x02' + i.to_bytes(2, 'big'), b'v' * 1000) for i in range(200)],
+                                          db=testdb)
+
+                    self.gt(slab.mapsize, mapsize)
+                    self.eq(rows[:200], items)
+
+                with patch('synapse.lib.lmdbslab.READ_BATCH_SIZE', 1):
+                    genr = slab.aScanByFull(db=testdb)
+                    await genr.__anext__()
+
+            with self.raises(s_exc.IsFini):
+                async for item in genr:
+                    pass
+
     async def test_lmdbslab_base(self):
 
         with self.getTestDir() as dirn:
@@ -316,6 +465,17 @@ class LmdbSlabTest(s_t_utils.SynTest):
                     self.nn(retn)
                     self.len(1, retn)
 
+            # by default the number of writes does not force a commit
+            path = os.path.join(dirn, 'test2.lmdb')
+            with patch('synapse.lib.lmdbslab.Slab.COMMIT_PERIOD', 10):
+                async with await s_lmdbslab.Slab.anit(path, map_size=s_const.mebibyte) as slab:
+                    foo = slab.initdb('foo')
+                    for i in range(10001):
+                        slab.put(i.to_bytes(4, 'big'), b'', db=foo)
+
+                    self.eq(10001, len(slab.xactops))
+                    self.false(slab._isCommitDue(slab.lastcommit))
+
     async def test_lmdbslab_maxsize(self):
         with self.getTestDir() as dirn:
             path = os.path.join(dirn, 'test.lmdb')
@@ -1272,6 +1432,198 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 self.len(2, commitstats)
                 self.eq(2, commitstats[-1][1])
 
+    async def test_lmdbslab_commitpolicy(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+            fastpath = os.path.join(dirn, 'fast.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path, commit_period=60, commit_bytes=100) as slab, \
+                    await s_lmdbslab.Slab.anit(fastpath, commit_period=0.01) as fast:
+
+                foo = slab.initdb('foo')
+                await slab.sync()
+
+                # the size of pending writes triggers a commit
+                slab.put(b'\x00' * 10, b'\x01' * 40, db=foo)
+                self.eq(50, slab.xactbytes)
+                self.false(slab._isCommitDue(time.monotonic()))
+
+                slab.putmulti([(b'\x02' * 10, b'\x03' * 40)], db=foo)
+                self.eq(100, slab.xactbytes)
+                self.true(slab._isCommitDue(time.monotonic()))
+
+                await asyncio.sleep(0.1)
+                self.false(slab.dirty)
+                self.eq(0, slab.xactbytes)
+
+                # a slab with a short commit period is committed on its own schedule
+                fast.put(b'foo', b'bar')
+                self.le(s_lmdbslab.Slab._getSyncTimeout(), 0.01)
+                await asyncio.sleep(0.1)
+                self.false(fast.dirty)
+
+                slab.put(b'\x04', b'\x05', db=foo)
+                await asyncio.sleep(0.1)
+                self.true(slab.dirty)
+
+                # readers waiting on a sequence cause it to be committed promptly
+                seqn = slab.getSeqn('seqn')
+                await slab.sync()
+
+                task = asyncio.create_task(seqn.waitForOffset(0, timeout=5))
+                await asyncio.sleep(0.01)
+                self.eq(1, slab.waiters)
+                self.eq(s_lmdbslab.Slab.WAITER_COMMIT_PERIOD, slab._getCommitPeriod())
+
+                seqn.add('hehe')
+                self.true(await task)
+                self.eq(0, slab.waiters)
+
+                stats = [s for s in await s_lmdbslab.Slab.getSlabStats() if s['path'] == path][0]
+                self.eq(60, stats['commitperiod'])
+                self.eq(100, stats['commitbytes'])
+                self.eq(0, stats['waiters'])
+
+    async def test_lmdbslab_replaylog(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=100000, replay_log_memsize=1000,
+                                                  max_replay_log=100000) as slab:
+
+                foo = slab.initdb('foo')
+                await slab.sync()
+
+                slab.put(b'\x00\x00', b'\x01' * 100, db=foo)
+                self.len(1, slab.xactops)
+                self.false(slab.xactops.spilled())
+
+                rows = [(i.to_bytes(2, 'big'), b'\x02' * 100) for i in range(1, 20)]
+                slab.putmulti(rows, db=foo)
+                self.true(slab.xactops.spilled())
+                self.len(0, slab.xactops.ops)
+
+                # write past the end of the map to replay the spilled log
+                mapsize = slab.mapsize
+                for i in range(20, 2000):
+                    slab.put(i.to_bytes(2, 'big'), b'\x03' * 100, db=foo)
+
+                self.gt(slab.mapsize, mapsize)
+                self.eq(b'\x01' * 100, slab.get(b'\x00\x00', db=foo))
+                self.eq(b'\x02' * 100, slab.get((19).to_bytes(2, 'big'), db=foo))
+                self.eq(b'\x03' * 100, slab.get((1999).to_bytes(2, 'big'), db=foo))
+                self.eq(2000, slab.stat(db=foo)['entries'])
+
+                await slab.sync()
+                self.len(0, slab.xactops)
+                self.false(slab.xactops.spilled())
+                self.eq(0, slab.xactbytes)
+
+    async def test_lmdbslab_headroom(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=s_const.mebibyte) as slab:
+
+                foo = slab.initdb('foo')
+
+                mapsize = slab.mapsize
+                slab.putmulti([(i.to_bytes(4, 'big'), b'\x00' * 1000) for i in range(600)], db=foo)
+                self.eq(mapsize, slab.mapsize)
+
+                # the map is grown after the commit instead of waiting for it to fill
+                await slab.sync()
+                self.gt(slab.mapsize, mapsize)
+                self.nn(slab.xactlimit)
+
+                # a transaction approaching the remaining space is committed early
+                with patch.object(slab, 'commitperiod', 10):
+
+                    lastcommit = slab.lastcommit
+                    slab.put(b'newp', b'\x00' * slab.xactlimit, db=foo)
+                    self.true(slab._isCommitDue(slab.lastcommit))
+
+                    for _ in range(50):
+                        if not slab.dirty:
+                            break
+                        await asyncio.sleep(0.1)
+
+                    self.false(slab.dirty)
+                    self.gt(slab.lastcommit, lastcommit)
+
+    async def test_lmdbslab_syncthread(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path, map_async=False, syncthread=True) as slab:
+
+                foo = slab.initdb('foo')
+
+                slab.put(b'\x00\x01', b'hehe', db=foo)
+                await slab.sync()
+
+                # the flush is complete when a non map_async slab sync returns
+                stats = [s for s in await s_lmdbslab.Slab.getSlabStats() if s['path'] == path][0]
+                self.true(stats['syncthread'])
+                self.eq(1, stats['flushhist']['count'])
+                self.eq(2, stats['commithist']['count'])
+                self.len(len(s_lmdbslab.LATENCY_BUCKETS) + 1, stats['commithist']['buckets'])
+                self.none(stats['commithist']['buckets'][-1][0])
+                self.eq(2, sum(c for (m, c) in stats['commithist']['buckets']))
+
+                # writes made while a flush is in progress land in the next transaction
+                fut = slab._flushFromThread()
+                self.true(fut is slab._flushFromThread())
+                slab.put(b'\x00\x02', b'haha', db=foo)
+                await fut
+                self.eq(b'haha', slab.get(b'\x00\x02', db=foo))
+
+                # the map may be resized and a transaction begun while a flush is in progress
+                evnt = threading.Event()
+                fsync = os.fsync
+
+                def slowsync(fd):
+                    evnt.wait(timeout=30)
+                    fsync(fd)
+
+                with patch('os.fsync', slowsync):
+
+                    fut = slab._flushFromThread()
+
+                    mapsize = slab.mapsize
+                    slab.put(b'\x00\x04', b'hoho', db=foo)
+                    slab._handle_mapfull()
+                    self.gt(slab.mapsize, mapsize)
+
+                    slab.forcecommit()
+                    self.eq(b'hoho', slab.get(b'\x00\x04', db=foo))
+                    self.false(fut.done())
+
+                    evnt.set()
+                    await fut
+
+                slab.put(b'\x00\x03', b'hoho', db=foo)
+
+            # uncommitted writes are committed and flushed on fini
+            async with await s_lmdbslab.Slab.anit(path, map_async=False, syncthread=True) as slab:
+                foo = slab.initdb('foo')
+                self.eq(b'hehe', slab.get(b'\x00\x01', db=foo))
+                self.eq(b'haha', slab.get(b'\x00\x02', db=foo))
+                self.eq(b'hoho', slab.get(b'\x00\x03', db=foo))
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+                stats = [s for s in await s_lmdbslab.Slab.getSlabStats() if s['path'] == path][0]
+                self.false(stats['syncthread'])
+                self.eq(0, stats['flushhist']['count'])
+
 class LmdbSlabMemLockTest(s_t_utils.SynTest):
 
     async def test_lmdbslabmemlock(self):
@@ -1288,6 +1640,106 @@ class LmdbSlabMemLockTest(s_t_utils.SynTest):
                 lockmem = s_thisplat.getCurrentLockedMemory()
                 self.ge(lockmem - beforelockmem, 4000)
 
+    async def test_lmdbslab_memlock_dbs(self):
+        self.thisHostMust(hasmemlocking=True)
+
+        self.eq([(1, 5), (7, 8)], s_lmdbslab._mergeRanges([(3, 5), (7, 8), (1, 3), (2, 4)]))
+        self.eq([(0, 2), (9, 11), (17, 18), (23, 24)], s_lmdbslab._bitsToRanges(b'\x03\x06\x82'))
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=10000000) as slab:
+                foo = slab.initdb('foo')
+                bar = slab.initdb('bar', dupsort=True)
+                slab.putmulti([(i.to_bytes(4, 'big'), b'\x01' * 200) for i in range(1000)], db=foo)
+                slab.putmulti([(b'\x00', i.to_bytes(4, 'big')) for i in range(1000)], dupdata=True, db=bar)
+                slab.putmulti([(b'\x01' + i.to_bytes(4, 'big'), b'\x02' * 200) for i in range(1000)])
+
+            beforelockmem = s_thisplat.getCurrentLockedMemory()
+
+            with patch('synapse.lib.lmdbslab.MEMLOCK_BATCH_SIZE', 100):
+
+                async with await s_lmdbslab.Slab.anit(path, lockdbs=('foo', 'bar', 'newp')) as slab:
+
+                    self.true(slab.lockmemory)
+
+                    foo = slab.initdb('foo')
+                    bar = slab.initdb('bar', dupsort=True)
+
+                    async def waitdbs():
+                        while len(slab.dbpages) < 2 or slab.resizeevent.is_set():
+                            await asyncio.sleep(0.01)
+                        await slab.lockdoneevent.wait()
+
+                    await asyncio.wait_for(waitdbs(), timeout=8)
+
+                    # 1000 rows of 200 bytes needs at least 50 pages
+                    tick, ranges = slab.dbpages['foo']
+                    self.ge(sum(e - s for (s, e) in ranges), 50)
+                    self.notin('newp', slab.dbpages)
+
+                    info = slab.statinfo()
+                    self.eq(('foo', 'bar', 'newp'), info['lockdbs'])
+                    self.gt(info['lock_progress'], 200000)
+                    self.eq(info['lock_goal'], info['lock_progress'])
+
+                    # the main db is not locked
+                    self.lt(info['lock_progress'], slab.mapsize)
+
+                    lockmem = s_thisplat.getCurrentLockedMemory()
+                    self.ge(lockmem - beforelockmem, 200000)
+
+                    resi = await slab.getMemResidency()
+                    self.gt(resi['bytes'], 0)
+                    self.ge(resi['resident'], resi['dbs']['foo']['resident'])
+                    self.eq(resi['dbs']['foo']['bytes'], resi['dbs']['foo']['resident'])
+                    self.eq(resi['dbs']['bar']['bytes'], resi['dbs']['bar']['resident'])
+                    self.eq(tick, resi['dbs']['foo']['time'])
+
+            # large ranges are locked in chunks
+            with patch('synapse.lib.lmdbslab.MEMLOCK_CHUNK_SIZE', 8192):
+
+                async with await s_lmdbslab.Slab.anit(path, lockdbs=('foo',), lockbranches=('newp',)) as slab:
+
+                    foo = slab.initdb('foo')
+
+                    async def waitfoo():
+                        while 'foo' not in slab.dbpages or slab.resizeevent.is_set():
+                            await asyncio.sleep(0.01)
+                        await slab.lockdoneevent.wait()
+
+                    await asyncio.wait_for(waitfoo(), timeout=8)
+
+                    tick, ranges = slab.dbpages['foo']
+                    self.ge(sum(e - s for (s, e) in ranges), 50)
+                    self.gt(len(slab.lockedranges), len(ranges))
+                    self.true(all(size <= 8192 for (addr, size) in slab.lockedranges))
+                    self.eq(slab.lock_goal, sum(size for (addr, size) in slab.lockedranges))
+
+            # only the branch pages of the lockbranches dbs are locked
+            async with await s_lmdbslab.Slab.anit(path, lockbranches=('foo',)) as slab:
+
+                self.true(slab.lockmemory)
+                foo = slab.initdb('foo')
+
+                await asyncio.wait_for(waitfoo(), timeout=8)
+
+                tick, ranges = slab.dbpages['foo']
+                self.eq(1, sum(e - s for (s, e) in ranges))
+                self.eq(slab.pagesize, slab.lock_goal)
+                self.eq(('foo',), slab.statinfo()['lockbranches'])
+
+            async with await s_lmdbslab.Slab.anit(path, lockbudget=100000) as slab:
+
+                self.true(await asyncio.wait_for(slab.lockdoneevent.wait(), 8))
+
+                info = slab.statinfo()
+                self.eq(100000, info['lockbudget'])
+                self.gt(info['lock_progress'], 0)
+                self.le(info['lock_progress'], 100000)
+
     async def test_multiple_grow(self):
         '''
         Trigger multiple grow events rapidly and ensure memlock thread survives.
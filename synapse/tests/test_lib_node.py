@@ -367,6 +367,82 @@ class NodeTest(s_t_utils.SynTest):
             self.eq(dict(data),
                     {'valu': {1, 2}, 'x': {2, 3}})
 
+    async def test_node_path(self):
+
+        async with self.getTestCore() as core:
+
+            async with await core.snap() as snap:
+
+                node1 = await snap.addNode('test:str', 'foo')
+                node2 = await snap.addNode('test:str', 'bar')
+                node3 = await snap.addNode('test:str', 'baz')
+
+                with snap.getStormRuntime(opts={'vars': {'x': 0}}) as runt:
+
+                    path1 = runt.initPath(node1)
+                    self.eq(0, path1.getVar('x'))
+
+                    # the runtime and path vars are copied on write
+                    path1.setVar('x', 1)
+                    self.eq(0, runt.getVar('x'))
+
+                    runt.setVar('y', 2)
+                    self.notin('y', path1.vars)
+
+                    path2 = path1.fork(node2)
+                    path3 = path2.fork(node3)
+
+                    self.eq([node1], path1.nodes)
+                    self.eq([node1, node2], path2.nodes)
+                    self.eq([node1, node2, node3], path3.nodes)
+                    self.eq(node3, path3.getVar('node'))
+                    self.eq([node1.iden(), node2.iden(), node3.iden()], path3.pack(path=True)['nodes'])
+
+                    self.eq(1, path3.getVar('x'))
+                    path2.setVar('x', 2)
+                    self.eq(1, path1.getVar('x'))
+                    self.eq(1, path3.getVar('x'))
+                    path1.setVar('z', 3)
+                    self.notin('z', path2.vars)
+                    self.notin('z', path3.vars)
+
+                    path4 = path3.clone()
+                    self.eq([node1, node2, node3], path4.nodes)
+                    path4.setVar('x', 4)
+                    self.eq(1, path3.getVar('x'))
+
+                    # without its history a path only links its most recent node
+                    runt.keeppath = False
+                    path = runt.initPath(node1).fork(node2).fork(node3)
+                    self.eq([node3], path.nodes)
+                    self.none(path.link[1])
+
+            await core.nodes('[ test:comp=(42, lol) ]')
+
+            msgs = await core.stormlist('test:comp -> test:int', opts={'path': True})
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.len(1, nodes)
+            self.len(2, nodes[0][1]['path']['nodes'])
+
+            msgs = await core.stormlist('test:comp -> test:int $lib.print($path.idens())')
+            self.stormIsInPrint(str(nodes[0][1]['path']['nodes']).replace('"', "'"), msgs)
+
+            self.false(core.getStormQuery('test:comp -> test:int').usesPath(core))
+            self.true(core.getStormQuery('test:comp -> test:int $lib.print($path)').usesPath(core))
+            self.true(core.getStormQuery('test:comp | tee { -> test:int $lib.print($path) }').usesPath(core))
+            self.true(core.getStormQuery('test:comp -> test:int { $lib.print($path) }').usesPath(core))
+            self.false(core.getStormQuery('test:comp | tee { -> test:int }').usesPath(core))
+
+            # pure storm commands run on the paths of the calling query
+            await core.setStormCmd({'name': 'foo.bar', 'storm': '-> test:int'})
+            self.true(core.getStormQuery('test:comp | foo.bar').usesPath(core))
+
+            # macros run on the paths of the calling query
+            self.true(core.getStormQuery('test:comp -> test:int | macro.exec foo').usesPath(core))
+            await core.nodes('$lib.macro.set(foo, ${ $lib.print($path.idens()) })')
+            msgs = await core.stormlist('test:comp -> test:int | macro.exec foo')
+            self.stormIsInPrint(str(nodes[0][1]['path']['nodes']).replace('"', "'"), msgs)
+
     async def test_node_repr(self):
 
         async with self.getTestCore() as core:
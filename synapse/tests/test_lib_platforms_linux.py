@@ -53,3 +53,22 @@ class LinuxTest(s_t_utils.SynTest):
             s_thisplat.munlock(0xFF, 16)
         # Cannot allocate memory to unlock
         self.eq(cm.exception.errno, 12)
+
+    def test_mincore(self):
+        self.thisHostMust(hasmemlocking=True)
+
+        with self.getTestDir() as dirn:
+
+            fn = pathlib.Path(dirn) / 'mapfile'
+            with open(fn, 'wb') as f:
+                f.write(b'x' * 8192)
+
+            with open(fn, 'rb') as f:
+                with s_thisplat.mmap(0, 8192, 0x1, 0x8001, f.fileno(), 0) as addr:
+                    vect = s_thisplat.mincore(addr, 8192)
+                    self.len(2, vect)
+                    self.true(vect[0])
+                    self.true(vect[1])
+
+        with self.raises(OSError):
+            s_thisplat.mincore(0x01, 16)
@@ -476,3 +476,54 @@ class SnapTest(s_t_utils.SynTest):
             self.len(1, await view1.nodes('#woot:score=20'))
 
             self.len(1, await view0.nodes('[ test:int=10 +#woot:score=40 ]'))
+
+    async def test_cortex_lift_layers_lazy_join(self):
+        '''
+        Test that node fields are only joined from the layers when accessed
+        '''
+        async with self._getTestCoreMultiLayer() as (view0, view1):
+
+            await view0.core.addTagProp('score', ('int', {}), {})
+
+            layr0 = view0.layers[0]
+            layr1 = view1.layers[0]
+
+            await view0.nodes('[ inet:ipv4=1.2.3.4 :asn=10 :loc=us +#foo +#bar:score=10 ]')
+            await view1.nodes('inet:ipv4=1.2.3.4 [ :asn=20 +#baz +#bar:score=20 ]')
+
+            async with await view1.core.snap(view=view1) as snap:
+
+                node = await snap.getNodeByNdef(('inet:ipv4', 0x01020304))
+
+                self.notin('props', node.__dict__)
+                self.notin('tags', node.__dict__)
+                self.notin('tagprops', node.__dict__)
+                self.eq(layr0, node.bylayer['ndef'])
+
+                self.sorteq(('foo', 'bar', 'baz'), node.tags.keys())
+                self.notin('props', node.__dict__)
+                self.eq({'foo': layr0, 'bar': layr0, 'baz': layr1}, dict(node.bylayer['tags']))
+
+                self.eq(20, node.get('asn'))
+                self.eq('us', node.get('loc'))
+                self.eq(layr1, node.bylayer['props']['asn'])
+                self.eq(layr0, node.bylayer['props']['loc'])
+
+                self.eq(20, node.getTagProp('bar', 'score'))
+                self.eq(layr1, node.bylayer['tagprops'][('bar', 'score')])
+
+                await node.addTag('hehe')
+                self.eq(layr1, node.bylayer['tags']['hehe'])
+
+            async with await view1.core.snap(view=view1) as snap:
+                nodes = await snap.nodes('inet:ipv4 +#newp')
+                self.len(0, nodes)
+                node = await snap.getNodeByNdef(('inet:ipv4', 0x01020304))
+                self.notin('props', node.__dict__)
+                self.sorteq(('foo', 'bar', 'baz', 'hehe'), node.tags.keys())
+
+            async with await view0.core.snap(view=view0) as snap:
+                node = await snap.getNodeByNdef(('inet:ipv4', 0x01020304))
+                self.eq(10, node.get('asn'))
+                self.eq({'foo': (None, None), 'bar': (None, None)}, node.tags)
+                self.eq(layr0, node.bylayer['tags']['foo'])
@@ -54,3 +54,33 @@ class SpooledTest(s_test.SynTest):
                 await sset.add(30)
                 self.true(os.path.isdir(sset.slabpath))
                 self.true(os.path.abspath(sset.slabpath).startswith(dirn))
+
+    async def test_spooled_list(self):
+
+        async with await s_spooled.List.anit(size=3) as slst:
+
+            self.len(0, slst)
+            self.eq([], [x async for x in slst.iter()])
+
+            await slst.append(10)
+            await slst.append((20, 'twenty'))
+
+            self.len(2, slst)
+            self.false(slst.fallback)
+            self.eq([10, (20, 'twenty')], [x async for x in slst.iter()])
+            self.eq([(20, 'twenty')], [x async for x in slst.iter(offs=1)])
+
+            # Trigger fallback
+            await slst.append(None)
+            await slst.append(40)
+
+            self.len(4, slst)
+            self.true(slst.fallback)
+            self.true(os.path.isdir(slst.slabpath))
+
+            self.eq([10, (20, 'twenty'), None, 40], [x async for x in slst.iter()])
+            self.eq([None, 40], [x async for x in slst.iter(offs=2)])
+            self.eq([], [x async for x in slst.iter(offs=4)])
+            self.eq([10, (20, 'twenty'), None, 40], [x async for x in slst.iter(offs=-1)])
+
+        self.false(os.path.isdir(slst.slabpath))
@@ -200,6 +200,206 @@ class StormTest(s_t_utils.SynTest):
             nodes = [mesg for mesg in mesgs if mesg[0] == 'node']
             self.len(0, nodes)
 
+    async def test_storm_profile(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 inet:ipv4=9.9.9.9 ] [ +#foo :asn=10 ]')
+
+            msgs = await core.stormlist('inet:ipv4#foo')
+            self.len(0, [m for m in msgs if m[0] == 'profile'])
+
+            q = 'inet:ipv4#foo -inet:ipv4=1.2.3.4 | tee { -> inet:asn } | limit 10'
+            msgs = await core.stormlist(q, opts={'profile': True})
+
+            self.eq(['init', 'node', 'node', 'profile', 'fini'], [m[0] for m in msgs])
+
+            prof = msgs[-2][1]
+            self.gt(prof['took'], 0)
+
+            opers = prof['opers']
+            # operators are listed in the order they were started
+            self.eq([o['oper'] for o in opers], ['LiftFormTag', 'FiltOper', 'CmdOper', 'CmdOper', 'FormPivot'])
+
+            lift, filt, tee, limit, pivot = opers
+
+            self.eq(0, lift['nodes:in'])
+            self.eq(3, lift['nodes:out'])
+            self.eq(3, lift['rows'])
+            self.eq(3, lift['joins'])
+
+            self.eq(3, filt['nodes:in'])
+            self.eq(2, filt['nodes:out'])
+            self.eq(0, filt['rows'])
+            self.eq(0, filt['joins'])
+
+            # the tee subquery runs in its own runtime
+            self.eq(2, tee['nodes:in'])
+            self.eq(2, tee['nodes:out'])
+            self.eq(2, pivot['nodes:in'])
+            self.eq(2, pivot['nodes:out'])
+            self.eq('FormPivot: [AbsProp: inet:asn], isjoin=False', pivot['repr'])
+
+            self.eq(2, limit['nodes:in'])
+            self.eq(2, limit['nodes:out'])
+
+            for oper in opers:
+                self.ge(oper['took'], 0)
+                self.eq(0, oper['depth'])
+
+            # subqueries are nested within their operator
+            q = 'inet:ipv4 +{ -> inet:asn }'
+            msgs = await core.stormlist(q, opts={'profile': True, 'show': ('print',)})
+            prof = [m[1] for m in msgs if m[0] == 'profile'][0]
+
+            opers = prof['opers']
+            self.eq([(o['oper'], o['depth']) for o in opers],
+                    [('LiftProp', 0), ('FiltOper', 0), ('FormPivot', 1)])
+            self.eq(3, opers[2]['nodes:in'])
+            self.eq(3, opers[2]['nodes:out'])
+
+            # profiling also applies to pure storm commands
+            pkgdef = {
+                'name': 'foo',
+                'version': (0, 0, 1),
+                'commands': ({'name': 'foo.bar', 'storm': '-> inet:asn'},),
+            }
+            await core.addStormPkg(pkgdef)
+
+            msgs = await core.stormlist('inet:ipv4=1.2.3.4 | foo.bar', opts={'profile': True})
+            prof = [m[1] for m in msgs if m[0] == 'profile'][0]
+            self.eq([o['oper'] for o in prof['opers']], ['LiftPropBy', 'CmdOper', 'FormPivot'])
+
+            # the profile is not sent for errors
+            msgs = await core.stormlist('inet:ipv4 | $lib.raise(foo, bar)', opts={'profile': True})
+            self.len(0, [m for m in msgs if m[0] == 'profile'])
+
+    async def test_storm_budget(self):
+
+        async with self.getTestCoreAndProxy() as (core, prox):
+
+            await core.nodes('for $i in $lib.list(1, 2, 3, 4, 5) { [ inet:ipv4=$i ] }')
+
+            def geterr(msgs):
+                errs = [m[1] for m in msgs if m[0] == 'err']
+                self.len(1, errs)
+                self.eq('StormBudgetExceeded', errs[0][0])
+                return errs[0][1]
+
+            msgs = await core.stormlist('inet:ipv4', opts={'budget': {'nodes': 5, 'rows': 5}})
+            self.len(5, [m for m in msgs if m[0] == 'node'])
+
+            msgs = await core.stormlist('inet:ipv4', opts={'budget': {'nodes': 3}})
+            self.len(3, [m for m in msgs if m[0] == 'node'])
+            self.eq('fini', msgs[-1][0])
+            err = geterr(msgs)
+            self.eq('nodes', err['name'])
+            self.eq(3, err['limit'])
+
+            # the budget applies to subqueries and commands
+            msgs = await core.stormlist('inet:ipv4=1.2.3.4 | tee { inet:ipv4 }', opts={'budget': {'nodes': 3}})
+            self.eq('nodes', geterr(msgs)['name'])
+
+            msgs = await core.stormlist('inet:ipv4', opts={'budget': {'rows': 2}})
+            self.eq('rows', geterr(msgs)['name'])
+
+            msgs = await core.stormlist('[ inet:ipv4=6.6.6.6 ]', opts={'budget': {'edits': 1}})
+            self.eq('edits', geterr(msgs)['name'])
+            self.len(0, await core.nodes('inet:ipv4=6.6.6.6'))
+
+            # the edits to add the node and its :type prop
+            msgs = await core.stormlist('[ inet:ipv4=6.6.6.6 ]', opts={'budget': {'edits': 2}})
+            self.len(1, [m for m in msgs if m[0] == 'node'])
+
+            msgs = await core.stormlist('inet:ipv4=6.6.6.6 [ :asn=10 ]', opts={'budget': {'edits': 1}})
+            self.eq('edits', geterr(msgs)['name'])
+            self.len(0, await core.nodes('inet:asn=10'))
+            await core.nodes('inet:ipv4=6.6.6.6 | delnode')
+
+            msgs = await core.stormlist('while (true) { $lib.time.sleep(0.01) }', opts={'budget': {'timeout': 0.1}})
+            self.eq('timeout', geterr(msgs)['name'])
+
+            # the timeout cancels a query which is blocked in a single call
+            msgs = await asyncio.wait_for(core.stormlist('$lib.time.sleep(10)', opts={'budget': {'timeout': 0.1}}), 5)
+            self.eq('timeout', geterr(msgs)['name'])
+
+            with self.raises(s_exc.StormBudgetExceeded):
+                await asyncio.wait_for(core.nodes('$lib.time.sleep(10)', opts={'budget': {'timeout': 0.1}}), 5)
+
+            # the rows scanned by concurrent queries on the same layer are not counted
+            async def scan():
+                for _ in range(10):
+                    await core.nodes('inet:ipv4')
+
+            q = 'inet:ipv4=0.0.0.1 $lib.time.sleep(0.1)'
+            msgs, _ = await asyncio.gather(core.stormlist(q, opts={'budget': {'rows': 3}}), scan())
+            self.len(0, [m for m in msgs if m[0] == 'err'])
+            self.len(1, [m for m in msgs if m[0] == 'node'])
+
+            with self.raises(s_exc.StormBudgetExceeded):
+                await core.nodes('inet:ipv4', opts={'budget': {'nodes': 1}})
+
+            with self.raises(s_exc.SchemaViolation):
+                await core.nodes('inet:ipv4', opts={'budget': {'newp': 1}})
+
+            with self.raises(s_exc.SchemaViolation):
+                await core.nodes('inet:ipv4', opts={'budget': {'timeout': 0}})
+
+            # the budget is not retained by the snap once the query is complete
+            async with await core.view.snap(user=core.auth.rootuser) as snap:
+                self.len(1, await alist(snap.eval('inet:ipv4=0.0.0.1', opts={'budget': {'nodes': 1}})))
+                self.len(5, await alist(snap.eval('inet:ipv4')))
+
+            # the spool limit bounds the number of items held in memory by uniq
+            msgs = await core.stormlist('inet:ipv4 inet:ipv4 | uniq', opts={'budget': {'spool': 2}})
+            self.len(5, [m for m in msgs if m[0] == 'node'])
+
+            # default budgets may be set for users and roles
+            visi = await prox.addUser('visi')
+            await prox.addUserRule(visi['iden'], (True, ('node',)))
+            ninjas = await prox.addRole('ninjas')
+            await prox.addUserRole(visi['iden'], ninjas['iden'])
+
+            opts = {'user': visi['iden']}
+
+            await prox.setRoleStormBudget(ninjas['iden'], {'nodes': 2, 'rows': 100})
+            msgs = await core.stormlist('inet:ipv4', opts=opts)
+            self.eq(2, geterr(msgs)['limit'])
+
+            # the highest limit of any role is used
+            powerusers = await prox.addRole('powerusers')
+            await prox.addUserRole(visi['iden'], powerusers['iden'])
+            await prox.setRoleStormBudget(powerusers['iden'], {'nodes': 3})
+            msgs = await core.stormlist('inet:ipv4', opts=opts)
+            self.eq(3, geterr(msgs)['limit'])
+
+            # user limits take precedence over role limits
+            await prox.setUserStormBudget(visi['iden'], {'nodes': 4})
+            msgs = await core.stormlist('inet:ipv4', opts=opts)
+            self.eq(4, geterr(msgs)['limit'])
+
+            # a query may only lower the limits set for the user
+            opts['budget'] = {'nodes': 10}
+            msgs = await core.stormlist('inet:ipv4', opts=opts)
+            self.eq(4, geterr(msgs)['limit'])
+
+            opts['budget'] = {'nodes': 1}
+            msgs = await core.stormlist('inet:ipv4', opts=opts)
+            self.eq(1, geterr(msgs)['limit'])
+
+            await prox.setUserStormBudget(visi['iden'], None)
+            await prox.setRoleStormBudget(ninjas['iden'], None)
+            await prox.setRoleStormBudget(powerusers['iden'], None)
+            msgs = await core.stormlist('inet:ipv4', opts={'user': visi['iden']})
+            self.len(5, [m for m in msgs if m[0] == 'node'])
+
+            with self.raises(s_exc.SchemaViolation):
+                await prox.setUserStormBudget(visi['iden'], {'nodes': -1})
+
+            async with core.getLocalProxy(user='visi') as visiprox:
+                with self.raises(s_exc.AuthDeny):
+                    await visiprox.setUserStormBudget(visi['iden'], None)
+
     async def test_storm_uniq(self):
         async with self.getTestCore() as core:
             q = "[test:comp=(123, test) test:comp=(123, duck) test:comp=(123, mode)]"
@@ -487,6 +687,86 @@ class StormTest(s_t_utils.SynTest):
             q = 'tee'
             await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
 
+    async def test_storm_parallel(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.1 inet:ipv4=1.2.3.2 inet:ipv4=1.2.3.3 inet:ipv4=1.2.3.4 ]')
+            await core.nodes('inet:ipv4 [ :asn=$node.value() ]')
+
+            nodes = await core.nodes('inet:ipv4 | parallel { -> inet:asn }')
+            self.sorteq([n.ndef[1] for n in nodes], [0x01020301, 0x01020302, 0x01020303, 0x01020304])
+
+            nodes = await core.nodes('inet:ipv4 | parallel --ordered { -> inet:asn }')
+            self.eq([n.ndef[1] for n in nodes], [0x01020301, 0x01020302, 0x01020303, 0x01020304])
+
+            # each query gets a forked path with the vars of the input node
+            q = 'inet:ipv4 $ipv4=$node.repr() | parallel --ordered { $asn=$node.value() -> inet:asn } | $lib.print("{v} {a}", v=$ipv4, a=$asn)'
+            msgs = await core.stormlist(q)
+            prints = [m[1]['mesg'] for m in msgs if m[0] == 'print']
+            self.eq(prints, ['1.2.3.1 16909057', '1.2.3.2 16909058', '1.2.3.3 16909059', '1.2.3.4 16909060'])
+
+            ipv4 = (await core.nodes('inet:ipv4=1.2.3.1'))[0]
+            asn = (await core.nodes('inet:asn=16909057'))[0]
+            msgs = await core.stormlist('inet:ipv4=1.2.3.1 | parallel { -> inet:asn }', opts={'path': True})
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.len(1, nodes)
+            self.eq(nodes[0][1]['path']['nodes'], [ipv4.iden(), asn.iden()])
+
+            # the queries for all of the nodes are running at once
+            await core.nodes('$lib.queue.add(barrier)')
+            q = 'inet:ipv4 | parallel --size 4 { $q=$lib.queue.get(barrier) $q.put($node.repr()) $q.get(offs=3, cull=$lib.false) }'
+            nodes = await asyncio.wait_for(core.nodes(q), timeout=10)
+            self.len(4, nodes)
+
+            await core.nodes('$lib.queue.del(barrier)')
+            await core.nodes('$lib.queue.add(barrier)')
+            q = 'inet:ipv4 | parallel --ordered --size 4 { $q=$lib.queue.get(barrier) $q.put($node.repr()) $q.get(offs=3, cull=$lib.false) }'
+            nodes = await asyncio.wait_for(core.nodes(q), timeout=10)
+            self.eq([n.ndef[1] for n in nodes], [0x01020301, 0x01020302, 0x01020303, 0x01020304])
+
+            # only --size queries are run at once
+            await core.nodes('$lib.queue.del(barrier)')
+            await core.nodes('$lib.queue.add(barrier)')
+            q = 'inet:ipv4 | parallel --size 2 { $q=$lib.queue.get(barrier) $q.put($node.repr()) $q.get(offs=3, cull=$lib.false) }'
+            with self.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(core.nodes(q), timeout=1)
+
+            # nodes may be yielded before all the input nodes are consumed
+            nodes = await core.nodes('inet:ipv4 | parallel --size 2 { -> inet:asn } | limit 1')
+            self.len(1, nodes)
+
+            nodes = await core.nodes('inet:ipv4 | parallel --ordered --size 1 { -> inet:asn } | limit 1')
+            self.eq([n.ndef[1] for n in nodes], [0x01020301])
+
+            # the output is drained while waiting for the next input node
+            await core.nodes('$lib.queue.add(drain)')
+            q = '''
+                $q=$lib.queue.get(drain)
+                inet:ipv4
+                if ($node.repr() = "1.2.3.2") { $q.get(offs=0, cull=$lib.false) }
+                | parallel --size 4 { -> inet:asn }
+                | $q.put($node.value())
+            '''
+            nodes = await asyncio.wait_for(core.nodes(q), timeout=10)
+            self.len(4, nodes)
+
+            self.len(0, await core.nodes('inet:fqdn | parallel { -> inet:asn }'))
+            self.len(0, await core.nodes('inet:fqdn | parallel --size $node.value() { -> inet:asn }'))
+
+            # arguments which are not runtsafe are computed per node
+            nodes = await core.nodes('inet:ipv4 $size=$lib.len($node.repr()) | parallel --size $size { -> inet:asn }')
+            self.len(4, nodes)
+
+            with self.raises(s_exc.StormRuntimeError):
+                await core.nodes('inet:ipv4 | parallel --size 0 { -> inet:asn }')
+
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4 | parallel { [ :asn=newp ] }')
+
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('inet:ipv4 | parallel --ordered { [ :asn=newp ] }')
+
     async def test_storm_yieldvalu(self):
 
         async with self.getTestCore() as core:
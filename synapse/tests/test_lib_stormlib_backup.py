@@ -32,6 +32,10 @@ class BackupTest(s_test.SynTest):
                 await core.callStorm('$lib.backup.run(name=foo)', opts={'vars': {'name': name}})
                 self.true(os.path.isdir(os.path.join(backdirn, 'foo')))
 
+                await core.callStorm('$lib.backup.run(name=bar, base=foo)')
+                self.true(os.path.isfile(os.path.join(backdirn, 'bar', 'nexus.mpk')))
+                await core.callStorm('$lib.backup.del(bar)')
+
                 await core.callStorm('$lib.backup.del(foo)')
                 self.false(os.path.isdir(os.path.join(backdirn, 'foo')))
 
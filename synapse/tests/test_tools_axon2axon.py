@@ -0,0 +1,57 @@
+import hashlib
+import unittest.mock as mock
+
+import synapse.tests.utils as s_t_utils
+import synapse.tools.axon2axon as s_axon2axon
+
+import synapse.lib.const as s_const
+
+class TestAxon2Axon(s_t_utils.SynTest):
+
+    async def test_tools_axon2axon(self):
+
+        bigbuf = b'V' * s_const.mebibyte
+        bighash = hashlib.sha256(bigbuf).digest()
+
+        async with self.getTestAxon() as srcaxon:
+
+            async with self.getTestAxon() as dstaxon:
+
+                await srcaxon.puts([b'visi', b'test', b'', bigbuf])
+                await dstaxon.put(b'test')
+
+                srcurl = srcaxon.getLocalUrl()
+                dsturl = dstaxon.getLocalUrl()
+
+                outp = self.getTestOutp()
+                self.eq(0, await s_axon2axon.main(['--batch', '2', srcurl, dsturl], outp=outp))
+                outp.expect('Copied 1 files (offset: 2)')
+                outp.expect('Copied 3 files. Next offset: 4')
+
+                for byts in (b'visi', b'test', b''):
+                    self.true(await dstaxon.has(hashlib.sha256(byts).digest()))
+
+                self.eq(bigbuf, b''.join([byts async for byts in dstaxon.get(bighash)]))
+
+                info = await dstaxon.metrics()
+                self.eq(4, info.get('file:count'))
+                self.eq(len(bigbuf) + 8, info.get('size:bytes'))
+
+                # resume from the returned offset
+                await srcaxon.put(b'newp')
+
+                outp = self.getTestOutp()
+                self.eq(0, await s_axon2axon.main(['--offset', '4', srcurl, dsturl], outp=outp))
+                outp.expect('Copied 1 files. Next offset: 5')
+                self.true(await dstaxon.has(hashlib.sha256(b'newp').digest()))
+
+                # small files are sent in batches bounded by size
+                await srcaxon.puts([b'hehe', b'haha', b'hoho'])
+
+                outp = self.getTestOutp()
+                with mock.patch('synapse.tools.axon2axon.PUTMANY_SIZE', 8):
+                    self.eq(0, await s_axon2axon.main(['--offset', '5', srcurl, dsturl], outp=outp))
+                outp.expect('Copied 3 files. Next offset: 8')
+
+                for byts in (b'hehe', b'haha', b'hoho'):
+                    self.true(await dstaxon.has(hashlib.sha256(byts).digest()))
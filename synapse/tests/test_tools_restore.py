@@ -0,0 +1,89 @@
+import os
+
+import synapse.common as s_common
+
+import synapse.tests.utils as s_t_utils
+
+import synapse.tools.restore as s_t_restore
+
+class RestoreTest(s_t_utils.SynTest):
+
+    async def test_tools_restore(self):
+
+        with self.getTestDir() as dirn:
+
+            backdirn = os.path.join(dirn, 'backups')
+            coredirn = os.path.join(dirn, 'cortex')
+
+            s_common.yamlsave({'backup:dir': backdirn}, coredirn, 'cell.yaml')
+
+            async with self.getTestCore(dirn=coredirn) as core:
+
+                await core.nodes('[ inet:ipv4=1.2.3.4 ]')
+                await core.runBackup(name='full')
+
+                await core.nodes('[ inet:ipv4=5.6.7.8 ]')
+                await core.runBackup(name='incr00', base='full')
+
+                await core.nodes('[ inet:ipv4=9.9.9.9 ] [ +#foo ]')
+                await core.runBackup(name='incr01', base='incr00')
+
+                # a differential backup from the same base
+                await core.nodes('inet:ipv4=1.2.3.4 | delnode')
+                await core.runBackup(name='diff', base='full')
+
+                indx = await core.getNexsIndx()
+                midx = (await core.getBackupInfo('incr01'))['nexsindx']
+
+            fulldirn = os.path.join(backdirn, 'full')
+            incr00 = os.path.join(backdirn, 'incr00')
+            incr01 = os.path.join(backdirn, 'incr01')
+            diff = os.path.join(backdirn, 'diff')
+
+            outp = self.getTestOutp()
+            dstdirn = os.path.join(dirn, 'restore00')
+            self.eq(0, await s_t_restore.main([dstdirn, fulldirn, incr00, incr01], outp=outp))
+            outp.expect(f'Restore complete. Nexus index: {midx}')
+            self.false(os.path.isfile(os.path.join(dstdirn, 'backup.yaml')))
+
+            async with self.getTestCore(dirn=dstdirn) as core:
+                self.len(3, await core.nodes('inet:ipv4'))
+                self.len(1, await core.nodes('inet:ipv4#foo'))
+                self.eq(midx, await core.getNexsIndx())
+
+            outp = self.getTestOutp()
+            dstdirn = os.path.join(dirn, 'restore01')
+            self.eq(0, await s_t_restore.main([dstdirn, fulldirn, diff], outp=outp))
+            outp.expect(f'Restore complete. Nexus index: {indx}')
+
+            async with self.getTestCore(dirn=dstdirn) as core:
+                self.len(2, await core.nodes('inet:ipv4'))
+
+            # only restore the full backup
+            outp = self.getTestOutp()
+            dstdirn = os.path.join(dirn, 'restore02')
+            self.eq(0, await s_t_restore.main([dstdirn, fulldirn], outp=outp))
+
+            async with self.getTestCore(dirn=dstdirn) as core:
+                self.len(1, await core.nodes('inet:ipv4'))
+
+            outp = self.getTestOutp()
+            self.eq(1, await s_t_restore.main([dstdirn, fulldirn], outp=outp))
+            outp.expect('is not empty')
+
+            outp = self.getTestOutp()
+            self.eq(1, await s_t_restore.main([os.path.join(dirn, 'newp'), incr00], outp=outp))
+            outp.expect('is not a full backup')
+
+            outp = self.getTestOutp()
+            self.eq(1, await s_t_restore.main([os.path.join(dirn, 'newp'), fulldirn, incr01], outp=outp))
+            outp.expect('which is after')
+
+            outp = self.getTestOutp()
+            self.eq(1, await s_t_restore.main([os.path.join(dirn, 'newp'), fulldirn, dirn], outp=outp))
+            outp.expect('has no backup.yaml')
+
+            s_common.yamlsave({'iden': 'newp', 'offs': 0}, dirn, 'other', 'backup.yaml')
+            outp = self.getTestOutp()
+            self.eq(1, await s_t_restore.main([os.path.join(dirn, 'newp'), fulldirn, os.path.join(dirn, 'other')], outp=outp))
+            outp.expect('from a different cell')
@@ -0,0 +1,118 @@
+import sys
+import asyncio
+import argparse
+
+import synapse.telepath as s_telepath
+
+import synapse.lib.output as s_output
+
+BATCH_SIZE = 1000
+SMALL_FILE_SIZE = 256 * 1024
+PUTMANY_SIZE = 4 * 1024 * 1024
+
+async def replicate(srcaxon, dstaxon, offs=0, batchsize=BATCH_SIZE, outp=None):
+    '''
+    Copy the files from one axon to another using the hashes() sync log.
+
+    Args:
+        srcaxon: The source axon (or proxy).
+        dstaxon: The destination axon (or proxy).
+        offs (int): The source axon hashes() offset to start from.
+        batchsize (int): The number of hashes to check for at once.
+
+    Notes:
+        Files smaller than SMALL_FILE_SIZE are sent using putmany() in batches of at
+        most PUTMANY_SIZE bytes.  Larger files are streamed through an upload share.
+
+    Returns:
+        (int, int): The next source offset and the number of files copied.
+    '''
+    count = 0
+
+    async def copybatch(fd, items):
+
+        nonlocal count
+
+        wants = set(await dstaxon.wants([sha256 for (sha256, size) in items]))
+
+        small = []
+        smallsize = 0
+
+        async def putsmall():
+
+            nonlocal count, smallsize
+
+            async for item in dstaxon.putmany(small):
+                count += 1
+
+            small.clear()
+            smallsize = 0
+
+        for sha256, size in items:
+
+            if sha256 not in wants:
+                continue
+
+            if size < SMALL_FILE_SIZE:
+
+                if smallsize + size > PUTMANY_SIZE:
+                    await putsmall()
+
+                small.append(b''.join([byts async for byts in srcaxon.get(sha256)]))
+                smallsize += size
+                continue
+
+            async for byts in srcaxon.get(sha256):
+                await fd.write(byts)
+
+            await fd.save()
+
+            count += 1
+
+        if small:
+            await putsmall()
+
+    items = []
+
+    # a single upload share is reused for all the large files
+    async with await dstaxon.upload() as fd:
+
+        async for indx, (sha256, size) in srcaxon.hashes(offs):
+
+            items.append((sha256, size))
+            offs = indx + 1
+
+            if len(items) >= batchsize:
+                await copybatch(fd, items)
+                items.clear()
+
+                if outp is not None:
+                    outp.printf(f'Copied {count} files (offset: {offs})')
+
+        if items:
+            await copybatch(fd, items)
+
+    return offs, count
+
+async def main(argv, outp=s_output.stdout):
+
+    pars = argparse.ArgumentParser(prog='synapse.tools.axon2axon',
+                                   description='Copy files from one axon to another.')
+
+    pars.add_argument('--offset', default=0, type=int, help='The source axon hashes() offset to start from.')
+    pars.add_argument('--batch', default=BATCH_SIZE, type=int, help='The number of hashes to check for at once.')
+
+    pars.add_argument('srcurl', help='The telepath URL for the source axon.')
+    pars.add_argument('dsturl', help='The telepath URL for the destination axon.')
+
+    opts = pars.parse_args(argv)
+
+    async with await s_telepath.openurl(opts.srcurl) as srcaxon:
+        async with await s_telepath.openurl(opts.dsturl) as dstaxon:
+            offs, count = await replicate(srcaxon, dstaxon, offs=opts.offset, batchsize=opts.batch, outp=outp)
+
+    outp.printf(f'Copied {count} files. Next offset: {offs}')
+    return 0
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -12,6 +12,8 @@ import lmdb
 
 import synapse.common as s_common
 
+import synapse.lib.const as s_const
+
 logger = logging.getLogger(__name__)
 
 def backup(srcdir, dstdir, skipdirs=None):
@@ -23,11 +25,14 @@ def backup(srcdir, dstdir, skipdirs=None):
         dstdir (str): Path to backup target directory.
         skipdirs (list or None): Optional list of relative directory name glob patterns to exclude from the backup.
 
+    Returns:
+        dict: A dictionary of relative slab paths to copy stats.
+
     Note:
         Running this method from the same process as a running user of the directory may lead to a segmentation fault
     '''
     with capturelmdbs(srcdir, skipdirs=skipdirs) as lmdbinfo:
-        txnbackup(lmdbinfo, srcdir, dstdir, skipdirs=skipdirs)
+        return txnbackup(lmdbinfo, srcdir, dstdir, skipdirs=skipdirs)
 
 @contextlib.contextmanager
 def capturelmdbs(srcdir, skipdirs=None, onlydirs=None):
@@ -76,11 +81,16 @@ def txnbackup(lmdbinfo, srcdir, dstdir, skipdirs=None):
         skipdirs (list or None): Optional list of relative directory name glob patterns to exclude from the backup.
         compact (bool): Whether to optimize storage while copying to the destination.
 
+    Returns:
+        dict: A dictionary of relative slab paths to copy stats (bytes, took, and rate in bytes/sec).
+
     Note:
         Running this method from the same process as a running user of the directory may lead to a segmentation fault
     '''
     tick = s_common.now()
 
+    stats = {}
+
     srcdir = s_common.reqdir(srcdir)
     dstdir = s_common.gendir(dstdir)
 
@@ -122,7 +132,7 @@ def txnbackup(lmdbinfo, srcdir, dstdir, skipdirs=None):
 
                 _, env, txn = lmdbinfos[0]
 
-                backup_lmdb(env, dstpath, txn=txn)
+                stats[os.path.normpath(relname)] = backup_lmdb(env, dstpath, txn=txn)
                 continue
 
             logger.info(f'making dir:{dstpath}')
@@ -142,10 +152,12 @@ def txnbackup(lmdbinfo, srcdir, dstdir, skipdirs=None):
     tock = s_common.now()
 
     logger.info(f'Backup complete. Took [{tock-tick:.2f}] for [{srcdir}]')
-    return
+    return stats
 
 def backup_lmdb(env, dstdir, txn=None):
-
+    '''
+    Copy a single lmdb environment to dstdir and return a dict of copy stats.
+    '''
     tick = time.time()
 
     s_common.gendir(dstdir)
@@ -153,7 +165,13 @@ def backup_lmdb(env, dstdir, txn=None):
     env.copy(dstdir, compact=True, txn=txn)
 
     tock = time.time()
-    logger.info(f'backup took: {tock-tick:.2f} seconds')
+
+    took = tock - tick
+    size = os.stat(os.path.join(dstdir, 'data.mdb')).st_size
+    rate = size / took if took else 0
+
+    logger.info(f'backup of {dstdir} took: {took:.2f} seconds ({size} bytes @ {rate / s_const.mebibyte:.2f} MiB/sec)')
+    return {'bytes': size, 'took': int(took * 1000), 'rate': int(rate)}
 
 def main(argv):
     args = parse_args(argv)
@@ -0,0 +1,125 @@
+import os
+import sys
+import shutil
+import asyncio
+import argparse
+
+import synapse.exc as s_exc
+import synapse.common as s_common
+
+import synapse.lib.output as s_output
+import synapse.lib.dyndeps as s_dyndeps
+import synapse.lib.msgpack as s_msgpack
+
+def getBackupInfo(dirn):
+
+    if not os.path.isfile(os.path.join(dirn, 'backup.yaml')):
+        mesg = f'Backup directory {dirn} has no backup.yaml manifest.'
+        raise s_exc.BadArg(mesg=mesg, dirn=dirn)
+
+    return s_common.yamlload(dirn, 'backup.yaml')
+
+async def restore(ctor, dstdir, fulldir, incrdirs=(), outp=None):
+    '''
+    Restore a full cell backup and replay any incremental backups on top of it.
+
+    Args:
+        ctor (str): The dynamic import path of the Cell class ( used to replay increments ).
+        dstdir (str): The directory to restore the cell into.
+        fulldir (str): The path to a full backup.
+        incrdirs (list): Paths to incremental backups, in the order they were created.
+
+    Returns:
+        int: The nexus log index of the restored cell.
+    '''
+    fullinfo = getBackupInfo(fulldir)
+    if fullinfo.get('type') != 'full':
+        mesg = f'Backup {fulldir} is not a full backup.'
+        raise s_exc.BadArg(mesg=mesg)
+
+    iden = fullinfo.get('iden')
+    nexsindx = fullinfo.get('nexsindx')
+
+    incrs = []
+    for dirn in incrdirs:
+
+        info = getBackupInfo(dirn)
+        if info.get('iden') != iden:
+            mesg = f'Backup {dirn} is from a different cell.'
+            raise s_exc.BadArg(mesg=mesg)
+
+        if info.get('offs') > nexsindx:
+            mesg = f'Backup {dirn} starts at nexus index {info.get("offs")} which is after {nexsindx}.'
+            raise s_exc.BadArg(mesg=mesg)
+
+        nexsindx = max(nexsindx, info.get('nexsindx'))
+        incrs.append(dirn)
+
+    if os.path.isdir(dstdir):
+
+        if os.listdir(dstdir):
+            mesg = f'Restore directory {dstdir} is not empty.'
+            raise s_exc.BadArg(mesg=mesg)
+
+        os.rmdir(dstdir)
+
+    shutil.copytree(fulldir, dstdir)
+    os.unlink(os.path.join(dstdir, 'backup.yaml'))
+
+    if outp is not None:
+        outp.printf(f'Restored full backup {fulldir} (nexus index: {fullinfo.get("nexsindx")})')
+
+    if not incrs:
+        return fullinfo.get('nexsindx')
+
+    clas = s_dyndeps.getDynLocal(ctor)
+
+    async with await clas.anit(dstdir) as cell:
+
+        for dirn in incrs:
+
+            count = 0
+            for offs, item in s_msgpack.iterfile(os.path.join(dirn, 'nexus.mpk')):
+
+                indx = await cell.nexsroot.index()
+                if offs < indx:
+                    continue
+
+                if offs != indx:
+                    mesg = f'Nexus index {offs} from {dirn} does not match the restored cell ({indx}).'
+                    raise s_exc.BadArg(mesg=mesg)
+
+                await cell.nexsroot.eat(*item)
+                count += 1
+
+            if outp is not None:
+                outp.printf(f'Replayed {count} changes from {dirn}')
+
+        return await cell.nexsroot.index()
+
+async def main(argv, outp=s_output.stdout):
+
+    pars = argparse.ArgumentParser(prog='synapse.tools.restore',
+                                   description='Restore a cell from a full backup and optional incremental backups.')
+
+    pars.add_argument('--ctor', default='synapse.cortex.Cortex',
+                      help='The python path of the Cell class used to replay incremental backups.')
+
+    pars.add_argument('dstdir', help='The directory to restore the cell into.')
+    pars.add_argument('fulldir', help='The path to a full backup.')
+    pars.add_argument('incrdirs', nargs='*', help='Paths to incremental backups, in the order they were created.')
+
+    opts = pars.parse_args(argv)
+
+    try:
+        indx = await restore(opts.ctor, opts.dstdir, opts.fulldir, opts.incrdirs, outp=outp)
+
+    except s_exc.SynErr as e:
+        outp.printf(f'ERROR: {e.get("mesg")}')
+        return 1
+
+    outp.printf(f'Restore complete. Nexus index: {indx}')
+    return 0
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))